@@ -1,346 +1,290 @@
 import argparse
 import os
-import json
-
-from data_classes.lineup import Lineup
-
-from data_classes.serve_types import ServeTypes
-from data_classes.serves import Serves
-
-from data_classes.receptions import Receptions
-
-from data_classes.sets import Sets
-
-from data_classes.hits import Hits
-
-from data_classes.breaks import Breaks
+import pathlib
+import sys
+import time
+
+from data_classes.match_result import OUTPUTS
+from data_classes.store import digest_of
+
+from parsing.parser import parse_match, validate_match
+from parsing.errors import format_errors
+from parsing.cache import SetCache, MatchCache, MATCH_CACHE_SIZE
+from parsing.follow import MatchFollower
+from parsing.batch import expand_files, opponent_of, aggregate_files, parse_match_parallel
+from parsing.corpus import reduce_files
+from parsing.database import EventDatabase, import_files
+from parsing.rollups import Rollups, update_files
+from parsing.index import load_index
+from parsing.tracing import PrintTracer, JsonlTracer, RingBufferTracer, anomaly_summary
 
 ##############################    Main    ##############################
 
-def main(filename: str):
-
-    analysis_dir_path = os.path.join(os.getcwd(), 'analysis')
-
-
-    # get the scouting file    
-    with open(os.path.join(os.getcwd(), 'scouting', filename), 'r', encoding='utf-8') as file:
-        data = file.read()
-
-
-    # filter out irrelevant lines
-    data = data.split('\n')
-    data = [line for line in data if (not line.startswith('#')) and (len(line) != 0)]
-
-
-    # remove serve pos line and serve type line
-    data = [line for line in data if not line.startswith('>')]
-
-
-    # define information dataclasses to be filled
-    serves = Serves()
-
-    receptions = Receptions()
-    
-    sets_c1 = Sets(complex=1)
-    sets_c2 = Sets(complex=2)
-    sets_special_case1 = Sets(complex=3)
-
-    hits = Hits()
-
-    breaks = Breaks()
-
-    c = 1
-    amount_of_serves = 0
-    for i, line in enumerate(data):
-        print(f'set: {i + 1}')
-
-
-        # index gives back the first occurrence
-        first_occurence = line.index('>')
-        lineup_, actions = line[:first_occurence], line[first_occurence + 1:]
-
-
-        # Determine lineup
-        lineup = Lineup()
-        lineup.determine_lineup(lineup_)
-
-
-        # pre set relevant variables
-        mode = 'looking for action'
-
-        # stores the last beginning of a play
-        # serve -> serve indicates a won breakpoint
-        # reception -> reception indicates a lost sideout
-        # is used for the breakpoints and to determine when to rotate the lineup
-        team_mode = 'none'
-        
-
-        # 1 for reception, 2 for defense,
-        # only interesting for set distribution, therefore we only care if K1 or K2
-        complex = 0    
-
-
-        # pauses vanish
-        # breaks become empty strings ''
-        actions = actions.split(' ')
-        for ii, action in enumerate(actions):
-            
-            print(mode, f'action {ii}', action)
-
-
-            if action == '':
-                mode = 'looking for action'
+def main(filename: str, jobs: int | None = 1, events: bool = False,
+         verbose: bool = False, trace: str | None = None, trace_last: int = 0, cache: bool = False,
+         outputs: set[str] | None = None, format: str = 'json', cache_size: int = MATCH_CACHE_SIZE):
+    """jobs other than 1 parses the sets of the file concurrently,
+    events additionally writes the event table to analysis/events.npz,
+    cache reads an unchanged file from cache/matches and only parses set lines again
+    which changed since the last run,  see parsing/cache.py,  cache_size limits cache/matches and cache/sets in bytes each,
+    outputs limits the counters that are computed and written,  e.g. {'sets_k1'} for the setter report,
+    format is json,  npy for the binary store of data_classes/store.py or both
 
+    tracing only works with jobs 1,  verbose prints every action,  trace writes every transition to a jsonl file,
+    trace_last keeps the last actions and prints them if the parser fails
+    """
 
-            # indicates a substituion
-            elif action.startswith('<'):
-                lineup.modify_lineup(substitution=action)
-
-
-            # then it should only find . or ..
-            # also the only mode in which the team mode can change and therefore the rotation
-            elif mode == 'looking for action':    
-                
-                assert action in ['.', '..'], f'action {action} not eligible. Only serve or reception can be expected here.'
-
-                # .  --  indicates a serve
-                if action == '.':
-                    mode = 'looking for type of serve next'
-
-                    if team_mode == 'receiving':
-                        lineup.rotate_lineup()
-
-                    # serving -> serving
-                    elif team_mode == 'serving':
-                        breaks.won_breakpoint(rotation = lineup.get_rotation())
-
-                        breaks.won_breakpoint(player = lineup.get_server())
-
-                    team_mode = 'serving'
-
-                    serves_player = lineup.get_server()
-                    serves_type = 0
-                    serves_zone = 0
-                    serves_outcome = 0
-
-                    # to reiterate  --  1 for K1,  2 for K2
-                    complex = 2
-
-                # ..  --  indicates a reception
-                elif action == '..':
-
-                    mode = 'looking for reception type next'
-                    
-                    # receiving -> receiving
-                    if team_mode == 'receiving':
-                        breaks.lost_sideout(lineup.get_rotation())
-
-                    team_mode = 'receiving'
-
-                    receptions_player = 0
-                    receptions_type = ''
-                    receptions_position = 0
-                    receptions_outcome = 0
-
-                    # to reiterate  --  1 for K1  --  2 for K2
-                    complex = 1
-
-
-            #--------------------------------------------------------------------------------------
-
-
-            # . float,  .. jumper,  ... jumper after float toss,  .... float after jump toss
-            elif mode == 'looking for type of serve next':
-                
-                assert 1 <= len(action) <= 4, f'ERR:  action {action} not eligible. Only 4 serve types defined.'
+    analysis_dir_path = os.path.join(os.getcwd(), 'analysis')
 
-                serves_type = len(action)
 
-                mode = 'looking for serve zone next'
+    # get the scouting file and parse it
+    path = pathlib.Path(os.getcwd(), 'scouting', filename)
 
+    tracer = None
+    if verbose:
+        tracer = PrintTracer()
+    elif trace:
+        tracer = JsonlTracer(trace)
+    elif trace_last:
+        tracer = RingBufferTracer(trace_last)
 
-            # this should be a group of . of lengths 1 - 10, 1 - 9 zones, 10 not attributable
-            elif mode == 'looking for serve zone next':
-                
-                assert 1 <= len(action) <= 10, f'ERR:  action {action} not eligible. Only 10 service zones are defined.'
+    # the tracer has to see the parser,  a traced run is never read from cache/matches
+    if not cache or tracer is not None:
+        result = _parse_file(path, jobs, tracer, events, cache, outputs, cache_size)
 
-                mode = 'looking for serve outcome next'
-                
-                serves_zone = len(action)
+    else:
+        match_cache = MatchCache(os.path.join(os.getcwd(), 'cache', 'matches'), cache_size)
 
+        with open(path, 'rb') as file:
+            source = file.read()
 
-            # . ace, .. overpass, ... received,  .... error
-            elif mode == 'looking for serve outcome next':
+        result = match_cache.get(source, events, outputs)
+        if result is None:
+            result = _parse_file(path, jobs, tracer, events, cache, outputs, cache_size)
+            match_cache.put(source, events, result)
 
-                assert 1 <= len(action) <= 4, f'ERR:  action {action} not eligible. Only 4 service outcomes are defined.' 
-                
-                serves_outcome = len(action)
 
-                serves.add_serve_to_player(serves_player, serves_type, serves_zone, serves_outcome)
-                
+    if result.anomalies:
+        print(anomaly_summary(result.anomalies))
 
-                # ..  --  came back over,  ...  --  received
-                if len(action) in [2, 3]:
-                    mode = 'looking for set destination next'
+    # keeps the sidecar for lookup.py up to date,  only rebuilt if the file changed
+    index = load_index(path)
 
+    result.save(analysis_dir_path, format=format, sources={filename: index.digest})
 
-            #--------------------------------------------------------------------------------------
 
+def _parse_file(path: pathlib.Path, jobs: int | None, tracer, events: bool, cache: bool,
+                outputs: set[str] | None, cache_size: int = MATCH_CACHE_SIZE):
+    """parses the file in this process,  through cache/sets if cache,  or concurrently
+    """
 
-            # . float, .. jumper
-            elif mode == 'looking for reception type next':
+    if jobs == 1:
+        try:
+            set_cache = SetCache(os.path.join(os.getcwd(), 'cache', 'sets'), cache_size) if cache else None
+            return parse_match(path, tracer=tracer, events=events, cache=set_cache, outputs=outputs)
 
-                assert 1 <= len(action) <= 2, f'ERR: action {action} not eligible. Only 2 reception types are defined.'
+        except AssertionError:
+            if isinstance(tracer, RingBufferTracer):
+                print('\n'.join(tracer.dump()))
+            raise
 
-                mode = 'looking for receiving position next'
+        finally:
+            if tracer is not None:
+                tracer.close()
 
-                receptions_type = len(action)
+    assert tracer is None, 'tracing needs --jobs 1'
 
+    return parse_match_parallel(path, jobs=jobs, events=events, outputs=outputs)
 
-            # ... pos 3, ..... pos 5, ...... pos 6, . pos 1
-            elif mode == 'looking for receiving position next':
 
-                assert len(action) in [0, 1, 3, 5, 6], f'ERR: action {action} not eligible. Only 5 receiving positions are defined.'
+def main_batch(patterns: list[str], group_by: str = 'season', jobs: int | None = None, events: bool = False,
+               outputs: set[str] | None = None, mmap: bool = False, format: str = 'json', cache: bool = True,
+               cache_size: int = MATCH_CACHE_SIZE, rollup: bool = False):
+    """season writes the aggregate into analysis/,  opponent writes one folder per opponent into analysis/
 
-                # opposing team missed their serve
-                if len(action) == 0:
-                    mode = 'looking for action'
-                    continue
+    mmap streams the files through memory maps in this process instead of reading them into the worker pool,
+    for archives too large to keep in memory,  see parsing/corpus.py,
+    cache reads the files which did not change from cache/matches,  see main,
+    rollup adds the files to the season and opponent rollups in rollups/ and writes those,  see parsing/rollups.py,
+    only files new or changed since they were added are parsed
+    """
 
-                receptions_position = len(action)
+    analysis_dir_path = os.path.join(os.getcwd(), 'analysis')
 
-                receptions_player = lineup.get_receiving_player_on_position(receptions_position)
+    files = expand_files(patterns, os.path.join(os.getcwd(), 'scouting'))
+    print(f'parsing {len(files)} files')
 
-                mode = 'looking for reception outcome next'
 
+    match_cache = MatchCache(os.path.join(os.getcwd(), 'cache', 'matches'), cache_size) if cache else None
 
-            # . perfect, .. okay, ... bad, ... error (aced / back over the net)
-            elif mode == 'looking for reception outcome next':
+    if rollup:
+        assert not events and outputs is None, 'The rollups have every counter and no events'
 
-                assert 1 <= len(action) <= 4, f'ERR: action {action} not eligible. Only 4 reception outcomes are defined. '
-                
-                receptions_outcome = len(action)
+        rollups = Rollups(os.path.join(os.getcwd(), 'rollups'))
+        added, skipped = update_files(rollups, files, jobs = jobs, cache = match_cache)
+        print(f'added {added} files to the rollups,  {skipped} unchanged')
 
-                receptions.add_reception_to_player(receptions_player, receptions_type, receptions_outcome)
+        if group_by == 'season':
+            aggregates = {'season': rollups.season()}
+        else:
+            aggregates = {opponent: rollups.opponent(opponent) for opponent in sorted({opponent_of(path) for path in files})}
 
-                mode = 'looking for set destination next'
-            
-                if len(action) == 4:
-                    complex = 2    # potentially if the ball comes back
+    elif mmap:
+        aggregates = reduce_files(files, group_by = group_by, events = events, outputs = outputs, cache = match_cache)
+    else:
+        aggregates = aggregate_files(files, group_by = group_by, jobs = jobs, events = events, outputs = outputs,
+                                     cache = match_cache)
 
-                # if it was an ace,  then the next action is an empty string
-                # if it came back over the next,  then the next action of the team being scouted
-                #     is technically a defense,  which is not being taken into account,
-                #     thus the next action would be a set
 
+    for key, result in aggregates.items():
 
-            #--------------------------------------------------------------------------------------
+        output_dir_path = analysis_dir_path
+        if group_by == 'opponent':
+            output_dir_path = os.path.join(analysis_dir_path, key)
+            os.makedirs(output_dir_path, exist_ok=True)
 
+        if result.anomalies:
+            print(f'{key}:')
+            print(anomaly_summary(result.anomalies))
 
-            # 1 - 7,  7 is for setter dump
-            elif mode == 'looking for set destination next':
+        if rollup:
+            sources = rollups.sources(None if group_by == 'season' else key)
+        else:
+            sources = {os.path.basename(path): digest_of(path) for path in files
+                       if group_by == 'season' or opponent_of(path) == key}
 
-                assert 1 <= len(action) <= 7, f'ERR: action {action} not eligible. Only 7 set destinations are defined.'
+        # the rallies of many matches cannot be told apart
+        result.save(output_dir_path, format=format, sources=sources, rallies=False)
 
-                mode = 'looking for type of set next'
 
-                sets_destination = len(action)
-                
-                # check if set destination is possible
-                if lineup.is_in_frontcourt(lineup.setter) and sets_destination == 2:
-                    sets_destination = 1
-                    print(f'\\033[31m Faulty scouting there is no opposite in the frontcourt, current lineup: {lineup.lineup}. Will assume opposite in the backcourt')
 
-                if lineup.is_in_backcourt(lineup.setter) and sets_destination == 1:
-                    sets_destination = 2
-                    print(f'\\033[31m Faulty scouting there is no opposite in the backcourt, current lineup: {lineup.lineup}. Will assume opposite in the frontcourt')
+def main_follow(path: str, interval: float = 0.25, events: bool = False, format: str = 'json'):
+    """polls path until interrupted,  prints a summary whenever a rally ended
+    and writes the analysis once the scout stops it with ctrl + c
+    """
 
-                # careful the set destination is given as 1 - 6,  the lineup positions are stored as 0 - 5
-                hits_player = lineup.get_hitting_player_on_position(sets_destination)
+    follower = MatchFollower(path, events=events)
+    error = None
 
-            # 1 - 4
-            elif mode == 'looking for type of set next':
+    print(f'following {path},  stop with ctrl + c')
 
-                assert 1 <= len(action) <= 4, f'ERR: action {action} not eligible. Only 4 set types are defined.'
+    try:
+        while True:
+            if follower.poll():
+                print(follower.summary())
 
-                sets_type = len(action)
-                rotation = lineup.get_rotation()
+            if follower.error is not None and follower.error is not error:
+                error = follower.error
+                print(f'\033[31m{error}\033[0m,  waiting for the file to be fixed')
 
-                if complex == 1:
-                    sets_c1.add_set_to_player(lineup.setter, rotation, sets_destination, sets_type)
+            time.sleep(interval)
 
-                    if receptions_position == 1:
-                        sets_special_case1.add_set_to_player(lineup.setter, rotation, sets_destination, sets_type)
+    except KeyboardInterrupt:
+        pass
 
-                elif complex == 2:
-                    sets_c2.add_set_to_player(lineup.setter, rotation, sets_destination, sets_type)
+    result = follower.finish()
+    if result.anomalies:
+        print(anomaly_summary(result.anomalies))
 
-                mode = 'looking for type of hit next'
+    result.save(os.path.join(os.getcwd(), 'analysis'), format=format, sources={os.path.basename(path): digest_of(path)})
 
 
-            #--------------------------------------------------------------------------------------
+def main_import(patterns: list[str], database: str, jobs: int | None = None, cache: bool = True,
+                cache_size: int = MATCH_CACHE_SIZE):
+    """writes the events of the files into the sqlite database,  see parsing/database.py,
+    files unchanged since they were imported are not parsed again,  nothing is written to analysis/
+    """
 
+    files = expand_files(patterns, os.path.join(os.getcwd(), 'scouting'))
 
-            # . hit,  .. tip,  ... rebound
-            elif mode == 'looking for type of hit next':
+    events_database = EventDatabase(database)
+    try:
+        match_cache = MatchCache(os.path.join(os.getcwd(), 'cache', 'matches'), cache_size) if cache else None
+        imported, skipped = import_files(events_database, files, jobs = jobs, cache = match_cache)
+    finally:
+        events_database.close()
 
-                assert 1 <= len(action) <= 3, f'ERR: action {action} not eligible. Only 3 types of hits are defined.'
+    print(f'imported {imported} files,  {skipped} unchanged')
 
-                type_of_hit = len(action)
 
-                mode = 'looking for zone of hit next'
+def main_validate(patterns: list[str]) -> int:
+    """prints every error of the files instead of stopping at the first one,  nothing is written,
+    returns the number of errors
+    """
 
+    files = expand_files(patterns, os.path.join(os.getcwd(), 'scouting'))
 
-            # 1 - 5,  from leftmost to rightmost,  just divide the court equally
-            # 6 - zone for short tips
-            # 7 - zone for not attributable blocked hits and errors
-            elif mode == 'looking for zone of hit next':
+    count = 0
+    for path in files:
+        errors = validate_match(pathlib.Path(path))
 
-                assert 1 <= len(action) <= 7, f'ERR: action {action} not eligible. Only 7 hitting zones are defined.'
+        if errors:
+            print(format_errors(errors, os.path.basename(path)))
+        count += len(errors)
 
-                mode = 'looking for outcome of hit next'
+    print(f'{count} errors in {len(files)} files')
 
-                hits_zone = len(action)
+    return count
+    
 
+if __name__ == '__main__': 
 
-            # . point,  .. defended,  ... block out,  .... blocked,  ..... error
-            elif mode == 'looking for outcome of hit next':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filename',)
 
-                assert 1 <= len(action) <= 5, f'ERR: action {action} not eligible. Only 5 hitting outcomes are defined.'
+    # batch mode,  e.g.  --files kiel.txt "giessen*.txt"
+    parser.add_argument('--files', nargs='+')
+    parser.add_argument('--group-by', choices=['season', 'opponent'], default='season')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes,  defaults to every core for --files and to 1 for --filename')
+    parser.add_argument('--events', action='store_true', help='also write the columnar event table to events.npz')
+    parser.add_argument('--mmap', action='store_true', help='stream the --files through memory maps in one process,  for archives')
+    parser.add_argument('--rollup', action='store_true', help='add the --files to the rollups in rollups/ and write the season or opponent rollups')
 
-                hits_outcome = len(action)
+    # tracing,  only for --filename
+    parser.add_argument('--verbose', action='store_true', help='print every action')
+    parser.add_argument('--trace', help='write every state transition to this jsonl file')
+    parser.add_argument('--trace-last', type=int, default=0, help='print the last n actions if the parser fails')
 
-                hits.add_hit_to_player(hits_player, sets_destination, sets_type, hits_zone, hits_outcome)
+    # only the counters a report needs,  e.g.  --outputs sets_k1 hits
+    parser.add_argument('--outputs', nargs='+', choices=OUTPUTS, help='only compute and write these counters')
 
+    # the generators read either,  npy is mapped instead of parsed
+    parser.add_argument('--format', choices=['json', 'npy', 'both'], default='json', help='write the counters as json files,  as the binary store or both')
 
-                # ..  --  defended  --  that includes a defense which comes straight back over and rebound off the block
-                if action == '..':
-                    mode = 'looking for set destination next'
+    parser.add_argument('--no-cache', action='store_true', help='parse every file again instead of reusing cache/matches and cache/sets')
+    parser.add_argument('--cache-size', type=int, default=MATCH_CACHE_SIZE // 2 ** 20, help='MiB of cache/matches and of cache/sets each,  the entries used least recently are evicted')
 
-                    complex = 2    # potential return of ball
-            
+    # cross match queries,  e.g.  --files "*.txt" --database scouting.db
+    parser.add_argument('--database', help='write the events of the files into this sqlite database instead of analysis')
 
-    serves.save(analysis_dir_path)
+    # only check the notation,  e.g.  --validate --filename kiel.txt
+    parser.add_argument('--validate', action='store_true', help='list every error in the notation instead of parsing')
 
-    receptions.save(analysis_dir_path)
-    
-    sets_c1.save(analysis_dir_path)
-    sets_c2.save(analysis_dir_path)
-    sets_special_case1.save(analysis_dir_path)
-    
-    hits.save(analysis_dir_path)
+    # live statistics while scouting,  e.g.  --follow scouting/kiel.txt
+    parser.add_argument('--follow', help='follow the scouting file while it is written')
+    parser.add_argument('--interval', type=float, default=0.25, help='seconds between two polls of --follow')
 
-    breaks.save(analysis_dir_path)
-    
+    args = parser.parse_args()
 
-if __name__ == '__main__': 
+    if args.follow:
+        main_follow(path = args.follow, interval = args.interval, events = args.events, format = args.format)
 
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--filename',)
+    elif args.validate:
+        sys.exit(1 if main_validate(args.files or [args.filename]) else 0)
 
-    args = parser.parse_args()
+    elif args.database:
+        main_import(patterns = args.files or [args.filename], database = args.database, jobs = args.jobs,
+                    cache = not args.no_cache, cache_size = args.cache_size * 2 ** 20)
 
-    main(filename = args.filename)
+    elif args.files:
+        main_batch(patterns = args.files, group_by = args.group_by, jobs = args.jobs, events = args.events, outputs = args.outputs,
+                   mmap = args.mmap, format = args.format, cache = not args.no_cache, cache_size = args.cache_size * 2 ** 20, rollup = args.rollup)
+    else:
+        main(
+            filename = args.filename, jobs = args.jobs or 1, events = args.events,
+            verbose = args.verbose, trace = args.trace, trace_last = args.trace_last, cache = not args.no_cache,
+            outputs = args.outputs, format = args.format, cache_size = args.cache_size * 2 ** 20,
+        )
 
 
-####################################################################################################
\ No newline at end of file
+####################################################################################################
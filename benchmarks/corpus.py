@@ -0,0 +1,68 @@
+"""Benchmarks the memory-mapped streaming of parsing/corpus.py against aggregate_files
+on an archive of copies of a sample file,  and checks that both write the same analysis files.
+
+    python -m benchmarks.corpus --filename kiel.txt --files 20 --copies 50
+
+the peak is what python allocated,  the pages of the mapped files belong to the page cache
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from parsing.batch import aggregate_files
+from parsing.corpus import reduce_files
+
+from benchmarks.parser import build_corpus
+from benchmarks.outputs import saved
+
+
+def measure(function, *args, **kwargs) -> tuple[float, float, dict]:
+    """seconds,  peak MiB and the result of function
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    result = function(*args, **kwargs)
+
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, peak / 2 ** 20, result
+
+
+
+##############################    Main    ##############################
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filename', default='kiel.txt')
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--copies', type=int, default=50)
+    args = parser.parse_args()
+
+    corpus = build_corpus(os.path.join('scouting', args.filename), args.copies)
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        paths = []
+        for i in range(args.files):
+            paths.append(os.path.join(directory, f'match{i}.txt'))
+            with open(paths[-1], 'w', encoding='utf-8') as file:
+                file.write(corpus)
+
+        size = sum(os.path.getsize(path) for path in paths) / 2 ** 20
+        print(f'{args.files} files,  {size:.1f} MiB')
+
+        read_time, read_peak, read = measure(aggregate_files, paths, jobs=1)
+        print(f'aggregate_files:  {read_time * 1000:8.1f} ms  peak {read_peak:7.1f} MiB')
+
+        mapped_time, mapped_peak, mapped = measure(reduce_files, paths)
+        print(f'reduce_files:     {mapped_time * 1000:8.1f} ms  peak {mapped_peak:7.1f} MiB')
+
+    assert saved(read['season']) == saved(mapped['season']), 'reduce_files differs from aggregate_files'
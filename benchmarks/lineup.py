@@ -0,0 +1,161 @@
+"""Replays every rotation and substitution of the sample scouting files on Lineup.
+
+Each rally start asks for the server and the rotation,  like the parser does.
+The list copying rotation Lineup used before is replayed as well for comparison,
+building the lineups is not timed.
+
+    python -m benchmarks.lineup --repeat 200
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from data_classes.lineup import Lineup
+from parsing.parser import set_lines
+
+
+class ListRotation():
+    """rotation as it was done before,  by rebuilding lineup and meta on every side-out
+    """
+
+    def __init__(self, lineup: Lineup):
+
+        self.lineup = lineup.lineup
+        self.meta = lineup.meta
+        self.setter = lineup.setter
+
+
+    def rotate_lineup(self):
+        self.lineup = self.lineup[1:] + [self.lineup[0]]
+        self.meta = self.meta[1:] + [self.meta[0]]
+
+
+    def get_rotation(self) -> int:
+        return self.lineup.index(self.setter)
+
+
+    def get_server(self) -> int:
+        return self.lineup[0]
+
+
+    def modify_lineup(self, substitution: str):
+        if substitution == '<x>':
+            opposite_index, setter_index = self.meta.index('OP'), self.meta.index('S')
+            self.meta[opposite_index], self.meta[setter_index] = 'S', 'OP'
+            self.setter = self.lineup[opposite_index]
+            return
+
+        player_out, player_in = map(int, substitution[1:-1].split('x'))
+        if player_out in self.lineup:
+            self.lineup[self.lineup.index(player_out)] = player_in
+            if player_out == self.setter:
+                self.setter = player_in
+
+
+def collect_replays(paths: list[str]) -> list[tuple[str, list]]:
+    """per set line the lineup and the operations,  'r' rotate,  'q' query,  or a substitution
+    """
+
+    replays = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            lines = set_lines(file.read())
+
+        for line in lines:
+            lineup, actions = line.split('>', 1)
+
+            operations = []
+            team_mode = 'none'
+            at_rally_start = True
+
+            for action in actions.split(' '):
+
+                if action == '':
+                    at_rally_start = True
+
+                elif action[0] == '<':
+                    operations.append(action)
+
+                elif at_rally_start:
+                    at_rally_start = False
+
+                    if action == '.' and team_mode == 'receiving':
+                        operations.append('r')
+                    team_mode = 'serving' if action == '.' else 'receiving'
+
+                    operations.append('q')
+
+            # sets in an outdated notation are left out
+            try:
+                replay([(lineup, operations)], fresh_lineups([(lineup, operations)], lambda lineup: lineup))
+            except (ValueError, AssertionError):
+                continue
+
+            replays.append((lineup, operations))
+
+    return replays
+
+
+def fresh_lineups(replays: list[tuple[str, list]], wrap) -> list:
+
+    lineups = []
+    for lineup_text, _ in replays:
+        lineup = Lineup()
+        lineup.determine_lineup(lineup_text)
+        lineups.append(wrap(lineup))
+
+    return lineups
+
+
+def replay(replays: list[tuple[str, list]], lineups: list) -> int:
+
+    count = 0
+    for lineup, (_, operations) in zip(lineups, replays):
+
+        for operation in operations:
+            if operation == 'r':
+                lineup.rotate_lineup()
+            elif operation == 'q':
+                lineup.get_server()
+                lineup.get_rotation()
+            else:
+                lineup.modify_lineup(operation)
+
+        count += len(operations)
+
+    return count
+
+
+def best_of(repeat: int, replays: list, wrap) -> tuple[float, int]:
+
+    best = float('inf')
+    for _ in range(repeat):
+        lineups = fresh_lineups(replays, wrap)
+
+        start = time.perf_counter()
+        count = replay(replays, lineups)
+        best = min(best, time.perf_counter() - start)
+
+    return best, count
+
+
+
+##############################    Main    ##############################
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', nargs='+', default=glob.glob(os.path.join('scouting', '*.txt')))
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    replays = collect_replays(sorted(args.files))
+
+    slots_time, count = best_of(args.repeat, replays, lambda lineup: lineup)
+    list_time, _ = best_of(args.repeat, replays, ListRotation)
+
+    print(f'{len(replays)} sets,  {count} rotations, substitutions and queries')
+    print(f'list rotation:    {list_time * 1000:7.2f} ms  ({list_time / count * 1e9:6.0f} ns / operation)')
+    print(f'slots + offset:   {slots_time * 1000:7.2f} ms  ({slots_time / count * 1e9:6.0f} ns / operation)')
@@ -0,0 +1,118 @@
+"""Checks the properties the parallel parsing and the batch modes rely on:
+merge is associative and the empty counter is its identity,  on both sides.
+
+Every set line of the sample files is parsed on its own and the results are split into three groups a,  b and c,
+then for every counter
+
+    (a + b) + c == a + (b + c)
+    a + Empty() == a == Empty() + a
+
+compared by the json files they write,  so the order of the players and positions counts as well,
+breakpoints_players.json included.
+a + b has to leave a and b as they were,  also the rows their views did not count yet.
+
+    python -m benchmarks.merge --files kiel.txt
+"""
+
+import argparse
+import copy
+import functools
+import os
+import tempfile
+
+from data_classes.serves import Serves
+from data_classes.receptions import Receptions
+from data_classes.sets import Sets
+from data_classes.hits import Hits
+from data_classes.breaks import Breaks
+from data_classes.match_result import MatchResult
+
+from parsing.parser import set_lines, parse_set
+from parsing.batch import parse_lines
+
+
+# counter of a MatchResult -> the empty counter
+EMPTY = {
+    'serves': Serves,
+    'receptions': Receptions,
+    'sets_k1': lambda: Sets(complex=1),
+    'sets_k2': lambda: Sets(complex=2),
+    'sets_k3': lambda: Sets(complex=3),
+    'hits': Hits,
+    'breaks': Breaks,
+}
+
+
+def saved(counter) -> dict[str, bytes]:
+    """the json files counter writes,  a MatchResult writes those of all its counters
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        counter.save(directory)
+
+        files = {}
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.json'):
+                with open(os.path.join(directory, name), 'rb') as file:
+                    files[name] = file.read()
+
+    return files
+
+
+def groups(paths: list[str]) -> list[MatchResult]:
+    """the set lines of all files parsed one by one and summed into three groups round robin
+    """
+
+    results = [MatchResult(), MatchResult(), MatchResult()]
+
+    lines = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            lines.extend(set_lines(file.read()))
+
+    assert len(lines) >= 3, 'Three set lines are needed at least'
+
+    for i, line in enumerate(lines):
+        results[i % 3].merge(parse_set(line, MatchResult()))
+
+    return results
+
+
+
+##############################    Main    ##############################
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', nargs='+', default=['kiel.txt'])
+    args = parser.parse_args()
+
+    a, b, c = groups([os.path.join('scouting', filename) for filename in args.files])
+
+    for name, empty in EMPTY.items():
+        x, y, z = getattr(a, name), getattr(b, name), getattr(c, name)
+
+        assert saved((x + y) + z) == saved(x + (y + z)), f'merging {name} is not associative'
+
+        assert saved(x + empty()) == saved(x), f'the empty {name} is no right identity'
+        assert saved(empty() + x) == saved(x), f'the empty {name} is no left identity'
+
+        # in place as the reductions do it
+        left = empty()
+        for counter in [x, y, z]:
+            left += counter
+        assert saved(left) == saved(functools.reduce(lambda p, q: p + q, [x, y, z])), f'+= differs from + for {name}'
+
+        print(f'{name:12}  ok')
+
+    assert saved((a + b) + c) == saved(a + (b + c)), 'merging MatchResult is not associative'
+
+    # as parse_lines returns them,  the views are not evaluated yet
+    with open(os.path.join('scouting', args.files[0]), 'r', encoding='utf-8') as file:
+        x, y = parse_lines(set_lines(file.read())[:2], jobs=1)
+    before = [saved(copy.deepcopy(x)), saved(copy.deepcopy(y))]
+
+    x + y
+    assert [saved(x), saved(y)] == before, 'a + b changed a or b'
+
+    print('MatchResult  ok')
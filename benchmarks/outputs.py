@@ -0,0 +1,66 @@
+"""Benchmarks parse_match for every single output against all outputs at once,
+on the set lines of a sample file repeated into a larger corpus.
+
+    python -m benchmarks.outputs --filename kiel.txt --copies 250
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from data_classes.match_result import MatchResult, OUTPUTS
+from parsing.parser import parse_match
+
+from benchmarks.parser import build_corpus
+
+
+def saved(result: MatchResult) -> dict[str, bytes]:
+
+    with tempfile.TemporaryDirectory() as directory:
+        result.save(directory)
+
+        files = {}
+        for name in os.listdir(directory):
+            with open(os.path.join(directory, name), 'rb') as file:
+                files[name] = file.read()
+
+    return files
+
+
+def best_of(repeat: int, corpus: str, outputs: set[str] | None) -> float:
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_match(corpus, outputs=outputs)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+
+##############################    Main    ##############################
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filename', default='kiel.txt')
+    parser.add_argument('--copies', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = build_corpus(os.path.join('scouting', args.filename), args.copies)
+
+    # the files of a single output do not depend on what else is counted
+    everything = saved(parse_match(corpus))
+    for name in OUTPUTS:
+        alone = saved(parse_match(corpus, outputs={name}))
+        assert alone.items() <= everything.items(), f'{name} differs when counted alone'
+
+    all_time = best_of(args.repeat, corpus, None)
+    print(f'all outputs:           {all_time * 1000:8.1f} ms')
+
+    for outputs in [{name} for name in OUTPUTS] + [{'sets_k1', 'hits'}]:
+        output_time = best_of(args.repeat, corpus, outputs)
+        print(f'{", ".join(sorted(outputs)):22} {output_time * 1000:8.1f} ms  ({all_time / output_time:.2f}x)')
@@ -0,0 +1,91 @@
+"""Benchmarks analysis.main against the frozen if/elif parser in benchmarks/reference_parser.py
+and checks that both write byte-identical analysis files.
+
+    python -m benchmarks.parser --filename kiel.txt --copies 40
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+
+import analysis
+from benchmarks import reference_parser
+
+
+def build_corpus(source: str, copies: int) -> str:
+    """Repeats every set line of the source file,  comments and serve type lines are kept once
+    """
+
+    with open(source, 'r', encoding='utf-8') as file:
+        lines = file.read().split('\n')
+
+    meta = [line for line in lines if line.startswith('#') or line.startswith('>')]
+    sets = [line for line in lines if line and not line.startswith('#') and not line.startswith('>')]
+
+    return '\n'.join(meta + sets * copies)
+
+
+def run(main, filename: str, workdir: str, repeat: int) -> tuple[float, dict]:
+
+    analysis_dir = os.path.join(workdir, 'analysis')
+
+    best = float('inf')
+    for _ in range(repeat):
+        shutil.rmtree(analysis_dir, ignore_errors=True)
+        os.mkdir(analysis_dir)
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            main(filename)
+            best = min(best, time.perf_counter() - start)
+
+    # the reference parser only writes the json files,  not rallies.npz
+    outputs = {}
+    for name in sorted(os.listdir(analysis_dir)):
+        if not name.endswith('.json'):
+            continue
+
+        with open(os.path.join(analysis_dir, name), 'rb') as file:
+            outputs[name] = file.read()
+
+    return best, outputs
+
+
+
+##############################    Main    ##############################
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filename', default='kiel.txt')
+    parser.add_argument('--copies', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = build_corpus(os.path.join('scouting', args.filename), args.copies)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.mkdir(os.path.join(workdir, 'scouting'))
+        with open(os.path.join(workdir, 'scouting', 'corpus.txt'), 'w', encoding='utf-8') as file:
+            file.write(corpus)
+
+        os.chdir(workdir)
+        try:
+            reference_time, reference_outputs = run(reference_parser.main, 'corpus.txt', workdir, args.repeat)
+            table_time, table_outputs = run(analysis.main, 'corpus.txt', workdir, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    assert reference_outputs.keys() == table_outputs.keys(), \
+        f'different output files: {sorted(reference_outputs)} vs {sorted(table_outputs)}'
+
+    for name in reference_outputs:
+        assert reference_outputs[name] == table_outputs[name], f'{name} differs from the reference parser'
+
+    print(f'{len(reference_outputs)} output files byte-identical')
+    print(f'reference if/elif parser:  {reference_time * 1000:8.1f} ms')
+    print(f'transition table parser:   {table_time * 1000:8.1f} ms  ({reference_time / table_time:.2f}x)')
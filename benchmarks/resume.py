@@ -0,0 +1,77 @@
+"""Checks that resuming the parser at a rally from the index,  see parsing/index.py,  parses that rally
+exactly as a full parse of the file does.
+
+Every rally of the sample files is parsed on its own by a parser from resume_parser,
+its events have to equal the events of that rally in the full parse,
+and the sum of all rallies parsed on their own has to write the same json files as the full parse.
+
+    python -m benchmarks.resume --files kiel.txt big.txt
+"""
+
+import argparse
+import os
+
+from data_classes.match_result import MatchResult
+from parsing.index import build_index, resume_parser
+from parsing.parser import parse_match
+
+from benchmarks.outputs import saved
+
+
+def json_files(result: MatchResult) -> dict[str, bytes]:
+
+    return {name: content for name, content in saved(result).items() if name.endswith('.json')}
+
+
+def by_rally(result: MatchResult) -> dict[tuple[int, int], list[tuple]]:
+    """the rows of the events by set and rally
+    """
+
+    rallies = {}
+    for row in result.events.rows:
+        rallies.setdefault((row[0], row[1]), []).append(tuple(row))
+
+    return rallies
+
+
+def check(path: str) -> int:
+    """returns the number of rallies resumed
+    """
+
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    full = parse_match(data.decode('utf-8'), events=True)
+    expected = by_rally(full)
+
+    index = build_index(path)
+    total = MatchResult()
+
+    for row in range(len(index)):
+        result = MatchResult(events=True)
+
+        parser = resume_parser(index, row, result)
+        parser.feed(data[index.starts[row]:index.ends[row]].decode('utf-8').split(' '))
+        result.evaluate_views()
+
+        key = (int(index.set[row]), int(index.rally[row]))
+        assert by_rally(result).get(key, []) == expected.get(key, []), f'set {key[0]} rally {key[1]} differs'
+
+        total.merge(result)
+
+    assert json_files(total) == json_files(full), 'the rallies resumed one by one do not add up to the full parse'
+
+    return len(index)
+
+
+
+##############################    Main    ##############################
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', nargs='+', default=['kiel.txt'])
+    args = parser.parse_args()
+
+    for filename in args.files:
+        print(f'{filename:16}  {check(os.path.join("scouting", filename)):5} rallies resumed  ok')
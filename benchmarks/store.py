@@ -0,0 +1,77 @@
+"""Benchmarks loading the counters from the container of data_classes/store.py against the json files
+and checks that both give the same counts.
+
+    python -m benchmarks.store --filename kiel.txt --copies 40
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from parsing.parser import parse_match
+from data_classes.store import open_store, load_counter
+
+from benchmarks.parser import build_corpus
+
+
+STEMS = ['serves', 'receptions', 'setsK1', 'setsK2', 'setsK3', 'hits', 'breakpoints']
+
+
+def load_all(directory: str) -> dict:
+    """the container is opened once for all sections
+    """
+
+    store = open_store(directory)
+    if store is None:
+        return {stem: load_counter(directory, stem) for stem in STEMS}
+
+    return {stem: store.counter(stem) for stem in STEMS}
+
+
+def best_of(repeat: int, directory: str) -> float:
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load_all(directory)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def same(a, b) -> bool:
+
+    if hasattr(a, 'breaks'):
+        return a.breaks == b.breaks and a.player_breaks == b.player_breaks
+
+    return a.players == b.players and np.array_equal(a.counts, b.counts)
+
+
+
+##############################    Main    ##############################
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filename', default='kiel.txt')
+    parser.add_argument('--copies', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    result = parse_match(build_corpus(os.path.join('scouting', args.filename), args.copies))
+
+    with tempfile.TemporaryDirectory() as binary, tempfile.TemporaryDirectory() as text:
+        result.save(binary, format='npy')
+        result.save(text, format='json')
+
+        size = sum(os.path.getsize(os.path.join(binary, name)) for name in os.listdir(binary)) / 2 ** 10
+        print(f'npy:   {best_of(args.repeat, binary) * 1000:8.2f} ms  {size:8.1f} KiB')
+
+        size = sum(os.path.getsize(os.path.join(text, name)) for name in os.listdir(text)) / 2 ** 10
+        print(f'json:  {best_of(args.repeat, text) * 1000:8.2f} ms  {size:8.1f} KiB')
+
+        for stem, counter in load_all(binary).items():
+            assert same(counter, load_counter(text, stem)), f'{stem} differs between npy and json'
@@ -0,0 +1,87 @@
+"""Benchmarks the numpy tokenizer against str.split and len on a synthetic corpus of set lines,
+built by repeating the set lines of a sample file,  and the parser fed by either of them.
+
+    python -m benchmarks.tokenizer --filename kiel.txt --sets 10000
+"""
+
+import argparse
+import os
+import time
+
+from data_classes.match_result import MatchResult
+from parsing.parser import set_lines, _parse_set, tokenize_set_lines
+from parsing.tokenizer import SUBSTITUTION
+
+
+def build_lines(source: str, sets: int) -> list[str]:
+
+    with open(source, 'r', encoding='utf-8') as file:
+        lines = set_lines(file.read())
+
+    return (lines * (sets // len(lines) + 1))[:sets]
+
+
+def split_lengths(lines: list[str]) -> list[list[int]]:
+    """what the parser did before,  the tokens and their length
+    """
+
+    return [[len(action) for action in line[line.index('>') + 1:].split(' ')] for line in lines]
+
+
+def parse(lines: list[str], tokenized: bool) -> MatchResult:
+
+    result = MatchResult()
+
+    tokens = tokenize_set_lines(lines) if tokenized else [None] * len(lines)
+    for i, (line, tokens_) in enumerate(zip(lines, tokens)):
+        _parse_set(line, result, None, i + 1, tokens_)
+
+    result.evaluate_views()
+
+    return result
+
+
+def best_of(repeat: int, function, *args) -> tuple[float, object]:
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best, value
+
+
+
+##############################    Main    ##############################
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filename', default='kiel.txt')
+    parser.add_argument('--sets', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    lines = build_lines(os.path.join('scouting', args.filename), args.sets)
+    tokens = sum(line.count(' ') + 1 for line in lines)
+
+    split_time, _ = best_of(args.repeat, split_lengths, lines)
+    numpy_time, tokenized = best_of(args.repeat, lambda: [tokens_.lengths.tolist() for tokens_ in tokenize_set_lines(lines)])
+
+    # substitutions are SUBSTITUTION instead of their length
+    assert tokenized == [
+        [SUBSTITUTION if action.startswith('<') else len(action) for action in line[line.index('>') + 1:].split(' ')]
+        for line in lines], 'the tokenizer disagrees with str.split'
+
+    split_parse_time, split_result = best_of(args.repeat, parse, lines, False)
+    numpy_parse_time, numpy_result = best_of(args.repeat, parse, lines, True)
+
+    assert split_result.serves.serves == numpy_result.serves.serves and split_result.hits.hits == numpy_result.hits.hits, \
+        'the parser counts differently on tokens'
+
+    print(f'{len(lines)} sets,  {tokens} tokens')
+    print(f'str.split + len:     {split_time * 1000:8.1f} ms  ({split_time / tokens * 1e9:5.0f} ns / token)')
+    print(f'numpy tokenizer:     {numpy_time * 1000:8.1f} ms  ({numpy_time / tokens * 1e9:5.0f} ns / token,  {split_time / numpy_time:.2f}x)')
+    print(f'parse on strings:    {split_parse_time * 1000:8.1f} ms')
+    print(f'parse on tokens:     {numpy_parse_time * 1000:8.1f} ms  ({split_parse_time / numpy_parse_time:.2f}x)')
@@ -1,3 +1,6 @@
+from data_classes.counts import add_counts, subtract_counts
+
+
 class Breaks():
     # Rotation as 0 - 5, since lineup returns rotation as 0 - 5
     # Extra players dict, because it is an interesting stat with whoms serve they scored the most breaks
@@ -34,6 +37,54 @@ class Breaks():
         self.breaks[rotation] -= 1
 
 
+    # Combining
+
+    def merge(self, other: 'Breaks') -> 'Breaks':
+        """adds the counts of other to self in place,  an empty Breaks() is the identity
+        """
+
+        assert isinstance(other, Breaks), f'Cannot merge {type(other).__name__} into Breaks'
+
+        add_counts(self.breaks, other.breaks)
+        add_counts(self.player_breaks, other.player_breaks)
+
+        return self
+
+
+    def __iadd__(self, other: 'Breaks') -> 'Breaks':
+
+        return self.merge(other)
+
+
+    def __add__(self, other: 'Breaks') -> 'Breaks':
+
+        return Breaks().merge(self).merge(other)
+
+
+    def subtract(self, other: 'Breaks') -> 'Breaks':
+        """removes the counts of other from self in place,  the inverse of merge
+        """
+
+        assert isinstance(other, Breaks), f'Cannot subtract {type(other).__name__} from Breaks'
+
+        for rotation, count in other.breaks.items():
+            self.breaks[rotation] -= count
+
+        subtract_counts(self.player_breaks, other.player_breaks)
+
+        return self
+
+
+    def __isub__(self, other: 'Breaks') -> 'Breaks':
+
+        return self.subtract(other)
+
+
+    def __sub__(self, other: 'Breaks') -> 'Breaks':
+
+        return Breaks().merge(self).subtract(other)
+
+
     # Save
 
     def save(self, filepath: str):
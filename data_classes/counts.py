@@ -0,0 +1,120 @@
+import numpy as np
+
+
+def add_counts(target: dict, source: dict) -> dict:
+    """adds the nested count dict source onto target in place and returns target
+
+    keys new to target are appended in the order of source,
+    therefore merging partial results in order keeps the order of first appearance
+    """
+
+    for key, value in source.items():
+
+        if isinstance(value, dict):
+            add_counts(target.setdefault(key, {}), value)
+
+        else:
+            target[key] = target.get(key, 0) + value
+
+    return target
+
+
+def subtract_counts(target: dict, source: dict) -> dict:
+    """subtracts the nested count dict source from target in place and returns target,
+    the inverse of add_counts,  keys which drop to zero are removed
+    """
+
+    for key, value in source.items():
+
+        if isinstance(value, dict):
+            subtract_counts(target[key], value)
+            if not target[key]:
+                del target[key]
+
+        else:
+            target[key] -= value
+            if target[key] == 0:
+                del target[key]
+
+    return target
+
+
+class CountTensor():
+    """Dense integer counts with one row per player
+
+    players maps the jersey number to the row,  in the order of first appearance,
+    the rows beyond len(players) are spare capacity and always zero
+    """
+
+    def __init__(self, shape: tuple[int, ...]):
+
+        self.players = {}
+
+        self.data = np.zeros((4, *shape), dtype=np.int64)
+
+
+    # Getters
+
+    @property
+    def counts(self) -> np.ndarray:
+        """the filled rows,  axis 0 follows the order of players
+        """
+        return self.data[:len(self.players)]
+
+
+    # Modifiers
+
+    def row(self, player: int) -> int:
+        """returns the row of player,  a new row is added if the player has none yet
+        """
+
+        row = self.players.get(player)
+        if row is not None:
+            return row
+
+        row = len(self.players)
+        if row == len(self.data):
+            self.data = np.concatenate([self.data, np.zeros_like(self.data)])
+
+        self.players[player] = row
+
+        return row
+
+
+    def merge(self, other: 'CountTensor'):
+
+        assert self.data.shape[1:] == other.data.shape[1:], \
+            f'Cannot merge counts of shape {other.data.shape[1:]} into {self.data.shape[1:]}'
+
+        rows = [self.row(player) for player in other.players]
+
+        # rows are unique,  therefore a fancy indexed add is safe
+        self.data[rows] += other.counts
+
+
+    def subtract(self, other: 'CountTensor'):
+        """the inverse of merge,  every player of other has to be in self,
+        players without counts afterwards are removed,  as they would never have been added
+        """
+
+        assert self.data.shape[1:] == other.data.shape[1:], \
+            f'Cannot subtract counts of shape {other.data.shape[1:]} from {self.data.shape[1:]}'
+
+        missing = [player for player in other.players if player not in self.players]
+        assert not missing, f'Cannot subtract the counts of players {missing} which have none'
+
+        rows = [self.players[player] for player in other.players]
+        self.data[rows] -= other.counts
+
+        assert (self.data[rows] >= 0).all(), 'Cannot subtract more than was counted'
+
+        counts = self.counts
+        kept = [player for player, row in self.players.items() if counts[row].any()]
+        if len(kept) == len(self.players):
+            return
+
+        data = np.zeros_like(self.data)
+        data[:len(kept)] = counts[[self.players[player] for player in kept]]
+
+        self.players = {player: row for row, player in enumerate(kept)}
+        self.data = data
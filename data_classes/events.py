@@ -0,0 +1,262 @@
+import numpy as np
+
+from data_classes.counts import CountTensor
+from data_classes.serves import Serves
+from data_classes.receptions import Receptions
+from data_classes.sets import Sets
+from data_classes.hits import Hits
+from data_classes.breaks import Breaks
+from data_classes.rallies import Rallies
+
+
+# kinds of events
+RALLY = 0
+SERVE = 1
+RECEPTION = 2
+SET = 3
+HIT = 4
+
+COLUMNS = (
+    'set',                  # 1 - 5,  the number of the set line
+    'rally',                # 1 - n within the set
+    'kind',                 # see above
+    'rotation',             # 0 - 5 at the start of the rally
+    'complex',              # 1 for K1,  2 for K2
+    'player',               # jersey number,  UNKNOWN_PLAYER if the lineup has no player for the position
+    'position',             # receiving position,  set destination / hitting position,  0 otherwise
+    'type',                 # rally: 1 serve 2 reception,  serve / reception / set type,  for hits the set type
+    'zone',                 # serve zone,  hitting zone
+    'outcome',              # serve / reception / hitting outcome
+    'hit_type',             # 1 hit,  2 tip,  3 rebound
+    'reception_position',   # receiving position of the rally,  0 for serving rallies
+    'reception_outcome',    # reception outcome of the rally,  0 for serving rallies
+    'previous_destination', # destination of the previous set of the rally,  0 for its first set
+    'team_score',           # points of the team before the rally
+    'opponent_score',       # points of the opponent before the rally
+)
+
+UNKNOWN_PLAYER = -1
+
+
+class Events():
+    """Columnar table of every action the parser saw,  one row per event
+
+    kind RALLY marks the start of every rally,  player is the server and type is 1 for serve and 2 for reception,
+    the other kinds are the actions that the counters count.
+    All counters can be derived from the table,  new statistics are queries over columns
+    """
+
+    def __init__(self):
+
+        # tuples in the order of COLUMNS,  converted to arrays on demand
+        self.rows = []
+
+
+    # Getters
+
+    def __len__(self) -> int:
+
+        return len(self.rows)
+
+
+    @property
+    def columns(self) -> dict[str, np.ndarray]:
+
+        table = np.array(self.rows, dtype=np.int64).reshape(-1, len(COLUMNS))
+
+        return {name: table[:, i] for i, name in enumerate(COLUMNS)}
+
+
+    # Combining
+
+    def merge(self, other: 'Events') -> 'Events':
+        """appends the rows of other,  an empty Events() is the identity
+        """
+
+        assert isinstance(other, Events), f'Cannot merge {type(other).__name__} into Events'
+
+        self.rows.extend(other.rows)
+
+        return self
+
+
+    def __iadd__(self, other: 'Events') -> 'Events':
+
+        return self.merge(other)
+
+
+    def __add__(self, other: 'Events') -> 'Events':
+
+        return Events().merge(self).merge(other)
+
+
+    # Derived counters
+
+    def serves(self) -> Serves:
+
+        columns = self.columns
+        mask = columns['kind'] == SERVE
+
+        serves = Serves()
+        serves.tensor = _count(columns, mask, ('type', 'zone', 'outcome'), (4, 10, 4))
+
+        return serves
+
+
+    def receptions(self) -> Receptions:
+
+        columns = self.columns
+        mask = columns['kind'] == RECEPTION
+
+        receptions = Receptions()
+        receptions.tensor = _count(columns, mask, ('type', 'outcome'), (2, 4))
+
+        return receptions
+
+
+    def sets(self, complex: int) -> Sets:
+        """complex 3 are the K1 sets after a reception on position 1,  see SETS_K3 in data_classes/views.py
+        """
+
+        if complex == 3:
+            from data_classes.views import SETS_K3, evaluate_views
+
+            sets = Sets(complex=3)
+            sets.tensor = evaluate_views(self, [SETS_K3])[SETS_K3.name].tensor
+
+            return sets
+
+        columns = self.columns
+        mask = (columns['kind'] == SET) & (columns['complex'] == complex)
+
+        sets = count_sets(columns, mask)
+        sets.complex = complex
+
+        return sets
+
+
+    def hits(self) -> Hits:
+
+        columns = self.columns
+
+        return count_hits(columns, columns['kind'] == HIT)
+
+
+    def breaks(self) -> Breaks:
+        """serve -> serve is a won breakpoint,  reception -> reception a lost sideout,
+        both only count within the same set
+        """
+
+        columns = self.columns
+        mask = columns['kind'] == RALLY
+
+        sets, rallies = columns['set'][mask], columns['rally'][mask]
+        types, rotations, servers = columns['type'][mask], columns['rotation'][mask], columns['player'][mask]
+
+        repeated = np.zeros(len(types), dtype=bool)
+        repeated[1:] = (sets[1:] == sets[:-1]) & (rallies[1:] == rallies[:-1] + 1) & (types[1:] == types[:-1])
+
+        won = repeated & (types == 1)
+        lost = repeated & (types == 2)
+
+        balance = np.bincount(rotations[won], minlength=6) - np.bincount(rotations[lost], minlength=6)
+
+        breaks = Breaks()
+        breaks.breaks = {rotation: int(balance[rotation]) for rotation in range(6)}
+
+        players, rows = _first_appearance(servers[won])
+        breaks.player_breaks = dict(zip(players, np.bincount(rows, minlength=len(players)).tolist()))
+
+        return breaks
+
+
+    def rallies(self) -> Rallies:
+
+        columns = self.columns
+        mask = columns['kind'] == RALLY
+
+        rallies = Rallies()
+        rallies.rows = list(zip(*(columns[name][mask].tolist() for name in
+                                  ('set', 'rally', 'type', 'rotation', 'team_score', 'opponent_score'))))
+
+        return rallies
+
+
+    # Save
+
+    def save(self, filepath: str):
+        import os
+
+        np.savez(os.path.join(filepath, 'events.npz'), **self.columns)
+
+
+
+##############################    Group by    ##############################
+
+def _player(player: int) -> int | None:
+
+    return None if player == UNKNOWN_PLAYER else player
+
+
+def _first_appearance(values: np.ndarray) -> tuple[list, np.ndarray]:
+    """the distinct values in the order of their first appearance and the rank of every value in that order
+    """
+
+    keys, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+
+    order = np.argsort(first)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    return [_player(key) for key in keys[order].tolist()], rank[inverse]
+
+
+def count_sets(columns: dict[str, np.ndarray], mask: np.ndarray) -> Sets:
+    """the set rows in mask counted as Sets,  without a complex
+    """
+
+    sets = Sets(complex=None)
+    sets.tensor = _count(columns, mask, ('rotation', 'position', 'type'), (6, 7, 4), one_based=(False, True, True))
+
+    return sets
+
+
+def count_hits(columns: dict[str, np.ndarray], mask: np.ndarray) -> Hits:
+    """the hit rows in mask counted as Hits
+    """
+
+    hits = Hits()
+    hits.tensor = _count(columns, mask, ('position', 'type', 'zone', 'outcome'), (7, 4, 7, 5))
+
+    # positions per player in the order of their first hit from there
+    players, positions = columns['player'][mask], columns['position'][mask]
+    _, first = np.unique(players * 8 + positions, return_index=True)
+
+    hits.positions = {player: [] for player in hits.tensor.players}
+    for player, position in zip(players[np.sort(first)].tolist(), positions[np.sort(first)].tolist()):
+        hits.positions[_player(player)].append(position)
+
+    return hits
+
+
+def _count(columns: dict, mask: np.ndarray, axes: tuple[str, ...], shape: tuple[int, ...],
+           one_based: tuple[bool, ...] | None = None) -> CountTensor:
+    """group by player and the axes columns and count the rows,
+    the players keep the order of their first appearance just like the counters filled by the parser
+    """
+
+    one_based = one_based or (True,) * len(axes)
+
+    players, rows = _first_appearance(columns['player'][mask])
+
+    index = [rows]
+    for axis, offset in zip(axes, one_based):
+        index.append(columns[axis][mask] - offset)
+
+    tensor = CountTensor(shape)
+    for player in players:
+        tensor.row(player)
+
+    np.add.at(tensor.data, tuple(index), 1)
+
+    return tensor
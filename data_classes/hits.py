@@ -1,3 +1,6 @@
+from data_classes.counts import CountTensor
+
+
 class Hits():
     """
     middles:  1 quickset,  2 quickset behind,  3 shoot,  4 push
@@ -15,40 +18,132 @@ class Hits():
 
     def __init__(self):
 
-        self.hits = {}
+        self.tensor = CountTensor((7, 4, 7, 5))
+
+        # hitting positions of each player in the order they first occurred
+        self.positions = {}
+
+
+    # Getters
+
+    @property
+    def counts(self):
+        """player x hitting position x set type x zone x outcome,  all one down due to indexing,
+        the players are in the order of self.players
+        """
+        return self.tensor.counts
+
+
+    @property
+    def players(self) -> list:
+
+        return list(self.tensor.players)
+
+
+    @property
+    def hits(self) -> dict:
+        """the nested dict view,  as it is saved to hits.json,  only positions a player hit from are included
+        """
+
+        return {
+            player: {position: {set_type + 1: {hitting_zone + 1: {hitting_outcome + 1: count
+                for hitting_outcome, count in enumerate(hitting_zones)}
+                for hitting_zone, hitting_zones in enumerate(set_types)}
+                for set_type, set_types in enumerate(counts[position - 1])}
+                for position in self.positions[player]}
+            for player, counts in zip(self.tensor.players, self.counts.tolist())
+        }
 
 
     # Modifiers
 
     def add_player(self, player: int):
 
-        self.hits[player] = {}
+        self.tensor.row(player)
+
+        self.positions[player] = []
 
 
     def add_position_to_player(self, player: int, position: int):
 
-        self.hits[player][position] = {
-            set_type: {hitting_zone: {hitting_outcome: 0 
-                for hitting_outcome in range(1, 6)} 
-                for hitting_zone in range(1, 8)} 
-                for set_type in range(1, 5)
-        }
+        self.positions[player].append(position)
 
 
     def add_hit_to_player(self, player: int, hitting_position: int, set_type: int, hitting_zone: int, hitting_outcome: int):
 
-        if not player in self.hits:
+        tensor = self.tensor
+
+        row = tensor.players.get(player)
+        if row is None:
             self.add_player(player)
+            row = tensor.players[player]
 
-        if not hitting_position in self.hits[player]:
+        if not hitting_position in self.positions[player]:
             self.add_position_to_player(player, hitting_position)
 
         if hitting_position not in [3, 6] and hitting_outcome in [3, 4] and hitting_zone in [2, 3, 4]:
             raise Exception('Outcomes "block out" and "blocked" cannot be attributed to zones 2, 3, 4 for non middle or pipe attacks')
 
-        self.hits[player][hitting_position][set_type][hitting_zone][hitting_outcome] += 1
+        tensor.data[row, hitting_position - 1, set_type - 1, hitting_zone - 1, hitting_outcome - 1] += 1
+
+
+    # Combining
+
+    def merge(self, other: 'Hits') -> 'Hits':
+        """adds the counts of other to self in place,  an empty Hits() is the identity
+        """
+
+        assert isinstance(other, Hits), f'Cannot merge {type(other).__name__} into Hits'
+
+        for player, positions in other.positions.items():
+
+            if player not in self.positions:
+                self.positions[player] = []
+
+            self.positions[player].extend(position for position in positions if position not in self.positions[player])
+
+        self.tensor.merge(other.tensor)
+
+        return self
+
+
+    def __iadd__(self, other: 'Hits') -> 'Hits':
+
+        return self.merge(other)
+
+
+    def __add__(self, other: 'Hits') -> 'Hits':
+
+        return Hits().merge(self).merge(other)
+
+
+    def subtract(self, other: 'Hits') -> 'Hits':
+        """removes the counts of other from self in place,  the inverse of merge,
+        a position stays with a player as long as there are hits of the player from it
+        """
+
+        assert isinstance(other, Hits), f'Cannot subtract {type(other).__name__} from Hits'
+
+        self.tensor.subtract(other.tensor)
+
+        counts = self.tensor.counts
+        self.positions = {
+            player: [position for position in self.positions[player] if counts[row, position - 1].any()]
+            for player, row in self.tensor.players.items()
+        }
+
+        return self
+
+
+    def __isub__(self, other: 'Hits') -> 'Hits':
+
+        return self.subtract(other)
+
+
+    def __sub__(self, other: 'Hits') -> 'Hits':
+
+        return Hits().merge(self).subtract(other)
 
-    
 
     # Save
 
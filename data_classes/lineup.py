@@ -1,25 +1,61 @@
+# meta positions,  stored as small ints
+S = 0
+OH = 1
+MI = 2
+OP = 3
+
+META_NAMES = ('S', 'OH', 'MI', 'OP')
+
+
 class Lineup():
     """positions and rotations are always one down due to indexing in lists
     i.e. position 5 is at index 4 and rotation 5 will be given as 4
 
     meta positions are: OH, MI, OP, S
+
+    the players are kept in six fixed slots,  rotating only advances offset,
+    position i (0 - 5) is held by slots[(offset + i) % 6]
+
+    who receives and hits where only depends on the rotation,  see ROTATION_TABLES,
+    so rotating, substituting and every query allocate nothing
     """
 
+    __slots__ = ('setter', 'libero', 'slots', 'roles', 'offset', 'rotation')
+
     def __init__(self):
 
         self.setter: int
         self.libero: int
 
-        # lineup is supposed to be the actual lineup with the middle in the backcourt
-        # indeces are one down of position, i.e. position 1 is at index 0
-        self.lineup: list[int]
-        
-        # meta has to be correlated with self.lineup
-        self.meta: list[str]
+        # the starting lineup with the middle in the backcourt,  slot 0 started on position 1
+        self.slots: list[int]
+
+        # meta position of every slot,  one of S, OH, MI, OP
+        self.roles: list[int]
+
+        # number of rotations since the start
+        self.offset: int
+
+        # index of the setter in self.lineup,  kept up to date by rotate_lineup
+        self.rotation: int
 
 
     # getters
 
+    @property
+    def lineup(self) -> list[int]:
+        """the actual lineup,  indeces are one down of position, i.e. position 1 is at index 0
+        """
+        return self.slots[self.offset:] + self.slots[:self.offset]
+
+
+    @property
+    def meta(self) -> list[str]:
+        """correlated with self.lineup
+        """
+        return [META_NAMES[role] for role in self.roles[self.offset:] + self.roles[:self.offset]]
+
+
     def get_frontcourt(self) -> tuple[list]:
         """returns a tuple of lists, the first one is the actual lineup,
         the second one are the actual positions
@@ -39,128 +75,86 @@ class Lineup():
 
         the court positions are 1, 5, 6 in that order
         """
-        backcourt_players = [self.lineup[0]]
-        backcourt_players.extend(self.lineup[4:])
-
-        backcourt_meta = [self.meta[0]]
-        backcourt_meta.extend(self.meta[4:])
+        lineup, meta = self.lineup, self.meta
 
-        return backcourt_players, backcourt_meta
+        return [lineup[0]] + lineup[4:], [meta[0]] + meta[4:]
 
 
     def get_rotation(self) -> int:
         """Returns the rotation as values 0 - 5
         """
-        return self.lineup.index(self.setter)
+        return self.rotation
 
 
-    def get_receiving_players(self) -> dict:
-
-        rotation = self.get_rotation()
+    def get_player_on_index(self, index: int) -> int:
+        """index is the position index 0 - 5 as in ROTATION_TABLES,  or LIBERO
+        """
 
-        receiving_positions = {1: 0, 6: 0, 5: 0, 3: 0}
+        if index == LIBERO:
+            return self.libero
 
-        frontcourt_players, frontcourt_meta = self.get_frontcourt()
-        backcourt_players, backcourt_meta = self.get_backcourt()
+        return self.slots[(self.offset + index) % 6]
 
-        # determine position 3 receiver  --  always the frontcourt middle
-        receiving_positions[3] = frontcourt_players[frontcourt_meta.index('MI')]
 
-        # determine position 5 receiver  --  always an OH
-        if rotation == 0:
-            receiving_positions[5] = backcourt_players[backcourt_meta.index('OH')]
-            receiving_positions[1] = frontcourt_players[frontcourt_meta.index('OH')]
-        else:
-            receiving_positions[5] = frontcourt_players[frontcourt_meta.index('OH')]
-            
-            # if the backcourt OH is on position 1 he receives there, 
-            # else he receives on 6
-            player = backcourt_players[backcourt_meta.index('OH')]
-            if self.lineup.index(player) == 0:
-                receiving_positions[1] = player
-            else:
-                receiving_positions[6] = player
+    def get_receiving_players(self) -> dict:
 
-        empty_key = [key for key in receiving_positions if receiving_positions[key] == 0][0]
-        receiving_positions[empty_key] = self.libero
+        receivers, _ = ROTATION_TABLES[self.rotation]
 
-        return receiving_positions
+        return {position: self.get_player_on_index(index) for position, index in receivers.items()}
 
 
     def get_receiving_player_on_position(self, position: int) -> int:
 
-        receiving_positions = self.get_receiving_players()
-
-        return receiving_positions[position]
+        return self.get_player_on_index(ROTATION_TABLES[self.rotation][0][position])
 
 
     def get_hitting_player_on_position(self, position: int) -> int:
         """Careful! The position passed is given as 1 - 6, but the positions in the lineup are stored as 0 - 5
-
-        hopefully the other cases just don't occur, for example setter in front but set destination 2
         """
 
-        rotation = self.get_rotation()
+        index = ROTATION_TABLES[self.rotation][1][position]
+        if index is None:
+            return None
 
-        frontcourt_players, frontcourt_meta = self.get_frontcourt()
-        backcourt_players, backcourt_meta = self.get_backcourt()
+        return self.get_player_on_index(index)
 
-        if position == 1:
-            return backcourt_players[backcourt_meta.index('OP')]
 
-        if position == 2:
-            if rotation == 0:
-                return frontcourt_players[frontcourt_meta.index('OH')]
-            else:
-                return frontcourt_players[frontcourt_meta.index('OP')]
+    def get_server(self) -> int:
 
-        # middle was set
-        if position == 3:
-            return frontcourt_players[frontcourt_meta.index('MI')]
+        return self.slots[self.offset]
 
-        if position == 4:
-            if rotation == 0:
-                return frontcourt_players[frontcourt_meta.index('OP')]
-            else:
-                return frontcourt_players[frontcourt_meta.index('OH')]
 
-        if position == 6:
-            return backcourt_players[backcourt_meta.index('OH')]
+    # questions
 
-        # special case of setter dump
-        if position == 7:
-            return self.setter
+    def get_index_of_player(self, player: int) -> int:
+        """the position index 0 - 5 of player,  -1 if the player is not on the court
+        """
 
+        if player == self.setter:
+            return self.rotation
 
-    def get_server(self) -> int:
+        if player not in self.slots:
+            return -1
 
-        return self.lineup[0]
+        return (self.slots.index(player) - self.offset) % 6
 
 
-    # questions
-
     def is_in_frontcourt(self, player) -> bool:
 
-        frontcout_players, frontcourt_meta = self.get_frontcourt()
-
-        if player in frontcout_players:
-            return True
-        return False
+        return 1 <= self.get_index_of_player(player) <= 3
 
 
     def is_in_backcourt(self, player) -> bool:
 
-        backcourt_players, backcourt_meta = self.get_backcourt()
+        index = self.get_index_of_player(player)
 
-        if player in backcourt_players:
-            return True
-        return False
+        return index == 0 or index >= 4
 
 
     # modifiers
 
     def determine_lineup(self, lineup: str):
-        """3 15 8 11 13 12 12 2>.. .. .. 
+        """3 15 8 11 13 12 12 2>.. .. ..
         """
 
         lineup = list(map(int, lineup.split(' ')))
@@ -172,19 +166,22 @@ class Lineup():
         self.setter = lineup[-2]
 
         # the 6 people before that are the lineup
-        self.lineup = lineup[:-2]
+        self.slots = lineup[:-2]
+        self.offset = 0
 
         # determine meta
-        self.meta = ['', '', '', '', '', '']
+        self.roles = [S] * 6
+
+        setter_index = self.slots.index(self.setter)
 
-        setter_index = self.lineup.index(self.setter)
+        self.roles[setter_index] = S
+        self.roles[(setter_index + 3) % 6] = OP
+        self.roles[(setter_index + 1) % 6] = OH
+        self.roles[(setter_index + 4) % 6] = OH
+        self.roles[(setter_index + 2) % 6] = MI
+        self.roles[(setter_index + 5) % 6] = MI
 
-        self.meta[setter_index] = 'S'
-        self.meta[(setter_index + 3) % 6] = 'OP'
-        self.meta[(setter_index + 1) % 6] = 'OH'
-        self.meta[(setter_index + 4) % 6] = 'OH'
-        self.meta[(setter_index + 2) % 6] = 'MI'
-        self.meta[(setter_index + 5) % 6] = 'MI'
+        self.rotation = (self.slots.index(self.setter) - self.offset) % 6
 
 
     def modify_lineup(self, substitution: str):
@@ -196,15 +193,17 @@ class Lineup():
 
         # detect diagonal substitution
         if substitution == '<x>':
-            
+
             # then the substitutions already happened, I only need to change the setter value and the meta
-            opposite_index = self.meta.index('OP')
-            setter_index = self.meta.index('S')
+            opposite_slot = self.roles.index(OP)
+            setter_slot = self.roles.index(S)
 
-            self.meta[opposite_index] = 'S'
-            self.meta[setter_index] = 'OP'
+            self.roles[opposite_slot] = S
+            self.roles[setter_slot] = OP
 
-            self.setter = self.lineup[opposite_index]
+            self.setter = self.slots[opposite_slot]
+
+            self.rotation = (self.slots.index(self.setter) - self.offset) % 6
 
         else:
             relevant = substitution[1:-1]
@@ -215,19 +214,142 @@ class Lineup():
                 self.modify_libero(player_in)
 
             else:
-                assert player_out in self.lineup, \
+                assert player_out in self.slots, \
                     f'player {player_out} is not in the current lineup {self.lineup}'
 
-                self.lineup[self.lineup.index(player_out)] = player_in
+                self.slots[self.slots.index(player_out)] = player_in
 
                 if player_out == self.setter:
                     self.setter = player_in
 
+                self.rotation = (self.slots.index(self.setter) - self.offset) % 6
+
 
     def modify_libero(self, player_in):
         self.libero = player_in
 
 
     def rotate_lineup(self):
-        self.lineup = self.lineup[1:] + [self.lineup[0]]
-        self.meta = self.meta[1:] + [self.meta[0]]
\ No newline at end of file
+        self.offset = (self.offset + 1) % 6
+
+        # the setter moves one position down
+        self.rotation = (self.rotation - 1) % 6
+
+
+
+##############################    Rotation tables    ##############################
+
+def _receiving_players(lineup: list[int], roles: list[int], libero: int) -> dict:
+    """lineup and roles as seen from position 1,  the rotation is the index of the setter
+    """
+
+    rotation = roles.index(S)
+
+    receiving_positions = {1: 0, 6: 0, 5: 0, 3: 0}
+
+    frontcourt_players, frontcourt_roles = lineup[1:4], roles[1:4]
+    backcourt_players, backcourt_roles = [lineup[0]] + lineup[4:], [roles[0]] + roles[4:]
+
+    # determine position 3 receiver  --  always the frontcourt middle
+    receiving_positions[3] = frontcourt_players[frontcourt_roles.index(MI)]
+
+    # determine position 5 receiver  --  always an OH
+    if rotation == 0:
+        receiving_positions[5] = backcourt_players[backcourt_roles.index(OH)]
+        receiving_positions[1] = frontcourt_players[frontcourt_roles.index(OH)]
+    else:
+        receiving_positions[5] = frontcourt_players[frontcourt_roles.index(OH)]
+
+        # if the backcourt OH is on position 1 he receives there,
+        # else he receives on 6
+        player = backcourt_players[backcourt_roles.index(OH)]
+        if lineup.index(player) == 0:
+            receiving_positions[1] = player
+        else:
+            receiving_positions[6] = player
+
+    empty_key = [key for key in receiving_positions if receiving_positions[key] == 0][0]
+    receiving_positions[empty_key] = libero
+
+    return receiving_positions
+
+
+def _hitting_player(lineup: list[int], roles: list[int], setter: int, position: int) -> int | None:
+    """position is given as 1 - 6,  7 for the setter dump,  None if nobody hits from there
+
+    the parser corrects set destinations 1 and 2 to the court the opposite is in,
+    so a missing opposite on 1 or 2 is also None instead of an error
+    """
+
+    try:
+        return _find_hitting_player(lineup, roles, setter, position)
+    except ValueError:
+        return None
+
+
+def _find_hitting_player(lineup: list[int], roles: list[int], setter: int, position: int) -> int | None:
+    """hopefully the other cases just don't occur, for example setter in front but set destination 2
+    """
+
+    rotation = roles.index(S)
+
+    frontcourt_players, frontcourt_roles = lineup[1:4], roles[1:4]
+    backcourt_players, backcourt_roles = [lineup[0]] + lineup[4:], [roles[0]] + roles[4:]
+
+    if position == 1:
+        return backcourt_players[backcourt_roles.index(OP)]
+
+    if position == 2:
+        if rotation == 0:
+            return frontcourt_players[frontcourt_roles.index(OH)]
+        else:
+            return frontcourt_players[frontcourt_roles.index(OP)]
+
+    # middle was set
+    if position == 3:
+        return frontcourt_players[frontcourt_roles.index(MI)]
+
+    if position == 4:
+        if rotation == 0:
+            return frontcourt_players[frontcourt_roles.index(OP)]
+        else:
+            return frontcourt_players[frontcourt_roles.index(OH)]
+
+    if position == 6:
+        return backcourt_players[backcourt_roles.index(OH)]
+
+    # special case of setter dump
+    if position == 7:
+        return setter
+
+
+def _build_rotation_tables() -> tuple:
+    """Which position index (0 - 5) receives and hits in every rotation,  LIBERO for the libero,
+    per rotation a dict receiving position -> index and a tuple set destination -> index
+
+    The meta positions only depend on where the setter stands,  so this is the same for every lineup.
+    The tables are found by running the functions above on a lineup of the players 1 - 6 on the positions 1 - 6.
+    """
+
+    tables = []
+    for rotation in range(6):
+
+        lineup = [1, 2, 3, 4, 5, 6]
+        roles = [[S, OH, MI, OP, OH, MI][(index - rotation) % 6] for index in range(6)]
+
+        def index(player: int | None) -> int | None:
+            if player is None:
+                return None
+            return LIBERO if player == 7 else player - 1
+
+        receivers = {position: index(player) for position, player in _receiving_players(lineup, roles, 7).items()}
+        hitters = tuple(index(_hitting_player(lineup, roles, lineup[rotation], position)) for position in range(8))
+
+        tables.append((receivers, hitters))
+
+    return tuple(tables)
+
+
+LIBERO = 6
+
+ROTATION_TABLES = _build_rotation_tables()
\ No newline at end of file
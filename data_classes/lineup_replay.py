@@ -0,0 +1,139 @@
+"""Rotation and players on court at the start of every rally of a set,  from the tokens of its set line alone.
+
+Its only user is the offset index of parsing/index.py,  which needs the lineup at every rally without parsing the file.
+Resolving the players of the event table and of the bulk parser through it is not done,
+the parser,  the batch modes and the events keep their Lineup action by action.
+It could not replace that Lineup as it is:  a substitution within a rally only counts from the next rally on here,
+while the parser applies it right away to the rest of the rally.
+
+    replay = replay_set_line('3 15 8 11 13 12 12 2>.. . ..... . ....')
+    replay.rotation[0],  replay.court[0]      # rotation and players of the first rally
+"""
+
+import numpy as np
+
+from data_classes.lineup import Lineup, ROTATION_TABLES, LIBERO
+
+from parsing.tokenizer import tokenize
+
+
+def _table_as_array(column: int, size: int) -> np.ndarray:
+    """ROTATION_TABLES as rotation x position array,  -1 where nobody is defined
+    """
+
+    table = np.full((6, size), -1, dtype=np.int64)
+
+    for rotation, tables in enumerate(ROTATION_TABLES):
+        entries = tables[column].items() if isinstance(tables[column], dict) else enumerate(tables[column])
+
+        for position, index in entries:
+            if index is not None:
+                table[rotation, position] = index
+
+    return table
+
+
+# rotation x receiving position (1 - 6) and rotation x set destination (1 - 7) -> position index,  or LIBERO
+RECEIVER_INDEX = _table_as_array(0, 7)
+HITTER_INDEX = _table_as_array(1, 8)
+
+
+class LineupReplay():
+    """Rotation and players on court for every rally of one set,  reconstructed in one vectorized pass
+
+    The rotation only changes when a serve follows a reception,  so the offset of every rally is a cumulative sum.
+    The players only change at substitutions,  which are applied as patches to all following rallies.
+    All arrays are indexed by the rally,  0 - n within the set
+    """
+
+    def __init__(self, lineup: str, rally_types: np.ndarray, substitutions: list[tuple[int, str]]):
+        """lineup as in front of the '>' of a set line,
+        rally_types 1 for serve and 2 for reception for every rally,
+        substitutions as (rally,  e.g. '<12x13>') applied before that rally starts
+        """
+
+        rally_types = np.asarray(rally_types, dtype=np.int64)
+        rallies = len(rally_types)
+
+        start = Lineup()
+        start.determine_lineup(lineup)
+
+        # a serve after a reception is a side-out,  the team rotates
+        rotates = np.zeros(rallies, dtype=np.int64)
+        rotates[1:] = (rally_types[1:] == 1) & (rally_types[:-1] == 2)
+
+        self.offset = np.cumsum(rotates) % 6
+
+        # slots, setter slot and libero before any substitution,  then patched from every substitution onwards
+        self.slots = np.tile(np.array(start.slots, dtype=np.int64), (rallies, 1))
+        self.setter_slot = np.full(rallies, start.slots.index(start.setter), dtype=np.int64)
+        self.libero = np.full(rallies, start.libero, dtype=np.int64)
+
+        for rally, substitution in substitutions:
+            start.modify_lineup(substitution)
+
+            self.slots[rally:] = start.slots
+            self.setter_slot[rally:] = start.slots.index(start.setter)
+            self.libero[rally:] = start.libero
+
+        self.rotation = (self.setter_slot - self.offset) % 6
+
+        # the players in the order of the positions 1 - 6
+        positions = (self.offset[:, None] + np.arange(6)) % 6
+        self.court = np.take_along_axis(self.slots, positions, axis=1)
+
+        self.server = self.court[:, 0]
+        self.setter = self.court[np.arange(rallies), self.rotation]
+
+
+    # Getters
+
+    def players_on_index(self, rallies: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """indices are position indices 0 - 5 or LIBERO,  -1 gives -1
+        """
+
+        rallies, indices = np.asarray(rallies), np.asarray(indices)
+
+        players = self.court[rallies, np.clip(indices, 0, 5)]
+        players = np.where(indices == LIBERO, self.libero[rallies], players)
+
+        return np.where(indices < 0, -1, players)
+
+
+    def receivers(self, rallies: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """the receiving player for every pair of rally and receiving position
+        """
+
+        return self.players_on_index(rallies, RECEIVER_INDEX[self.rotation[rallies], positions])
+
+
+    def hitters(self, rallies: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """the hitting player for every pair of rally and set destination,  -1 if nobody hits from there
+        """
+
+        return self.players_on_index(rallies, HITTER_INDEX[self.rotation[rallies], destinations])
+
+
+    def setter_in_frontcourt(self) -> np.ndarray:
+
+        return (self.rotation >= 1) & (self.rotation <= 3)
+
+
+
+##############################    Set lines    ##############################
+
+def rally_structure(actions: str) -> tuple[np.ndarray, list[tuple[int, str]]]:
+    """the type of every rally and the substitutions of the actions of a set line,
+    in the form LineupReplay expects them
+    """
+
+    return tokenize(actions).rally_structure()
+
+
+def replay_set_line(line: str) -> LineupReplay:
+    """e.g. 3 15 8 11 13 12 12 2>.. . ..... . ....
+    """
+
+    lineup, actions = line.split('>', 1)
+
+    return LineupReplay(lineup, *rally_structure(actions))
@@ -0,0 +1,332 @@
+from data_classes.serves import Serves
+from data_classes.receptions import Receptions
+from data_classes.sets import Sets
+from data_classes.hits import Hits
+from data_classes.breaks import Breaks
+from data_classes.events import Events
+from data_classes.rallies import Rallies
+from data_classes.counts import add_counts, subtract_counts
+from data_classes.views import View, SETS_K3, HITS, evaluate_views, save_view
+
+
+# the counters a MatchResult can hold,  each is written to its own json files
+OUTPUTS = ('serves', 'receptions', 'sets_k1', 'sets_k2', 'sets_k3', 'hits', 'breaks')
+
+# output -> the json files its counter is written to
+JSON_FILES = {
+    'serves': ['serves.json'],
+    'receptions': ['receptions.json'],
+    'sets_k1': ['setsK1.json'],
+    'sets_k2': ['setsK2.json'],
+    'sets_k3': ['setsK3.json'],
+    'hits': ['hits.json'],
+    'breaks': ['breakpoints.json', 'breakpoints_players.json'],
+}
+
+
+def _new_counter(name: str):
+
+    if name == 'serves':
+        return Serves()
+
+    if name == 'receptions':
+        return Receptions()
+
+    if name.startswith('sets_k'):
+        return Sets(complex=int(name[-1]))
+
+    if name == 'hits':
+        return Hits()
+
+    return Breaks()
+
+
+class MatchResult():
+    """All counters filled by the parser for one match
+
+    sets_k3 counts the K1 sets after a reception on position 1
+    rallies is the index of every rally with the running score,  see data_classes/rallies.py
+    events is the columnar table of every action,  only filled if asked for since it grows with the match
+
+    outputs limits the counters to the given names of OUTPUTS,  the others are None
+    and the parser skips their bookkeeping,  None keeps all of them
+
+    views are additional slices of the sets and hits,  see data_classes/views.py,
+    the parser only collects the rows they need and evaluate_views counts them into self.views,
+    sets_k3 is such a view as well
+    """
+
+    def __init__(self, events: bool = False, outputs: set[str] | None = None, views: list[View] | None = None):
+
+        assert outputs is None or set(outputs) <= set(OUTPUTS), f'Unknown outputs {set(outputs) - set(OUTPUTS)}'
+        self.outputs = frozenset(OUTPUTS if outputs is None else outputs)
+
+        assert not events or len(self.outputs) == len(OUTPUTS), 'The events need every counter'
+
+        self.serves = Serves() if 'serves' in self.outputs else None
+
+        self.receptions = Receptions() if 'receptions' in self.outputs else None
+
+        self.sets_k1 = Sets(complex=1) if 'sets_k1' in self.outputs else None
+        self.sets_k2 = Sets(complex=2) if 'sets_k2' in self.outputs else None
+        self.sets_k3 = Sets(complex=3) if 'sets_k3' in self.outputs else None
+
+        self.hits = Hits() if 'hits' in self.outputs else None
+
+        self.breaks = Breaks() if 'breaks' in self.outputs else None
+
+        self.events = Events() if events else None
+
+        # every rally with the running score,  small enough to be always collected
+        self.rallies = Rallies()
+
+        # kind of scouting mistake the parser corrected -> count
+        self.anomalies = {}
+
+        # name -> Sets or Hits of every view but sets_k3
+        self.extra_views = list(views or [])
+        self.views = {}
+
+        # the rows the views are evaluated on,  the events if they are collected anyway,
+        # rows before evaluated are already counted
+        self.view_rows = None
+        if self._views():
+            self.view_rows = self.events if self.events is not None else Events()
+        self.evaluated = 0
+
+
+    def _views(self) -> list[View]:
+
+        return ([SETS_K3] if self.sets_k3 is not None else []) + self.extra_views
+
+
+    def _collects_view_rows(self) -> bool:
+        """whether the view rows are collected only for the views,  not as events
+        """
+
+        return self.view_rows is not None and self.view_rows is not self.events
+
+
+    def needs_hit_rows(self) -> bool:
+        """whether the parser has to collect every row for the views,  not only the sets
+        """
+
+        return any(view.kind == HITS for view in self.extra_views)
+
+
+    def evaluate_views(self):
+        """counts the rows collected since the last evaluation into the views
+        """
+
+        if self.view_rows is None or self.evaluated == len(self.view_rows):
+            return
+
+        rows = Events()
+        rows.rows = self.view_rows.rows[self.evaluated:]
+
+        for name, counter in evaluate_views(rows, self._views()).items():
+
+            if name == SETS_K3.name:
+                self.sets_k3.tensor.merge(counter.tensor)
+
+            elif name in self.views:
+                self.views[name].merge(counter)
+
+            else:
+                self.views[name] = counter
+
+        # rows of the events are kept,  the rows only collected for the views are not
+        if self.view_rows is self.events:
+            self.evaluated = len(self.view_rows)
+        else:
+            self.view_rows.rows.clear()
+
+
+    @staticmethod
+    def from_events(events: Events) -> 'MatchResult':
+        """derives every counter from the event table,  equal to what the parser counts directly
+        """
+
+        result = MatchResult()
+
+        result.serves = events.serves()
+
+        result.receptions = events.receptions()
+
+        result.sets_k1 = events.sets(complex=1)
+        result.sets_k2 = events.sets(complex=2)
+        result.sets_k3 = events.sets(complex=3)
+
+        result.hits = events.hits()
+
+        result.breaks = events.breaks()
+
+        result.events = events
+
+        result.rallies = events.rallies()
+
+        return result
+
+
+    # Save
+
+    def save(self, filepath: str, format: str = 'json', sources: dict[str, str] | None = None, rallies: bool = True):
+        """writes the json files of the counters,  all seven as analysis.py always wrote unless outputs was limited,
+        one json file per additional view,  rallies.npz and events.npz if the events were collected
+
+        format npy writes the container of data_classes/store.py instead of the json files,  both writes both,
+        json removes a container of an earlier run,  the generators would read it before the json files,
+        sources are the sha256 of the scouting files by name,  kept in the container to tell when it is stale
+
+        the json files of the outputs not counted are removed,  an earlier run with more outputs left them behind,
+        rallies False removes rallies.npz instead of writing it,  for the sums of many matches,
+        their rows cannot be told apart by match
+        """
+        import os
+
+        assert format in ['json', 'npy', 'both'], f'Format {format} is not defined'
+
+        self.evaluate_views()
+
+        counters = [getattr(self, name) for name in OUTPUTS if getattr(self, name) is not None]
+
+        if format != 'npy':
+            for counter in counters:
+                counter.save(filepath)
+
+            for name, counter in self.views.items():
+                save_view(counter, name, filepath)
+
+        from data_classes.store import save_store, remove_store, stem_of
+
+        if format != 'json':
+            save_store({stem_of(counter): counter for counter in counters} | self.views, filepath, sources)
+        else:
+            remove_store(filepath)
+
+        for name in OUTPUTS:
+            if name in self.outputs:
+                continue
+
+            for file in JSON_FILES[name]:
+                if os.path.exists(os.path.join(filepath, file)):
+                    os.remove(os.path.join(filepath, file))
+
+        if rallies:
+            self.rallies.save(filepath)
+        elif os.path.exists(os.path.join(filepath, 'rallies.npz')):
+            os.remove(os.path.join(filepath, 'rallies.npz'))
+
+        if self.events is not None:
+            self.events.save(filepath)
+
+
+    # Combining
+
+    def merge(self, other: 'MatchResult') -> 'MatchResult':
+        """adds the counts of other to self in place,  other is left unchanged,  an empty MatchResult() is the identity
+
+        players and positions new to self are appended in the order of other,
+        counters missing in other are left as they are,  counters missing in self are added,
+        rows of other the views did not count yet are only counted by the next evaluate_views,  save calls it
+        """
+
+        # rows of other which are not counted yet are counted together with the rows of self,
+        # copied,  other counts them into its own views once it is evaluated
+        if self._collects_view_rows() and other._collects_view_rows() and \
+                [view.name for view in self._views()] == [view.name for view in other._views()]:
+            self.view_rows.rows.extend(other.view_rows.rows)
+        else:
+            self.evaluate_views()
+            other.evaluate_views()
+
+        for name in OUTPUTS:
+            counter = getattr(other, name)
+            if counter is None:
+                continue
+
+            if getattr(self, name) is None:
+                setattr(self, name, _new_counter(name))
+                self.outputs = self.outputs | {name}
+
+            getattr(self, name).merge(counter)
+
+        for name, counter in other.views.items():
+            if name not in self.views:
+                self.views[name] = Sets(complex=None) if isinstance(counter, Sets) else Hits()
+
+            self.views[name].merge(counter)
+
+        add_counts(self.anomalies, other.anomalies)
+
+        self.rallies.merge(other.rallies)
+
+        if other.events is not None:
+            if self.events is None:
+                self.events = Events()
+            self.events.merge(other.events)
+
+            # the rows of other were counted by other already
+            if self.view_rows is self.events:
+                self.evaluated = len(self.events)
+
+        return self
+
+
+    def __iadd__(self, other: 'MatchResult') -> 'MatchResult':
+
+        return self.merge(other)
+
+
+    def __add__(self, other: 'MatchResult') -> 'MatchResult':
+
+        result = MatchResult(outputs=self.outputs, views=self.extra_views).merge(self).merge(other)
+        result.evaluate_views()
+
+        return result
+
+
+    def subtract(self, other: 'MatchResult') -> 'MatchResult':
+        """removes the counts of other from self in place,  the inverse of merge,
+        e.g. to replace a match in a rollup,  see parsing/rollups.py
+
+        only the counters,  the views and the anomalies are subtracted,  every counter of other has to be in self,
+        the rows of the rallies and events do not say which match they came from,
+        therefore self is left without them,  rallies empty and events None
+        """
+
+        self.evaluate_views()
+        other.evaluate_views()
+
+        self.rallies = Rallies()
+        self.events = None
+
+        # the views were evaluated on the events,  new rows are collected on their own from now on
+        if self.view_rows is not None and self.evaluated:
+            self.view_rows = Events()
+            self.evaluated = 0
+
+        for name in OUTPUTS:
+            counter = getattr(other, name)
+            if counter is None:
+                continue
+
+            assert getattr(self, name) is not None, f'Cannot subtract {name},  it is not counted'
+            getattr(self, name).subtract(counter)
+
+        for name, counter in other.views.items():
+            self.views[name].subtract(counter)
+
+        subtract_counts(self.anomalies, other.anomalies)
+
+        return self
+
+
+    def __isub__(self, other: 'MatchResult') -> 'MatchResult':
+
+        return self.subtract(other)
+
+
+    def __sub__(self, other: 'MatchResult') -> 'MatchResult':
+
+        return MatchResult(outputs=self.outputs, views=self.extra_views).merge(self).subtract(other)
@@ -0,0 +1,117 @@
+"""Index of every rally with the running score,  for breakdowns by the score situation.
+
+The notation has no score,  it follows from who serves:  the team serving the next rally won the rally before.
+The last rally of a set has no next rally,  its winner is whoever reaches a valid final score with it.
+
+A situation is a mask over the columns,  e.g. the rallies at 20 points or more
+
+    columns = result.rallies.columns
+    late = (columns['team_score'] >= 20) | (columns['opponent_score'] >= 20)
+
+the events carry the same score columns,  so views can be built on it as well,  see data_classes/views.py
+"""
+
+import numpy as np
+
+
+RALLY_COLUMNS = (
+    'set',              # 1 - 5,  the number of the set line
+    'rally',            # 1 - n within the set
+    'serving',          # 1 the team serves,  2 the opponent serves
+    'rotation',         # 0 - 5 at the start of the rally
+    'team_score',       # points of the team before the rally
+    'opponent_score',   # points of the opponent before the rally
+)
+
+# winners of a rally,  the derived column won
+TEAM = 1
+OPPONENT = 2
+UNKNOWN = 0
+
+
+class Rallies():
+    """Compact table of the rallies,  one row per rally,  filled by the parser for every match
+    """
+
+    def __init__(self):
+
+        # tuples in the order of RALLY_COLUMNS,  converted to arrays on demand
+        self.rows = []
+
+
+    # Getters
+
+    def __len__(self) -> int:
+
+        return len(self.rows)
+
+
+    @property
+    def columns(self) -> dict[str, np.ndarray]:
+        """the columns of RALLY_COLUMNS and won,  the winner of every rally
+        """
+
+        table = np.array(self.rows, dtype=np.int64).reshape(-1, len(RALLY_COLUMNS))
+        columns = {name: table[:, i] for i, name in enumerate(RALLY_COLUMNS)}
+
+        columns['won'] = _winners(columns)
+
+        return columns
+
+
+    # Combining
+
+    def merge(self, other: 'Rallies') -> 'Rallies':
+        """appends the rows of other,  an empty Rallies() is the identity
+        """
+
+        assert isinstance(other, Rallies), f'Cannot merge {type(other).__name__} into Rallies'
+
+        self.rows.extend(other.rows)
+
+        return self
+
+
+    def __iadd__(self, other: 'Rallies') -> 'Rallies':
+
+        return self.merge(other)
+
+
+    def __add__(self, other: 'Rallies') -> 'Rallies':
+
+        return Rallies().merge(self).merge(other)
+
+
+    # Save
+
+    def save(self, filepath: str):
+        import os
+
+        np.savez(os.path.join(filepath, 'rallies.npz'), **self.columns)
+
+
+
+##############################    Winners    ##############################
+
+def _winners(columns: dict[str, np.ndarray]) -> np.ndarray:
+    """the serving side of the next rally of the same set,  the last rally of a set is decided by the final score
+    """
+
+    sets, rallies, serving = columns['set'], columns['rally'], columns['serving']
+    team, opponent = columns['team_score'], columns['opponent_score']
+
+    won = np.full(len(serving), UNKNOWN, dtype=np.int64)
+
+    # rows of the same set follow each other,  a new set starts with rally 1 again
+    next_in_set = (sets[1:] == sets[:-1]) & (rallies[1:] == rallies[:-1] + 1)
+    won[:-1][next_in_set] = serving[1:][next_in_set]
+
+    last = np.ones(len(serving), dtype=bool)
+    last[:-1] = ~next_in_set
+
+    # 25 points,  15 in the fifth set,  with two points ahead
+    target = np.where(sets == 5, 15, 25)
+    won[last & (team + 1 >= target) & (team + 1 - opponent >= 2)] = TEAM
+    won[last & (opponent + 1 >= target) & (opponent + 1 - team >= 2)] = OPPONENT
+
+    return won
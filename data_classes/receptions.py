@@ -1,27 +1,103 @@
+from data_classes.counts import CountTensor
+
+
 class Receptions():
+    """counts are stored as player x type x outcome,  all one down due to indexing
+    """
 
     def __init__(self):
 
-        self.receptions = {}
+        self.tensor = CountTensor((2, 4))
+
+
+    # Getters
+
+    @property
+    def counts(self):
+        """player x type x outcome,  the players are in the order of self.players
+        """
+        return self.tensor.counts
+
+
+    @property
+    def players(self) -> list:
+
+        return list(self.tensor.players)
+
+
+    @property
+    def receptions(self) -> dict:
+        """the nested dict view,  as it is saved to receptions.json
+        """
+
+        return {
+            player: {type_ + 1: {outcome + 1: count
+                for outcome, count in enumerate(types)}
+                for type_, types in enumerate(counts)}
+            for player, counts in zip(self.tensor.players, self.counts.tolist())
+        }
 
     
     # Modifier
 
     def add_player(self, player: int):
 
-        self.receptions[player] = {
-            type_: {outcome: 0 
-                for outcome in range(1, 5)} 
-                for type_ in range(1, 3)
-        }
+        self.tensor.row(player)
 
 
     def add_reception_to_player(self, player, type_, outcome):
 
-        if not player in self.receptions:
-            self.add_player(player)
+        tensor = self.tensor
+
+        row = tensor.players.get(player)
+        if row is None:
+            row = tensor.row(player)
+
+        tensor.data[row, type_ - 1, outcome - 1] += 1
+
+
+    # Combining
+
+    def merge(self, other: 'Receptions') -> 'Receptions':
+        """adds the counts of other to self in place,  an empty Receptions() is the identity
+        """
+
+        assert isinstance(other, Receptions), f'Cannot merge {type(other).__name__} into Receptions'
+
+        self.tensor.merge(other.tensor)
+
+        return self
+
+
+    def __iadd__(self, other: 'Receptions') -> 'Receptions':
+
+        return self.merge(other)
+
+
+    def __add__(self, other: 'Receptions') -> 'Receptions':
+
+        return Receptions().merge(self).merge(other)
+
+
+    def subtract(self, other: 'Receptions') -> 'Receptions':
+        """removes the counts of other from self in place,  the inverse of merge
+        """
+
+        assert isinstance(other, Receptions), f'Cannot subtract {type(other).__name__} from Receptions'
+
+        self.tensor.subtract(other.tensor)
+
+        return self
+
+
+    def __isub__(self, other: 'Receptions') -> 'Receptions':
+
+        return self.subtract(other)
+
+
+    def __sub__(self, other: 'Receptions') -> 'Receptions':
 
-        self.receptions[player][type_][outcome] += 1
+        return Receptions().merge(self).subtract(other)
 
 
     # Save
@@ -1,32 +1,108 @@
+from data_classes.counts import CountTensor
+
+
 class Serves():
     """
     zones 1 - 9, all the relevant zones in the backcourt + 2 frontcourt zones
     zone 10,  not attributable in case of error
+
+    counts are stored as player x type x zone x outcome,  all one down due to indexing
     """
 
     def __init__(self):
 
-        self.serves = {}
+        self.tensor = CountTensor((4, 10, 4))
+
+
+    # Getters
+
+    @property
+    def counts(self):
+        """player x type x zone x outcome,  the players are in the order of self.players
+        """
+        return self.tensor.counts
+
+
+    @property
+    def players(self) -> list:
+
+        return list(self.tensor.players)
+
+
+    @property
+    def serves(self) -> dict:
+        """the nested dict view,  as it is saved to serves.json
+        """
+
+        return {
+            player: {type_ + 1: {zone + 1: {outcome + 1: count
+                for outcome, count in enumerate(zones)}
+                for zone, zones in enumerate(types)}
+                for type_, types in enumerate(counts)}
+            for player, counts in zip(self.tensor.players, self.counts.tolist())
+        }
 
     
     # Modifier
 
     def add_player(self, player: int) -> None:
 
-        self.serves[player] = {
-            type_: {zone: {outcome: 0 
-                for outcome in range(1, 5)} 
-                for zone in range(1, 11)}
-                for type_ in range(1, 5)        
-        }
+        self.tensor.row(player)
 
 
     def add_serve_to_player(self, player: int, type_: int, zone: int, outcome: int) -> None:
 
-        if not player in self.serves:
-            self.add_player(player)
+        tensor = self.tensor
+
+        row = tensor.players.get(player)
+        if row is None:
+            row = tensor.row(player)
+
+        tensor.data[row, type_ - 1, zone - 1, outcome - 1] += 1
+
+
+    # Combining
+
+    def merge(self, other: 'Serves') -> 'Serves':
+        """adds the counts of other to self in place,  an empty Serves() is the identity
+        """
+
+        assert isinstance(other, Serves), f'Cannot merge {type(other).__name__} into Serves'
+
+        self.tensor.merge(other.tensor)
+
+        return self
+
+
+    def __iadd__(self, other: 'Serves') -> 'Serves':
+
+        return self.merge(other)
+
+
+    def __add__(self, other: 'Serves') -> 'Serves':
+
+        return Serves().merge(self).merge(other)
+
+
+    def subtract(self, other: 'Serves') -> 'Serves':
+        """removes the counts of other from self in place,  the inverse of merge
+        """
+
+        assert isinstance(other, Serves), f'Cannot subtract {type(other).__name__} from Serves'
+
+        self.tensor.subtract(other.tensor)
+
+        return self
+
+
+    def __isub__(self, other: 'Serves') -> 'Serves':
+
+        return self.subtract(other)
+
+
+    def __sub__(self, other: 'Serves') -> 'Serves':
 
-        self.serves[player][type_][zone][outcome] += 1
+        return Serves().merge(self).subtract(other)
 
 
     # Save
@@ -1,3 +1,6 @@
+from data_classes.counts import CountTensor
+
+
 class Sets():
     """
     set destinations:  1-6 = pos 1-6,  7 setter dump
@@ -6,30 +9,111 @@ class Sets():
     outsides/dia:  1 shoot,  2 normal,  3 high
     setter:  1 always
 
-    complex:  1 for K1,  2 for K2,  3 for reception behind the setter
+    complex:  1 for K1,  2 for K2,  3 for reception behind the setter,  None for the sets of a view,  see data_classes/views.py
+
+    counts are stored as player x rotation x set destination x set type,
+    rotation is already 0 - 5,  destination and type are one down due to indexing
     """
 
-    def __init__(self, complex: int):
+    def __init__(self, complex: int | None):
 
-        assert complex in [1, 2, 3], f'Complex {complex} is not defined'
+        assert complex in [1, 2, 3, None], f'Complex {complex} is not defined'
 
-        self.sets = {}
+        self.tensor = CountTensor((6, 7, 4))
         self.complex = complex
 
+
+    # Getters
+
+    @property
+    def counts(self):
+        """player x rotation x set destination x set type,  the players are in the order of self.players
+        """
+        return self.tensor.counts
+
+
+    @property
+    def players(self) -> list:
+
+        return list(self.tensor.players)
+
+
+    @property
+    def sets(self) -> dict:
+        """the nested dict view,  as it is saved to setsK{complex}.json
+        """
+
+        return {
+            player: {rotation: {set_destination + 1: {set_type + 1: count
+                for set_type, count in enumerate(set_destinations)}
+                for set_destination, set_destinations in enumerate(rotations)}
+                for rotation, rotations in enumerate(counts)}
+            for player, counts in zip(self.tensor.players, self.counts.tolist())
+        }
+
     
     # Modifier
 
     def add_player(self, player: int):
 
-        self.sets[player] = {rotation: {set_destination: {set_type: 0 for set_type in range(1, 5)} for set_destination in range(1, 8)} for rotation in range(6)}
+        self.tensor.row(player)
 
 
     def add_set_to_player(self, player: int, rotation: int, set_destination: int, set_type: int):
 
-        if not player in self.sets:
-            self.add_player(player)
+        tensor = self.tensor
+
+        row = tensor.players.get(player)
+        if row is None:
+            row = tensor.row(player)
+
+        tensor.data[row, rotation, set_destination - 1, set_type - 1] += 1
+
+
+    # Combining
+
+    def merge(self, other: 'Sets') -> 'Sets':
+        """adds the counts of other to self in place,  an empty Sets(complex=self.complex) is the identity
+        """
+
+        assert isinstance(other, Sets), f'Cannot merge {type(other).__name__} into Sets'
+        assert other.complex == self.complex, f'Cannot merge K{other.complex} sets into K{self.complex} sets'
+
+        self.tensor.merge(other.tensor)
+
+        return self
+
+
+    def __iadd__(self, other: 'Sets') -> 'Sets':
+
+        return self.merge(other)
+
+
+    def __add__(self, other: 'Sets') -> 'Sets':
+
+        return Sets(complex=self.complex).merge(self).merge(other)
+
+
+    def subtract(self, other: 'Sets') -> 'Sets':
+        """removes the counts of other from self in place,  the inverse of merge
+        """
+
+        assert isinstance(other, Sets), f'Cannot subtract {type(other).__name__} from Sets'
+        assert other.complex == self.complex, f'Cannot subtract K{other.complex} sets from K{self.complex} sets'
+
+        self.tensor.subtract(other.tensor)
+
+        return self
+
+
+    def __isub__(self, other: 'Sets') -> 'Sets':
+
+        return self.subtract(other)
+
+
+    def __sub__(self, other: 'Sets') -> 'Sets':
 
-        self.sets[player][rotation][set_destination][set_type] += 1
+        return Sets(complex=self.complex).merge(self).subtract(other)
 
 
     # Save
@@ -0,0 +1,351 @@
+"""Binary store of the counters,  an alternative to the indent=4 json files.
+
+A match is one container,  analysis/analysis.npz,  an uncompressed npz with a table of contents,  e.g.
+
+    "setsK1": {"kind": "sets",  "axes": ["rotation", "destination", "set_type"],  "first": [0, 1, 1],
+               "arrays": {"counts": "setsK1.counts",  "players": "setsK1.players"}}
+
+counts has one row per player in the order of players,  then one axis per entry of axes,
+first is the label of index 0 of every axis,  i.e. the key of the json files,
+the players are jersey numbers,  UNKNOWN_PLAYER for a hitter the lineup does not know.
+The table of contents also has the sha256 of every scouting file the counts come from,  see Store.stale.
+
+Nothing is decoded before it is used,  the arrays of a section are memory-mapped straight out of the container.
+load_counter gives back the data class,  from the container if there is one and from the json files otherwise.
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from data_classes.serves import Serves
+from data_classes.receptions import Receptions
+from data_classes.sets import Sets
+from data_classes.hits import Hits
+from data_classes.breaks import Breaks
+from data_classes.events import UNKNOWN_PLAYER
+
+
+# bump whenever the layout of the arrays changes
+STORE_VERSION = 2
+
+CONTAINER = 'analysis.npz'
+
+# file stem -> axes after the player axis and their first labels
+AXES = {
+    'serves': (('type', 'zone', 'outcome'), (1, 1, 1)),
+    'receptions': (('type', 'outcome'), (1, 1)),
+    'sets': (('rotation', 'destination', 'set_type'), (0, 1, 1)),
+    'hits': (('position', 'set_type', 'zone', 'outcome'), (1, 1, 1, 1)),
+    'breakpoints': (('rotation',), (0,)),
+}
+
+
+_KINDS = {Serves: 'serves', Receptions: 'receptions', Sets: 'sets', Hits: 'hits', Breaks: 'breakpoints'}
+
+
+def stem_of(counter) -> str:
+    """the name the json file of counter has,  without .json
+    """
+
+    if isinstance(counter, Sets):
+        return f'setsK{counter.complex}'
+
+    return _KINDS[type(counter)]
+
+
+
+##############################    Save    ##############################
+
+def save_store(counters: dict, filepath: str, sources: dict[str, str] | None = None):
+    """counters by stem,  e.g. {'serves': Serves,  'setsK1': Sets,  'sets_k1_good': Sets},  see stem_of,
+    sources the sha256 of every scouting file by its name,  see digest_of
+
+    written to a temporary file first,  a reader sees the container of the last run or of this one
+    """
+
+    toc = {'version': STORE_VERSION, 'sources': sources or {}, 'sections': {}}
+    arrays = {}
+
+    for stem, counter in counters.items():
+        toc['sections'][stem] = _section(counter, stem, arrays)
+
+    path = os.path.join(filepath, CONTAINER)
+
+    # np.savez stores the members uncompressed,  which is what lets Store map them
+    with open(path + '.tmp', 'wb') as file:
+        np.savez(file, toc=json.dumps(toc), **arrays)
+
+    os.replace(path + '.tmp', path)
+
+
+def remove_store(filepath: str):
+    """without the container the json files are read
+    """
+
+    if os.path.exists(os.path.join(filepath, CONTAINER)):
+        os.remove(os.path.join(filepath, CONTAINER))
+
+
+def digest_of(path: str | os.PathLike) -> str:
+    """sha256 of the bytes of a scouting file
+    """
+
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _section(counter, stem: str, arrays: dict[str, np.ndarray]) -> dict:
+    """adds the arrays of counter to arrays and returns its entry of the table of contents
+    """
+
+    kind = _KINDS[type(counter)]
+    axes, first = AXES[kind]
+
+    section = {'kind': kind, 'axes': list(axes), 'first': list(first), 'arrays': {}}
+
+    def add(name: str, array: np.ndarray):
+        arrays[f'{stem}.{name}'] = array
+        section['arrays'][name] = f'{stem}.{name}'
+
+    if isinstance(counter, Breaks):
+        add('counts', np.array([counter.breaks[rotation] for rotation in range(6)], dtype=np.int64))
+        players = list(counter.player_breaks)
+
+        # the breaks per player have no further axes
+        add('player_counts', np.array(list(counter.player_breaks.values()), dtype=np.int64))
+
+    else:
+        add('counts', counter.counts)
+        players = counter.players
+
+    add('players', _players(players))
+
+    # the positions every player hit from,  in the order of the first hit,  0 filled
+    if isinstance(counter, Hits):
+        positions = np.zeros((len(players), 7), dtype=np.int64)
+        for row, player in enumerate(players):
+            positions[row, :len(counter.positions[player])] = counter.positions[player]
+
+        add('positions', positions)
+
+    return section
+
+
+def _players(players: list) -> np.ndarray:
+
+    return np.array([UNKNOWN_PLAYER if player is None else player for player in players], dtype=np.int64)
+
+
+
+##############################    Store    ##############################
+
+class Store():
+    """the container of a match,  only the table of contents is read when it is opened
+
+        store = Store('analysis/analysis.npz')
+        hits = store.counter('hits')
+    """
+
+    def __init__(self, path: str | os.PathLike):
+
+        self.path = os.fspath(path)
+
+        with zipfile.ZipFile(self.path) as archive:
+            self.members = {info.filename: info for info in archive.infolist()}
+
+            with archive.open('toc.npy') as file:
+                toc = json.loads(str(np.lib.format.read_array(file)))
+
+        assert toc['version'] == STORE_VERSION, f'{self.path} is of version {toc["version"]},  run analysis.py again'
+
+        self.sources = toc['sources']
+        self.sections = toc['sections']
+
+        # decoded sections by stem
+        self._counters = {}
+
+
+    # Getters
+
+    def __contains__(self, stem: str) -> bool:
+
+        return stem in self.sections
+
+
+    def counter(self, stem: str):
+        """the section stem as its data class,  decoded on the first call
+        """
+
+        assert stem in self, f'{self.path} has no {stem},  only {", ".join(self.sections)}'
+
+        if stem not in self._counters:
+            self._counters[stem] = self._decode(stem, self.sections[stem])
+
+        return self._counters[stem]
+
+
+    def array(self, name: str) -> np.ndarray:
+        """the member name mapped copy on write,  changes never reach the file
+        """
+
+        info = self.members[name + '.npy']
+        assert info.compress_type == zipfile.ZIP_STORED, f'{name} of {self.path} is compressed'
+
+        with open(self.path, 'rb') as file:
+
+            # the local header of a member has a name and an extra field of its own length
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(file.read(4), dtype='<u2').tolist()
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+
+            read_header = {(1, 0): np.lib.format.read_array_header_1_0,
+                           (2, 0): np.lib.format.read_array_header_2_0}[np.lib.format.read_magic(file)]
+            shape, fortran_order, dtype = read_header(file)
+            offset = file.tell()
+
+        # an empty array can not be mapped
+        if 0 in shape:
+            return np.zeros(shape, dtype=dtype)
+
+        return np.memmap(self.path, dtype=dtype, mode='c', offset=offset, shape=shape,
+                         order='F' if fortran_order else 'C')
+
+
+    def stale(self, directory: str) -> list[str]:
+        """the scouting files in directory which changed since the counts were computed,  or are gone
+        """
+
+        stale = []
+        for name, digest in self.sources.items():
+            path = os.path.join(directory, name)
+
+            if not os.path.exists(path) or digest_of(path) != digest:
+                stale.append(name)
+
+        return stale
+
+
+    def _decode(self, stem: str, section: dict):
+
+        def load(name: str) -> np.ndarray:
+            return self.array(section['arrays'][name])
+
+        players = [_player(player) for player in load('players').tolist()]
+
+        if section['kind'] == 'breakpoints':
+            breaks = Breaks()
+            breaks.breaks = dict(enumerate(load('counts').tolist()))
+            breaks.player_breaks = dict(zip(players, load('player_counts').tolist()))
+
+            return breaks
+
+        counter = _new_counter(stem, section['kind'])
+        counter.tensor.players = {player: row for row, player in enumerate(players)}
+        counter.tensor.data = load('counts')
+
+        if section['kind'] == 'hits':
+            counter.positions = {player: [position for position in positions if position]
+                                 for player, positions in zip(players, load('positions').tolist())}
+
+        return counter
+
+
+
+##############################    Load    ##############################
+
+def open_store(filepath: str) -> Store | None:
+    """the container in filepath,  None if the analysis was only written as json
+    """
+
+    path = os.path.join(filepath, CONTAINER)
+
+    return Store(path) if os.path.exists(path) else None
+
+
+def load_counter(filepath: str, stem: str):
+    """the counter saved as stem,  e.g. 'hits' or 'setsK1',  as its data class
+
+    from the container if there is one,  see Store,  from the json file otherwise
+    """
+
+    store = open_store(filepath)
+
+    if store is not None and stem in store:
+        return store.counter(stem)
+
+    return _load_json(filepath, stem)
+
+
+def counts_of(counter, player: int | None) -> np.ndarray:
+    """the counts of one player,  zeros if the player has none
+    """
+
+    row = counter.tensor.players.get(player)
+    if row is None:
+        return np.zeros(counter.tensor.data.shape[1:], dtype=np.int64)
+
+    return counter.tensor.data[row]
+
+
+def _player(player: int) -> int | None:
+
+    return None if player == UNKNOWN_PLAYER else player
+
+
+def _new_counter(stem: str, kind: str):
+
+    if kind == 'sets':
+        return Sets(complex=int(stem[-1]) if stem[:-1] == 'setsK' else None)
+
+    return {'serves': Serves, 'receptions': Receptions, 'hits': Hits}[kind]()
+
+
+def _load_json(filepath: str, stem: str):
+    """the json files have string keys,  every level is converted back to the index it was written from
+    """
+
+    def read(name: str) -> dict:
+        with open(os.path.join(filepath, f'{name}.json'), 'r', encoding='utf-8') as infile:
+            return json.load(infile)
+
+    def player(key: str) -> int | None:
+        return None if key == 'null' else int(key)
+
+    if stem == 'breakpoints':
+        breaks = Breaks()
+        breaks.breaks = {int(rotation): count for rotation, count in read('breakpoints').items()}
+        breaks.player_breaks = {player(key): count for key, count in read('breakpoints_players').items()}
+
+        return breaks
+
+    # the views have no fixed name,  only the seven outputs can be told apart by it
+    kind = 'sets' if stem in ['setsK1', 'setsK2', 'setsK3'] else stem
+    assert kind in AXES, f'{stem}.json can only be loaded from the binary store'
+    _, first = AXES[kind]
+
+    counter = _new_counter(stem, kind)
+    data = read(stem)
+
+    for key, nested in data.items():
+        row = counter.tensor.row(player(key))
+        _fill(counter.tensor.data[row], nested, first)
+
+    if kind == 'hits':
+        counter.positions = {player(key): [int(position) for position in nested] for key, nested in data.items()}
+
+    return counter
+
+
+def _fill(counts: np.ndarray, nested: dict, first: tuple[int, ...]):
+
+    for key, value in nested.items():
+        index = int(key) - first[0]
+
+        if isinstance(value, dict):
+            _fill(counts[index], value, first[1:])
+        else:
+            counts[index] = value
@@ -0,0 +1,172 @@
+"""Declarative slices of the sets and hits,  counted from the event table instead of in the parser.
+
+A view is a predicate over the columns of data_classes/events.py and the kind of counter it fills,
+e.g. the sets of K1 after a good reception on position 1
+
+    View('sets_k1_good_on_1', SETS, (Column('complex') == 1) & (Column('reception_position') == 1)
+                                    & (Column('reception_outcome') <= 2))
+
+Every row of the kind the view counts is tested,  so the rally context columns,  e.g. reception_position,
+reception_outcome,  rotation,  complex,  previous_destination or the score before the rally,
+are what predicates are built from.
+All views are evaluated together,  masks of predicates shared between views are only computed once.
+"""
+
+import operator
+
+import numpy as np
+
+from data_classes.events import Events, SET, HIT, COLUMNS, count_sets, count_hits
+
+
+# kinds of counters a view fills
+SETS = 'sets'
+HITS = 'hits'
+
+
+class Predicate():
+    """a boolean mask over the event columns,  key identifies equal predicates for the cache
+    """
+
+    __slots__ = ('key', 'evaluate')
+
+    def __init__(self, key: tuple, evaluate):
+
+        self.key = key
+
+        # _Masks -> mask,  the masks of the parts are looked up in its cache
+        self.evaluate = evaluate
+
+
+    def __and__(self, other: 'Predicate') -> 'Predicate':
+
+        return Predicate(('&', self.key, other.key), lambda masks: masks(self) & masks(other))
+
+
+    def __or__(self, other: 'Predicate') -> 'Predicate':
+
+        return Predicate(('|', self.key, other.key), lambda masks: masks(self) | masks(other))
+
+
+    def __invert__(self) -> 'Predicate':
+
+        return Predicate(('~', self.key), lambda masks: ~masks(self))
+
+
+class Column():
+    """Column('rotation') == 0,  Column('reception_outcome') <= 2,  Column('position').isin([1, 2])
+    """
+
+    def __init__(self, name: str):
+
+        assert name in COLUMNS, f'Column {name} is not defined,  see data_classes/events.py'
+
+        self.name = name
+
+
+    def _compare(self, symbol: str, function, value: int) -> Predicate:
+
+        name = self.name
+
+        return Predicate((symbol, name, value), lambda masks: function(masks.columns[name], value))
+
+
+    def __eq__(self, value: int) -> Predicate:
+        return self._compare('==', operator.eq, value)
+
+
+    def __ne__(self, value: int) -> Predicate:
+        return self._compare('!=', operator.ne, value)
+
+
+    def __lt__(self, value: int) -> Predicate:
+        return self._compare('<', operator.lt, value)
+
+
+    def __le__(self, value: int) -> Predicate:
+        return self._compare('<=', operator.le, value)
+
+
+    def __gt__(self, value: int) -> Predicate:
+        return self._compare('>', operator.gt, value)
+
+
+    def __ge__(self, value: int) -> Predicate:
+        return self._compare('>=', operator.ge, value)
+
+
+    def isin(self, values) -> Predicate:
+
+        values = tuple(sorted(values))
+
+        return self._compare('in', np.isin, values)
+
+
+class View():
+    """name is also the name of the json file the view is saved to
+    """
+
+    def __init__(self, name: str, kind: str, where: Predicate):
+
+        assert kind in [SETS, HITS], f'Views of {kind} are not defined'
+
+        self.name = name
+        self.kind = kind
+        self.where = where
+
+
+# the sets of K1 after a reception on position 1,  behind the setter
+SETS_K3 = View('sets_k3', SETS, (Column('complex') == 1) & (Column('reception_position') == 1))
+
+
+
+##############################    Evaluation    ##############################
+
+class _Masks():
+    """the columns of one evaluation and the masks computed on them so far
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+
+        self.columns = columns
+        self.cache = {}
+
+
+    def __call__(self, predicate: Predicate) -> np.ndarray:
+
+        mask = self.cache.get(predicate.key)
+        if mask is None:
+            mask = self.cache[predicate.key] = predicate.evaluate(self)
+
+        return mask
+
+
+def evaluate_views(events: Events, views: list[View]) -> dict:
+    """the counter of every view,  Sets or Hits,  by the name of the view
+    """
+
+    masks = _Masks(events.columns)
+    kinds = {SETS: Column('kind') == SET, HITS: Column('kind') == HIT}
+
+    results = {}
+    for view in views:
+        mask = masks(kinds[view.kind] & view.where)
+
+        if view.kind == SETS:
+            results[view.name] = count_sets(masks.columns, mask)
+        else:
+            results[view.name] = count_hits(masks.columns, mask)
+
+    return results
+
+
+def save_view(counter, name: str, filepath: str):
+    """views other than the seven outputs are written to <name>.json
+    """
+    import json
+    import os
+
+    view = counter.sets if hasattr(counter, 'sets') else counter.hits
+
+    with open(os.path.join(filepath, f'{name}.json'), 'w', encoding='utf-8') as outfile:
+        outfile.write(json.dumps(view, indent=4))
@@ -1,37 +1,45 @@
-import json
 import os
 
+from data_classes.hits import Hits
+from data_classes.store import open_store, load_counter
 
-def validate_no_outcome_34_in_zones_234(data: dict):
 
-    for player_num, player_data in data.items():
+def validate_no_outcome_34_in_zones_234(hits: Hits):
 
-        for position, position_data in player_data.items():
+    # positions 3 and 6 are the middle and the pipe,  zones 1 and 5 are skipped,  one down due to indexing
+    for counts in hits.counts:
 
-            if position in ['3', '6']:
+        for position in range(1, counts.shape[0] + 1):
+
+            if position in [3, 6]:
                 continue
 
-            for set_type, set_data in position_data.items():
+            for set_data in counts[position - 1]:
 
-                for zone, zone_data in set_data.items():
+                for zone in range(1, set_data.shape[0] + 1):
 
-                    if zone in ['1', '5']:
+                    if zone in [1, 5]:
                         continue
 
-                    for outcome_key, outcome_count in zone_data.items():
-                        
-                        if outcome_key in ['1', '2', '5']:
-                            continue
+                    for outcome_key in [3, 4]:
+
+                        outcome_count = set_data[zone - 1, outcome_key - 1]
 
                         assert outcome_count == 0, f'ERROR -- zones 2, 3, 4 cant have outcomes "block out" or "blocked", for non middle or pipe attacks \
                             position: {position}  --  zone: {zone}  --  outcome: {outcome_key}  --  count: {outcome_count}'
 
 
 if __name__=='__main__':
-    
-    with open(os.path.join(os.getcwd(), 'analysis', 'hits.json'), 'r', encoding='utf-8') as infile:
-        data = json.load(infile)
-    
+
+    analysis_dir_path = os.path.join(os.getcwd(), 'analysis')
+
+    store = open_store(analysis_dir_path)
+    if store is not None:
+        for name in store.stale(os.path.join(os.getcwd(), 'scouting')):
+            print(f'WARNING -- {name} changed since the analysis,  run analysis.py again')
+
+    data = load_counter(analysis_dir_path, 'hits')
+
     validate_no_outcome_34_in_zones_234(data)
 
-    print('Successfully validated data.')
\ No newline at end of file
+    print('Successfully validated data.')
@@ -8,6 +8,8 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 
+from data_classes.store import load_counter
+
 
 def calculate_reception_stats(player_serves: dict, serve_type: str) -> dict:
     """
@@ -213,23 +215,18 @@ def generate_breaks_report(breaks: dict, breaks_player: dict, output_filename: s
 
 if __name__ == "__main__":
     
-    # Determine paths
-    input_path_1 = os.path.join('.', 'analysis', 'breakpoints.json')
-    input_path_2 = os.path.join('.', 'analysis', 'breakpoints_players.json')
+    # Determine paths,  the counters come from the binary store if analysis.py wrote one
+    input_path = os.path.join('.', 'analysis')
     output_path = os.path.join('.', 'reports', 'breaks_report.pdf')
 
     try:
-        with open(input_path_1, 'r', encoding='utf-8') as file:
-            breaks_data = json.load(file)
-
-        with open(input_path_2, 'r', encoding='utf-8') as file:
-            breaks_player_data = json.load(file)
+        breaks = load_counter(input_path, 'breakpoints')
         
-        generate_breaks_report(breaks_data, breaks_player_data, output_path)
+        generate_breaks_report(breaks.breaks, breaks.player_breaks, output_path)
 
     except FileNotFoundError:
-        print(f"Error: Input file not found at {input_path}")
+        print(f"Error: Input file not found in {input_path}")
     except json.JSONDecodeError:
         print(f"Error: Invalid JSON format in {input_path}")
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
\ No newline at end of file
+        print(f"An unexpected error occurred: {e}")
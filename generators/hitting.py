@@ -6,9 +6,10 @@ Block out attacks and blocked attacks are attributed to either zone 1 or 5 but a
     they are a different stat
 """
 import argparse
-import json
 import os
 
+import numpy as np
+
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -19,6 +20,9 @@ from reportlab.platypus import (
 from reportlab.graphics.shapes import Drawing, Rect, Line, String, Wedge
 from reportlab.graphics import renderPDF
 
+from data_classes.hits import Hits
+from data_classes.store import load_counter, counts_of
+
 # Translation maps for Sets and Outcomes
 translations = {
     'outsides': {
@@ -38,9 +42,12 @@ OUTCOME_MAP = {
 }
 
 
-def aggregate_hitting_data(player_data: dict) -> dict:
+def aggregate_hitting_data(player_data: np.ndarray, positions: list[int]) -> dict:
     """
     Aggregates data per position for the standard rows.
+
+    player_data = counts_of(hits, player_id),  position x set type x zone x outcome,
+    positions are the positions the player hit from
     """
     summary = {str(position): {
         'total_attacks': 0,
@@ -67,13 +74,18 @@ def aggregate_hitting_data(player_data: dict) -> dict:
     
 
     # Aggregate data
-    for position, position_data in player_data.items():
+    for position in positions:
+        position_data = player_data[position - 1].tolist()
+        position = str(position)
 
-        for set_type, set_data in position_data.items():
+        for set_type, set_data in enumerate(position_data, start=1):
+            set_type = str(set_type)
         
-            for zone, zone_data in set_data.items():
+            for zone, zone_data in enumerate(set_data, start=1):
+                zone = str(zone)
         
-                for outcome, outcome_count in zone_data.items():
+                for outcome, outcome_count in enumerate(zone_data, start=1):
+                    outcome = str(outcome)
         
                     summary[position]['total_attacks'] += outcome_count
                     summary['total_attacks'] += outcome_count
@@ -248,7 +260,7 @@ def draw_hitting_cones(origin_type, data: None | dict = None):
     return d
 
 
-def generate_hitting_report(data: dict, output_filename: str):
+def generate_hitting_report(data: Hits, output_filename: str):
 
     # Define the doc
     doc = SimpleDocTemplate(
@@ -281,7 +293,7 @@ def generate_hitting_report(data: dict, output_filename: str):
     col_widths = [2.5*cm, 2.5*cm, 7.0*cm, 5*cm]
 
     # Sort players numerically
-    player_ids = sorted(data.keys(), key=lambda x: int(x))
+    player_ids = sorted(data.players, key=lambda player: -1 if player is None else player)
 
     row_with_diff_styling = [] # For separators
     summary_rows_indices = [] # For the new summary rows (if we want to style them)
@@ -289,11 +301,11 @@ def generate_hitting_report(data: dict, output_filename: str):
     row_id = 1
     for player_id in player_ids:
 
-        player_data = data[player_id]
+        player_data = counts_of(data, player_id)
 
 
         # 1. Aggregate Per Position
-        summary = aggregate_hitting_data(player_data)
+        summary = aggregate_hitting_data(player_data, data.positions[player_id])
 
 
         # --- CREATE SUMMARY ROW ---
@@ -443,14 +455,14 @@ def generate_hitting_report(data: dict, output_filename: str):
 
 if __name__ == "__main__":
     
-    # Determine paths
-    input_path = os.path.join('.', 'analysis', 'hits.json')
+    # Determine paths,  the counters come from the binary store if analysis.py wrote one
+    input_path = os.path.join('.', 'analysis')
     output_path = os.path.join('.', 'reports', 'hits_report.pdf')
 
-    if not os.path.exists(input_path):
+    try:
+        hits_data = load_counter(input_path, 'hits')
+
+    except FileNotFoundError:
         print(f"File not found: {input_path}")
     else:
-        with open(input_path, 'r', encoding='utf-8') as file:
-            hits_data = json.load(file)
-
-        generate_hitting_report(hits_data, output_path)
\ No newline at end of file
+        generate_hitting_report(hits_data, output_path)
@@ -2,17 +2,24 @@ import argparse
 import json
 import os
 
+import numpy as np
+
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 
+from data_classes.receptions import Receptions
+from data_classes.store import load_counter, counts_of
+
 
-def calculate_reception_stats(player_serves: dict, serve_type: str) -> dict:
+def calculate_reception_stats(player_serves: np.ndarray, serve_type: str) -> dict:
     """
     Aggregates reception stats per serve type (Float/Jump) and a grand total.
     1 for float, 2 for jumper
+
+    player_serves are the counts of one player,  serve type x outcome
     """
     summary = {
         'total': 0,
@@ -22,18 +29,15 @@ def calculate_reception_stats(player_serves: dict, serve_type: str) -> dict:
         'error': 0,
     }
 
-    translation = {'1': 'float', '2': 'jumper'}
+    translation = {1: 'float', 2: 'jumper'}
 
-    for serve, outcomes in player_serves.items():
+    for serve, outcomes in enumerate(player_serves.tolist(), start=1):
 
         if translation[serve] != serve_type.lower():
             continue
 
-        # Outcome keys in JSON are strings '1' through '4'
-        perfect = outcomes.get('1', 0)
-        okay = outcomes.get('2', 0)
-        bad = outcomes.get('3', 0)
-        error = outcomes.get('4', 0)
+        # Outcomes 1 through 4,  one down due to indexing
+        perfect, okay, bad, error = outcomes
         total = perfect + okay + bad + error
 
         # Turn to percentages and add to summary
@@ -47,7 +51,7 @@ def calculate_reception_stats(player_serves: dict, serve_type: str) -> dict:
     return summary
 
 
-def generate_reception_pdf(receptions: dict, output_filename: str):
+def generate_reception_pdf(receptions: Receptions, output_filename: str):
 
     # Define the doc
     doc = SimpleDocTemplate(
@@ -112,13 +116,13 @@ def generate_reception_pdf(receptions: dict, output_filename: str):
 
 
         # Sort players numerically
-        sorted_player_keys = sorted(receptions.keys(), key=lambda x: int(x))
+        sorted_player_keys = sorted(receptions.players)
         row_idx = 1 # Start after header
 
 
         for player_num in sorted_player_keys:
 
-            stats = calculate_reception_stats(receptions[player_num], serve_type=serve_type)
+            stats = calculate_reception_stats(counts_of(receptions, player_num), serve_type=serve_type)
 
 
             if stats['total'] == 0:
@@ -150,18 +154,17 @@ def generate_reception_pdf(receptions: dict, output_filename: str):
 
 if __name__ == "__main__":
     
-    # Determine paths
-    input_path = os.path.join('.', 'analysis', 'receptions.json')
+    # Determine paths,  the counters come from the binary store if analysis.py wrote one
+    input_path = os.path.join('.', 'analysis')
     output_path = os.path.join('.', 'reports', 'receptions_report.pdf')
 
     try:
-        with open(input_path, 'r', encoding='utf-8') as file:
-            receptions_data = json.load(file)
+        receptions_data = load_counter(input_path, 'receptions')
         
         generate_reception_pdf(receptions_data, output_path)
 
     except FileNotFoundError:
-        print(f"Error: Input file not found at {input_path}")
+        print(f"Error: Input file not found in {input_path}")
     except json.JSONDecodeError:
         print(f"Error: Invalid JSON format in {input_path}")
     except Exception as e:
@@ -1,7 +1,8 @@
 import argparse
-import json
 import os
 
+import numpy as np
+
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -13,6 +14,9 @@ from reportlab.platypus import (
 from reportlab.graphics.shapes import Drawing, Rect, Line, String, Circle
 from reportlab.graphics import renderPDF
 
+from data_classes.serves import Serves
+from data_classes.store import load_counter, counts_of
+
 serve_translation = {
     '1': 'Float',
     '2': 'Jumper',
@@ -102,12 +106,12 @@ def draw_court_diagram(data: None | dict = None):
     return d
 
 
-def calculate_stats(data: dict) -> dict:
+def calculate_stats(data: np.ndarray) -> dict:
     """Calculates zone distribution and outcome distribution
 
     zone 10 is for not attributable errors (i.e. net errors)
 
-    data = serves[player_num]
+    data = counts_of(serves, player_num),  serve type x zone x outcome
     """
     
     stats = {
@@ -120,19 +124,21 @@ def calculate_stats(data: dict) -> dict:
     }
 
 
-    for serve_type, zones in data.items():
-        for zone, outcomes in zones.items():
+    for serve_type, zones in enumerate(data.tolist(), start=1):
+        serve_type = str(serve_type)
+
+        for zone, outcomes in enumerate(zones, start=1):
 
-            if zone != '10':
-                stats[serve_type]['zone_dist'][zone] = sum(outcomes.values())
-                stats[serve_type]['total_serves_for_zone_count'] += sum(outcomes.values())
+            if zone != 10:
+                stats[serve_type]['zone_dist'][str(zone)] = sum(outcomes)
+                stats[serve_type]['total_serves_for_zone_count'] += sum(outcomes)
 
-            stats[serve_type]['total_serves'] += sum(outcomes.values())
+            stats[serve_type]['total_serves'] += sum(outcomes)
 
-            stats[serve_type]['outcome_dist']['1'] += outcomes.get('1', 0)
-            stats[serve_type]['outcome_dist']['2'] += outcomes.get('2', 0)
-            stats[serve_type]['outcome_dist']['3'] += outcomes.get('3', 0)
-            stats[serve_type]['outcome_dist']['4'] += outcomes.get('4', 0)
+            stats[serve_type]['outcome_dist']['1'] += outcomes[0]
+            stats[serve_type]['outcome_dist']['2'] += outcomes[1]
+            stats[serve_type]['outcome_dist']['3'] += outcomes[2]
+            stats[serve_type]['outcome_dist']['4'] += outcomes[3]
 
 
     # convert to percentages
@@ -182,7 +188,7 @@ def get_legend_table():
 
     return t
 
-def generate_pdf_report(serves: dict, output_filename: str):
+def generate_pdf_report(serves: Serves, output_filename: str):
 
     # Define the doc
     doc = SimpleDocTemplate(
@@ -265,10 +271,10 @@ def generate_pdf_report(serves: dict, output_filename: str):
     row_id = 1
 
 
-    sorted_players = sorted(serves.keys(), key = lambda x: int(x))
+    sorted_players = sorted(serves.players)
     for player_num in sorted_players:
 
-        player_stats = calculate_stats(serves[player_num])
+        player_stats = calculate_stats(counts_of(serves, player_num))
 
         already_added_player_id = False
 
@@ -358,14 +364,14 @@ def generate_pdf_report(serves: dict, output_filename: str):
 
 if __name__ == "__main__":
 
-    # Determine paths
-    input_path = os.path.join('.', 'analysis', 'serves.json')
+    # Determine paths,  the counters come from the binary store if analysis.py wrote one
+    input_path = os.path.join('.', 'analysis')
     output_path = os.path.join('.', 'reports', 'serves_report.pdf')
 
-    if not os.path.exists(input_path):
-            print("Error: Input files not found.")
-    else:
-        with open(input_path, 'r', encoding='utf-8') as file:
-            serves_data = json.load(file)
+    try:
+        serves_data = load_counter(input_path, 'serves')
 
-        generate_pdf_report(serves_data, output_filename=output_path)
\ No newline at end of file
+    except FileNotFoundError:
+        print("Error: Input files not found.")
+    else:
+        generate_pdf_report(serves_data, output_filename=output_path)
@@ -1,4 +1,3 @@
-import json
 import os
 import argparse
 
@@ -8,14 +7,17 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 
+from data_classes.sets import Sets
+from data_classes.store import load_counter, counts_of
+
 def aggregate_counts(set_type_data):
     """
-    Helper function to sum values in the 4th level dict (ignoring set type).
-    e.g., {"1": 0, "2": 1, ...} -> returns 1
+    Helper function to sum the counts of one destination (ignoring set type).
+    e.g., [0, 1, 0, 0] -> returns 1
     """
-    return sum(set_type_data.values())
+    return int(set_type_data.sum())
 
-def generate_pdf_report(data_k1: dict, data_k2: dict, output_filename: str):
+def generate_pdf_report(data_k1: Sets, data_k2: Sets, output_filename: str):
 
     doc = SimpleDocTemplate(
         output_filename,
@@ -37,11 +39,11 @@ def generate_pdf_report(data_k1: dict, data_k2: dict, output_filename: str):
     )
 
     # Sort players numerically
-    player_ids = sorted(data_k1.keys(), key=lambda x: int(x))
+    player_ids = sorted(data_k1.players)
 
     for player_id in player_ids:
-        player_data_k1 = data_k1[player_id]
-        player_data_k2 = data_k2[player_id]
+        player_data_k1 = counts_of(data_k1, player_id)
+        player_data_k2 = counts_of(data_k2, player_id)
 
 
         # Add Player Title
@@ -84,7 +86,7 @@ def generate_pdf_report(data_k1: dict, data_k2: dict, output_filename: str):
 
 
         # Sort rotations numerically (0, 1, 2...)
-        rotations = sorted(player_data_k1.keys(), key=lambda x: int(x))
+        rotations = range(len(player_data_k1))
 
         for rot in rotations:
             destinations_k1 = player_data_k1[rot]
@@ -92,8 +94,7 @@ def generate_pdf_report(data_k1: dict, data_k2: dict, output_filename: str):
             
             # Helper to safely get counts
             def get_count(p, data):
-                key = str(p)
-                return aggregate_counts(data[key]) if key in data else 0
+                return aggregate_counts(data[p - 1])
 
 
 
@@ -247,17 +248,15 @@ if __name__ == "__main__":
     
     # Process both K1 and K2 files
 
-    input_path_1 = os.path.join('.', 'analysis', f'setsK1.json')
-    input_path_2 = os.path.join('.', 'analysis', f'setsK2.json')
+    # the counters come from the binary store if analysis.py wrote one
+    input_path = os.path.join('.', 'analysis')
     output_path = os.path.join('.', 'reports', f'setter_report.pdf')
 
-    if not os.path.exists(input_path_1) or not os.path.exists(input_path_2):
-            print("Error: Input files not found.")
-    else:
-        with open(input_path_1, 'r', encoding='utf-8') as file:
-            k1 = json.load(file)
-
-        with open(input_path_2, 'r', encoding='utf-8') as file:
-            k2 = json.load(file)
+    try:
+        k1 = load_counter(input_path, 'setsK1')
+        k2 = load_counter(input_path, 'setsK2')
 
-        generate_pdf_report(k1, k2, output_filename=output_path)
\ No newline at end of file
+    except FileNotFoundError:
+        print("Error: Input files not found.")
+    else:
+        generate_pdf_report(k1, k2, output_filename=output_path)
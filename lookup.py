@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+
+from data_classes.match_result import MatchResult
+
+from parsing.errors import ScoutingError, format_errors
+from parsing.index import load_index, resume_parser
+from parsing.tracing import PrintTracer
+
+
+##############################    Main    ##############################
+
+def main(filename: str, set_number: int, rally: int, parse: bool = False) -> bool:
+    """prints where the rally is in the file,  the score,  the lineup on court and its actions,
+    parse runs the parser over the rally alone and prints every action as --verbose does,
+    returns False if the lineups of the file are broken,  the error is printed instead
+    """
+
+    path = os.path.join(os.getcwd(), 'scouting', filename)
+
+    try:
+        index = load_index(path)
+    except ScoutingError as error:
+        print(format_errors([error], filename))
+        return False
+
+    row = index.row(set_number, rally)
+
+    # one seek instead of reading the file
+    with open(path, 'rb') as file:
+        file.seek(index.starts[row])
+        actions = file.read(index.ends[row] - index.starts[row]).decode('utf-8')
+
+    lineup = index.lineup(row)
+    serving = 'we serve' if index.type[row] == 1 else 'they serve'
+
+    print(f'{filename}  set {set_number}  rally {rally}  line {index.set_lines[set_number - 1]}  column {index.column(row)}')
+    print(f'score {index.team_score[row]} : {index.opponent_score[row]},  {serving},  rotation {lineup.get_rotation() + 1}')
+    print('court  ' + '  '.join(f'{position}: {player} {meta}' for position, (player, meta) in
+                                enumerate(zip(lineup.lineup, lineup.meta), start=1)) + f'  libero: {lineup.libero}')
+    print(actions)
+
+    if parse:
+        parser = resume_parser(index, row, MatchResult(), tracer=PrintTracer())
+        parser.feed(actions.split(' '))
+
+    return True
+
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filename', required=True)
+    parser.add_argument('--set', type=int, required=True)
+    parser.add_argument('--rally', type=int, required=True)
+    parser.add_argument('--parse', action='store_true', help='parse the rally and print every action')
+
+    args = parser.parse_args()
+
+    sys.exit(0 if main(filename = args.filename, set_number = args.set, rally = args.rally, parse = args.parse) else 1)
@@ -0,0 +1,165 @@
+"""Parses many scouting files at once and reduces them into per season or per opponent aggregates.
+"""
+
+import glob
+import os
+import pathlib
+import re
+
+from concurrent.futures import ProcessPoolExecutor
+
+from data_classes.match_result import MatchResult
+
+from parsing.parser import set_lines, _parse_set
+from parsing.cache import MatchCache
+
+
+def expand_files(patterns: list[str], directory: str) -> list[str]:
+    """file names or glob patterns relative to directory,  e.g. ['kiel.txt', 'giessen*.txt']
+
+    the result is sorted and free of duplicates,  so the reduction order does not depend on the shell
+    """
+
+    files = set()
+    for pattern in patterns:
+
+        matches = glob.glob(os.path.join(directory, pattern))
+        assert len(matches) != 0, f'No scouting file matches {pattern} in {directory}'
+
+        files.update(matches)
+
+    return sorted(files)
+
+
+def opponent_of(path: str) -> str:
+    """the opponent is the file name without extension and without a trailing match number,
+    e.g. giessen2.txt -> giessen
+    """
+
+    stem = pathlib.Path(path).stem
+
+    return re.sub(r'\d+$', '', stem) or stem
+
+
+def _parse_line(line: str, set_number: int, events: bool, outputs: set[str] | None) -> MatchResult:
+    """the views are not evaluated per line,  merging the results counts them all at once
+    """
+
+    result = MatchResult(events=events, outputs=outputs)
+    _parse_set(line, result, None, set_number, None)
+
+    return result
+
+
+def parse_lines(lines: list[str], jobs: int | None = None, events: bool = False,
+                set_numbers: list[int] | None = None, outputs: set[str] | None = None) -> list[MatchResult]:
+    """one MatchResult per set line,  in the order of lines
+
+    every set line carries its own lineup and all parser state is reset per line,
+    therefore the lines can be parsed in any process and merged afterwards
+
+    jobs is the number of worker processes,  None uses every core,  1 parses in this process
+    set_numbers default to 1 - n and only show up in the events,
+    outputs limits the counters as in parse_match
+    """
+
+    set_numbers = set_numbers or list(range(1, len(lines) + 1))
+
+    if jobs == 1 or len(lines) <= 1:
+        return [_parse_line(line, set_number, events, outputs) for line, set_number in zip(lines, set_numbers)]
+
+    jobs = min(jobs or os.cpu_count() or 1, len(lines))
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_parse_line, lines, set_numbers, [events] * len(lines), [outputs] * len(lines),
+                                 chunksize=max(1, len(lines) // (4 * jobs))))
+
+
+def parse_match_parallel(source: str | os.PathLike, jobs: int | None = None, events: bool = False,
+                         outputs: set[str] | None = None) -> MatchResult:
+    """same result as parse_match,  but the set lines are parsed concurrently
+    """
+
+    if isinstance(source, os.PathLike):
+        with open(source, 'r', encoding='utf-8') as file:
+            source = file.read()
+
+    result = MatchResult(events=events, outputs=outputs)
+    for partial in parse_lines(set_lines(source), jobs, events, outputs=outputs):
+        result.merge(partial)
+
+    result.evaluate_views()
+
+    return result
+
+
+def parse_files(paths: list[str], jobs: int | None = None, events: bool = False,
+                outputs: set[str] | None = None, cache: MatchCache | None = None) -> list[MatchResult]:
+    """one MatchResult per path,  in the order of paths
+
+    the set lines of all files share one pool,  so a single long tournament file is spread over the cores as well,
+    with a cache,  see parsing/cache.py,  only the files that are not in it are parsed
+    """
+
+    results = [None] * len(paths)
+
+    # the bytes of the files to put into the cache once they are parsed,  by index
+    missed = {}
+
+    owners, lines, set_numbers = [], [], []
+    for i, path in enumerate(paths):
+
+        if cache is not None:
+            with open(path, 'rb') as file:
+                source = file.read()
+
+            results[i] = cache.get(source, events, outputs)
+            if results[i] is not None:
+                continue
+
+            missed[i] = source
+
+        with open(path, 'r', encoding='utf-8') as file:
+            file_lines = set_lines(file.read())
+
+        owners.extend([i] * len(file_lines))
+        lines.extend(file_lines)
+        set_numbers.extend(range(1, len(file_lines) + 1))
+
+        results[i] = MatchResult(events=events, outputs=outputs)
+
+    for owner, partial in zip(owners, parse_lines(lines, jobs, events, set_numbers, outputs)):
+        results[owner].merge(partial)
+
+    for i, result in enumerate(results):
+        result.evaluate_views()
+
+        if i in missed:
+            cache.put(missed[i], events, result)
+
+    return results
+
+
+def aggregate_files(paths: list[str], group_by: str = 'season', jobs: int | None = None,
+                    events: bool = False, outputs: set[str] | None = None,
+                    cache: MatchCache | None = None) -> dict[str, MatchResult]:
+    """group_by season merges every file into one result under the key 'season',
+    group_by opponent merges the files per opponent_of(path)
+
+    results are always merged in the order of paths,  therefore the output is reproducible
+    regardless of jobs
+    """
+
+    assert group_by in ['season', 'opponent'], f'Grouping {group_by} is not defined'
+
+    aggregates = {}
+    for path, result in zip(paths, parse_files(paths, jobs, events, outputs, cache)):
+
+        key = 'season' if group_by == 'season' else opponent_of(path)
+
+        if key not in aggregates:
+            aggregates[key] = MatchResult(events=events, outputs=outputs)
+
+        aggregates[key].merge(result)
+
+    return aggregates
@@ -0,0 +1,196 @@
+"""On disk caches of the counters of single set lines and of whole matches.
+
+During a match the scouting file only grows at its end,  so at a timeout every set line but the last
+is already in the cache and only the current set is parsed again.
+A set line is keyed by its text,  its number in the file,  what was counted and PARSER_VERSION,
+so editing a line or changing the parser never returns stale counters.
+Every edit leaves the pickle of the old line behind,  so cache/sets is limited in size as well.
+
+The reports of an opponent are generated again and again from files which no longer change,
+MatchCache keeps the whole MatchResult of a file,  keyed by its bytes,  the keybindings and PARSER_VERSION.
+Both caches are limited in size,  the entries used least recently are evicted first.
+"""
+
+import hashlib
+import os
+import pickle
+
+from data_classes.match_result import MatchResult, OUTPUTS
+
+
+# bump whenever a change to the parser or the counters changes what a set line counts
+PARSER_VERSION = '5'
+
+KEYBINDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'preprocessing', 'keybindings.yml')
+
+# bytes of cache/matches,  and of cache/sets
+MATCH_CACHE_SIZE = 256 * 2 ** 20
+
+
+def _evict(directory: str, size: int):
+    """removes the pickles in directory used least recently,  by their mtime,  until at most size bytes are left
+    """
+
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.pickle'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+    total = sum(size_ for _, size_, _ in entries)
+
+    for _, size_, path in sorted(entries):
+        if total <= size:
+            break
+
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+
+        total -= size_
+
+
+class SetCache():
+    """one pickled MatchResult per set line in directory,  e.g. cache/sets,
+    at most size bytes,  a hit marks the set line as used by its mtime
+    """
+
+    def __init__(self, directory: str, size: int = MATCH_CACHE_SIZE):
+
+        self.directory = directory
+        self.size = size
+        os.makedirs(directory, exist_ok=True)
+
+        # number of lookups answered from disk,  and parsed again
+        self.hits = 0
+        self.misses = 0
+
+
+    def key(self, line: str, set_number: int, events: bool, outputs: frozenset[str]) -> str:
+
+        counted = ','.join(sorted(outputs))
+
+        return hashlib.sha256(f'{PARSER_VERSION}\n{set_number}\n{int(events)}\n{counted}\n{line}'.encode('utf-8')).hexdigest()
+
+
+    # Getters
+
+    def get(self, line: str, set_number: int, events: bool, outputs: frozenset[str]) -> MatchResult | None:
+        """None if the line was never parsed with this parser version,  or the cache file is unreadable
+        """
+
+        path = os.path.join(self.directory, self.key(line, set_number, events, outputs) + '.pickle')
+
+        try:
+            with open(path, 'rb') as file:
+                result = pickle.load(file)
+
+            os.utime(path)
+
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return result
+
+
+    # Modifiers
+
+    def put(self, line: str, set_number: int, events: bool, result: MatchResult):
+        """written to a temporary file first,  so an interrupted run never leaves half a pickle behind,
+        then the least recently used set lines are evicted down to size
+        """
+
+        path = os.path.join(self.directory, self.key(line, set_number, events, result.outputs) + '.pickle')
+
+        with open(path + '.tmp', 'wb') as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(path + '.tmp', path)
+
+        self.evict()
+
+
+    def evict(self):
+
+        _evict(self.directory, self.size)
+
+
+
+class MatchCache():
+    """one pickled MatchResult per scouting file in directory,  e.g. cache/matches,
+    at most size bytes,  a hit marks the match as used by its mtime
+    """
+
+    def __init__(self, directory: str, size: int = MATCH_CACHE_SIZE):
+
+        self.directory = directory
+        self.size = size
+        os.makedirs(directory, exist_ok=True)
+
+        # the notation a file was written in depends on them,  see preprocessing/preprocessor.py
+        try:
+            with open(KEYBINDINGS, 'rb') as file:
+                self.keybindings = hashlib.sha256(file.read()).hexdigest()
+        except OSError:
+            self.keybindings = ''
+
+        # number of lookups answered from disk,  and parsed again
+        self.hits = 0
+        self.misses = 0
+
+
+    def key(self, source: bytes, events: bool, outputs: set[str] | None) -> str:
+        """source are the bytes of the scouting file,  a memory map works as well
+        """
+
+        counted = ','.join(sorted(OUTPUTS if outputs is None else outputs))
+        digest = hashlib.sha256(f'{PARSER_VERSION}\n{self.keybindings}\n{int(events)}\n{counted}\n'.encode('utf-8'))
+        digest.update(source)
+
+        return digest.hexdigest()
+
+
+    # Getters
+
+    def get(self, source: bytes, events: bool, outputs: set[str] | None) -> MatchResult | None:
+
+        path = os.path.join(self.directory, self.key(source, events, outputs) + '.pickle')
+
+        try:
+            with open(path, 'rb') as file:
+                result = pickle.load(file)
+
+            os.utime(path)
+
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return result
+
+
+    # Modifiers
+
+    def put(self, source: bytes, events: bool, result: MatchResult):
+        """written to a temporary file first,  then the least recently used matches are evicted down to size
+        """
+
+        path = os.path.join(self.directory, self.key(source, events, result.outputs) + '.pickle')
+
+        with open(path + '.tmp', 'wb') as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(path + '.tmp', path)
+
+        self.evict()
+
+
+    def evict(self):
+
+        _evict(self.directory, self.size)
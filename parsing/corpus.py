@@ -0,0 +1,176 @@
+"""Parses archives of scouting files without reading them into memory.
+
+Every file is memory-mapped and indexed by the byte offsets of its set lines,
+the set lines are decoded a batch at a time straight out of the mapping,
+parsed and merged into the aggregate before the next batch is read.
+What stays in memory is the aggregate,  not the text,  so several seasons parse with the memory of one match.
+"""
+
+import mmap
+import os
+
+import numpy as np
+
+from data_classes.match_result import MatchResult
+
+from parsing.batch import opponent_of
+from parsing.cache import MatchCache
+from parsing.parser import _parse_set, tokenize_set_lines
+
+
+# set lines decoded and tokenized together
+BATCH = 256
+
+_SKIPPED = (b'#', b'>')
+
+
+class MappedFile():
+    """a scouting file mapped into memory with the offsets of its set lines
+
+        with MappedFile(path) as mapped:
+            for line in mapped.lines():
+                ...
+    """
+
+    def __init__(self, path: str | os.PathLike):
+
+        self.path = path
+
+        self.file = open(path, 'rb')
+
+        # an empty file cannot be mapped
+        size = os.fstat(self.file.fileno()).st_size
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+        self.starts, self.ends = set_line_offsets(self.buffer)
+
+
+    def __enter__(self) -> 'MappedFile':
+
+        return self
+
+
+    def __exit__(self, *exc_info):
+
+        self.close()
+
+
+    def close(self):
+
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+        self.file.close()
+
+
+    # Getters
+
+    def __len__(self) -> int:
+
+        return len(self.starts)
+
+
+    def line(self, i: int) -> str:
+        """the i-th set line,  0 based,  the same text set_lines gives for it
+        """
+
+        return self.buffer[self.starts[i]:self.ends[i]].decode('utf-8')
+
+
+    def lines(self, start: int = 0, stop: int | None = None) -> list[str]:
+
+        stop = len(self) if stop is None else min(stop, len(self))
+
+        return [self.line(i) for i in range(start, stop)]
+
+
+def set_line_offsets(buffer) -> tuple[np.ndarray, np.ndarray]:
+    """the byte offsets where every set line starts and ends,  the end excludes the line break,
+    comments, empty lines and the serve position / serve type lines are dropped as in set_lines
+    """
+
+    starts, ends = [], []
+
+    start, size = 0, len(buffer)
+    while start < size:
+
+        end = buffer.find(b'\n', start)
+        if end == -1:
+            end = size
+
+        # files written on windows and opened in text mode lose the '\r' as well
+        stop = end - 1 if end > start and buffer[end - 1:end] == b'\r' else end
+
+        if stop > start and buffer[start:start + 1] not in _SKIPPED:
+            starts.append(start)
+            ends.append(stop)
+
+        start = end + 1
+
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+
+
+##############################    Streaming    ##############################
+
+def stream_file(path: str | os.PathLike, result: MatchResult, events: bool = False,
+                outputs: set[str] | None = None) -> MatchResult:
+    """merges the sets of path into result,  a batch of set lines at a time,  and returns result
+    """
+
+    with MappedFile(path) as mapped:
+        return _stream_mapped(mapped, result, events, outputs)
+
+
+def _stream_mapped(mapped: MappedFile, result: MatchResult, events: bool, outputs: set[str] | None) -> MatchResult:
+
+    for start in range(0, len(mapped), BATCH):
+        lines = mapped.lines(start, start + BATCH)
+
+        partial = MatchResult(events=events, outputs=outputs)
+        for i, (line, tokens) in enumerate(zip(lines, tokenize_set_lines(lines)), start=start + 1):
+            _parse_set(line, partial, None, i, tokens)
+
+        result.merge(partial)
+
+        # the rows of the views are counted away,  before the next batch adds more
+        result.evaluate_views()
+
+    return result
+
+
+def reduce_files(paths: list[str], group_by: str = 'season', events: bool = False,
+                 outputs: set[str] | None = None, cache: MatchCache | None = None) -> dict[str, MatchResult]:
+    """the same aggregates as aggregate_files in parsing/batch.py,  but parsed in this process
+    out of memory-mapped files,  only the aggregates are kept while the files are streamed through
+
+    the events grow with the corpus,  memory only stays flat without them,
+    apart from the rally index which takes a few numbers per rally,
+    with a cache,  see parsing/cache.py,  a file in it is merged from there and only its bytes are hashed
+    """
+
+    assert group_by in ['season', 'opponent'], f'Grouping {group_by} is not defined'
+
+    aggregates = {}
+    for path in paths:
+
+        key = 'season' if group_by == 'season' else opponent_of(path)
+
+        if key not in aggregates:
+            aggregates[key] = MatchResult(events=events, outputs=outputs)
+
+        if cache is None:
+            stream_file(path, aggregates[key], events, outputs)
+            continue
+
+        with MappedFile(path) as mapped:
+            result = cache.get(mapped.buffer, events, outputs)
+
+            if result is None:
+                result = _stream_mapped(mapped, MatchResult(events=events, outputs=outputs), events, outputs)
+                cache.put(mapped.buffer, events, result)
+
+        aggregates[key].merge(result)
+        aggregates[key].evaluate_views()
+
+    return aggregates
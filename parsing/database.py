@@ -0,0 +1,188 @@
+"""SQLite database of the events of many matches,  for questions across matches without parsing them again.
+
+One row per action in actions,  the columns of data_classes/events.py plus the match and the opponent,
+one row per rally in rallies,  the columns of data_classes/rallies.py plus won.
+A match is only parsed and written again if its file or PARSER_VERSION changed.
+
+    database = EventDatabase('scouting.db')
+    events = database.events(last=5, player=7, rotation=2, complex=1)
+    hits = events.hits()
+
+complex is the phase,  1 for K1 and 2 for K2,  the rotation is 0 - 5 as in the event table.
+
+The notation has no date,  so the matches are ordered by when they were first imported,  not by when they were played,
+last=5 are the five matches imported last.  Importing after every match keeps both orders the same,
+a file imported later for an older match counts as one of the last,  replacing a match keeps its place.
+"""
+
+import os
+import sqlite3
+
+from data_classes.events import COLUMNS, Events
+from data_classes.match_result import MatchResult
+from data_classes.rallies import RALLY_COLUMNS
+from data_classes.store import digest_of
+
+from parsing.batch import opponent_of, parse_files
+from parsing.cache import PARSER_VERSION, MatchCache
+
+
+# bump whenever the tables change,  an older database is rebuilt from scratch
+DATABASE_VERSION = 1
+
+# files parsed and written per transaction
+BATCH = 16
+
+ACTION_COLUMNS = ('match', 'opponent') + COLUMNS
+RALLY_ROW_COLUMNS = ('match', 'opponent') + RALLY_COLUMNS + ('won',)
+
+INDEXES = {
+    'actions_by_match': ('actions', ('match', 'set', 'rally')),
+    'actions_by_player': ('actions', ('player', 'kind', 'rotation', 'complex')),
+    'actions_by_opponent': ('actions', ('opponent', 'kind', 'player')),
+    'rallies_by_match': ('rallies', ('match', 'set', 'rally')),
+    'rallies_by_opponent': ('rallies', ('opponent', 'rotation')),
+}
+
+
+def _names(columns: tuple[str, ...]) -> str:
+    """quoted,  set is a keyword of sql
+    """
+
+    return ', '.join(f'"{column}"' for column in columns)
+
+
+class EventDatabase():
+
+    def __init__(self, path: str | os.PathLike):
+
+        self.path = os.fspath(path)
+        self.connection = sqlite3.connect(self.path)
+
+        if self.connection.execute('PRAGMA user_version').fetchone()[0] != DATABASE_VERSION:
+            self._create()
+
+
+    # Getters
+
+    def unchanged(self, name: str, digest: str) -> bool:
+        """whether the match name is stored from a file with this digest by this PARSER_VERSION
+        """
+
+        row = self.connection.execute('SELECT digest, parser_version FROM matches WHERE name = ?', (name,)).fetchone()
+
+        return row == (digest, PARSER_VERSION)
+
+
+    def matches(self) -> list[tuple[str, str]]:
+        """name and opponent of every match in the order they were first imported
+        """
+
+        return self.connection.execute('SELECT name, opponent FROM matches ORDER BY match').fetchall()
+
+
+    def events(self, last: int | None = None, **conditions) -> Events:
+        """the actions of the matches as an event table,  the counters of data_classes/events.py count them
+
+        conditions are equalities on the columns of actions,  e.g. player=7,  opponent='giessen',
+        last limits them to the matches imported last,  by their first import,  see above
+        """
+
+        for column in conditions:
+            assert column in ACTION_COLUMNS, f'actions has no column {column}'
+
+        clauses = [f'"{column}" = ?' for column in conditions]
+        parameters = list(conditions.values())
+
+        if last is not None:
+            clauses.append('match IN (SELECT match FROM matches ORDER BY match DESC LIMIT ?)')
+            parameters.append(last)
+
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+
+        events = Events()
+        events.rows = self.connection.execute(
+            f'SELECT {_names(COLUMNS)} FROM actions{where} ORDER BY match, rowid', parameters).fetchall()
+
+        return events
+
+
+    # Modifiers
+
+    def add(self, name: str, opponent: str, digest: str, result: MatchResult):
+        """replaces the rows of the match name,  within the transaction of the caller,
+        a match keeps its place in the order of matches when it is replaced
+        """
+
+        assert result.events is not None, 'The database needs the events,  parse with events=True'
+
+        row = self.connection.execute('SELECT match FROM matches WHERE name = ?', (name,)).fetchone()
+
+        if row is None:
+            match = self.connection.execute(
+                'INSERT INTO matches (name, opponent, digest, parser_version) VALUES (?, ?, ?, ?)',
+                (name, opponent, digest, PARSER_VERSION)).lastrowid
+        else:
+            match = row[0]
+            self.connection.execute('DELETE FROM actions WHERE match = ?', (match,))
+            self.connection.execute('DELETE FROM rallies WHERE match = ?', (match,))
+            self.connection.execute('UPDATE matches SET opponent = ?, digest = ?, parser_version = ? WHERE match = ?',
+                                    (opponent, digest, PARSER_VERSION, match))
+
+        self.connection.executemany(
+            f'INSERT INTO actions ({_names(ACTION_COLUMNS)}) VALUES ({", ".join("?" * len(ACTION_COLUMNS))})',
+            ((match, opponent) + tuple(row) for row in result.events.rows))
+
+        columns = result.rallies.columns
+        self.connection.executemany(
+            f'INSERT INTO rallies ({_names(RALLY_ROW_COLUMNS)}) VALUES ({", ".join("?" * len(RALLY_ROW_COLUMNS))})',
+            ((match, opponent) + row for row in zip(*(columns[name].tolist() for name in RALLY_ROW_COLUMNS[2:]))))
+
+
+    def close(self):
+
+        self.connection.close()
+
+
+    def _create(self):
+
+        with self.connection:
+            for table in ['matches', 'actions', 'rallies']:
+                self.connection.execute(f'DROP TABLE IF EXISTS {table}')
+
+            self.connection.execute('CREATE TABLE matches (match INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, '
+                                    'opponent TEXT NOT NULL, digest TEXT NOT NULL, parser_version TEXT NOT NULL)')
+
+            # every column is an int but the opponent
+            for table, columns in [('actions', ACTION_COLUMNS), ('rallies', RALLY_ROW_COLUMNS)]:
+                types = ', '.join(f'"{column}" {"TEXT" if column == "opponent" else "INTEGER"} NOT NULL'
+                                  for column in columns)
+                self.connection.execute(f'CREATE TABLE {table} ({types})')
+
+            for name, (table, columns) in INDEXES.items():
+                self.connection.execute(f'CREATE INDEX {name} ON {table} ({_names(columns)})')
+
+            self.connection.execute(f'PRAGMA user_version = {DATABASE_VERSION}')
+
+
+
+##############################    Import    ##############################
+
+def import_files(database: EventDatabase, paths: list[str], jobs: int | None = None,
+                 cache: MatchCache | None = None) -> tuple[int, int]:
+    """parses the files that changed since they were imported and writes them,  BATCH files per transaction,
+    returns the number of files imported and skipped,  see parse_files for the cache
+    """
+
+    digests = {path: digest_of(path) for path in paths}
+    changed = [path for path in paths if not database.unchanged(os.path.basename(path), digests[path])]
+
+    for start in range(0, len(changed), BATCH):
+        batch = changed[start:start + BATCH]
+        results = parse_files(batch, jobs=jobs, events=True, cache=cache)
+
+        with database.connection:
+            for path, result in zip(batch, results):
+                database.add(os.path.basename(path), opponent_of(path), digests[path], result)
+
+    return len(changed), len(paths) - len(changed)
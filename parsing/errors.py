@@ -0,0 +1,39 @@
+"""Errors in the scouting notation,  with the position they were found at.
+
+The normal parse stops at the first malformed action,  validate_match in parsing/parser.py
+collects every ScoutingError of a file in one pass.
+"""
+
+
+class ScoutingError(AssertionError):
+    """line and column are 1 based and refer to the scouting file,  column is the first character of the token,
+    expected is the description of the state the parser was in
+    """
+
+    def __init__(self, message: str, line: int, set_number: int, column: int, token: str, expected: str):
+
+        self.message = message
+        self.line = line
+        self.set_number = set_number
+        self.column = column
+        self.token = token
+        self.expected = expected
+
+        super().__init__(str(self))
+
+
+    def __str__(self) -> str:
+
+        return f'line {self.line}, column {self.column} (set {self.set_number}): {self.token!r} while {self.expected}. {self.message}'
+
+
+
+##############################    Report    ##############################
+
+def format_errors(errors: list[ScoutingError], filename: str = '') -> str:
+    """one error per line,  prefixed with the file name if given
+    """
+
+    prefix = f'{filename}: ' if filename else ''
+
+    return '\n'.join(f'{prefix}{error}' for error in errors)
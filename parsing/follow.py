@@ -0,0 +1,225 @@
+"""Follows a scouting file while it is being written.
+
+Only the bytes appended since the last poll are fed to the SetParser of the current set,
+which keeps its state,  the lineup and the counters in between.
+A token is only fed once the space after it was typed,  a set line only once its '>' was typed.
+If the file changed anywhere else than at its end,  e.g. a typo was fixed,  the file is parsed again from the start,
+this is told by the sha256 of the bytes fed so far,  which are hashed again whenever the file changed.
+"""
+
+import codecs
+import hashlib
+import os
+
+from data_classes.lineup import Lineup
+from data_classes.match_result import MatchResult
+
+from parsing.parser import SetParser
+from parsing.errors import ScoutingError
+
+
+class MatchFollower():
+    """result always holds the counts of everything read so far
+    """
+
+    def __init__(self, path: str, events: bool = False):
+
+        self.path = path
+        self.events = events
+
+        self.reset()
+
+
+    def reset(self):
+
+        self.result = MatchResult(events=self.events)
+
+        # bytes read,  their sha256 and the mtime of the file when they were read,  to notice edits
+        self.offset = 0
+        self.digest = hashlib.sha256()
+        self.mtime = None
+
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+
+        # text of the current line not fed yet
+        self.pending = ''
+        self.line_number = 0
+
+        # 'start' nothing of the line read yet,  'skip' a comment or serve line,  'set' a set line
+        self.line_state = 'start'
+
+        self.parser = None
+        self.set_number = 0
+        self.rally = 0
+        self.previous_action = ''
+
+        # set if the scouting is broken,  nothing is parsed until the file is edited
+        self.error = None
+
+
+    # Reading
+
+    def poll(self) -> int:
+        """reads what was appended since the last poll,  returns the number of rallies that ended
+        """
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+
+        # an edit of the same length only changes the mtime
+        if stat.st_size == self.offset and stat.st_mtime_ns == self.mtime:
+            return 0
+
+        with open(self.path, 'rb') as file:
+            data = file.read()
+
+        # edited instead of appended to
+        if len(data) < self.offset or hashlib.sha256(memoryview(data)[:self.offset]).digest() != self.digest.digest():
+            self.reset()
+
+        appended = data[self.offset:]
+
+        self.offset += len(appended)
+        self.digest.update(appended)
+        self.mtime = stat.st_mtime_ns
+
+        # only touched
+        if not appended or self.error is not None:
+            return 0
+
+        try:
+            ended = self.consume(self.decoder.decode(appended))
+        except Exception as error:
+            self.error = error
+            return 0
+
+        # sets_k3 and the other views are counted per rally as well
+        if ended:
+            self.result.evaluate_views()
+
+        return ended
+
+
+    def consume(self, text: str) -> int:
+        """feeds text that follows what was consumed before,  returns the number of rallies that ended
+        """
+
+        text = self.pending + text
+        self.pending = ''
+
+        # a '\r' at the end could be the first half of '\r\n'
+        held = ''
+        if text.endswith('\r'):
+            text, held = text[:-1], '\r'
+
+        lines = text.replace('\r\n', '\n').split('\n')
+
+        ended = 0
+        for line in lines[:-1]:
+            self.line_number += 1
+            ended += self._consume_line(line, complete=True)
+
+        ended += self._consume_line(lines[-1], complete=False)
+        self.pending += held
+
+        return ended
+
+
+    def _consume_line(self, text: str, complete: bool) -> int:
+        """text is everything of the current line which was not fed yet,
+        whatever cannot be fed yet is kept in pending
+        """
+
+        if self.line_state == 'start':
+
+            if text == '':
+                return 0
+
+            # comments and the serve position / serve type lines,  just as set_lines
+            if text[0] in '#>':
+                self.line_state = 'skip'
+
+            elif '>' in text:
+                lineup_, text = text.split('>', 1)
+
+                lineup = Lineup()
+                lineup.determine_lineup(lineup_)
+
+                self.set_number += 1
+                self.rally = 0
+                self.previous_action = ''
+                self.parser = SetParser(lineup, self.result, set_number=self.set_number)
+                self.line_state = 'set'
+
+            elif complete:
+                raise ScoutingError('A set line starts with the lineup followed by >.',
+                                    self.line_number, self.set_number + 1, 1, text, 'looking for lineup')
+
+            else:
+                self.pending = text
+                return 0
+
+        if self.line_state == 'skip':
+            if complete:
+                self.line_state = 'start'
+            return 0
+
+        actions = text.split(' ')
+
+        if complete:
+            self.line_state = 'start'
+            actions.append('')
+        else:
+            self.pending = actions.pop()
+
+        self.parser.feed(actions)
+
+        ended = 0
+        for action in actions:
+            if action == '' and self.previous_action != '':
+                ended += 1
+            self.previous_action = action
+
+        self.rally += ended
+
+        return ended
+
+
+    def finish(self) -> MatchResult:
+        """feeds the last token even though no space followed it,  call once the scout is done
+        """
+
+        if self.error is None and self.pending:
+            self.consume('\n')
+
+        self.result.evaluate_views()
+
+        return self.result
+
+
+    # Summary
+
+    def summary(self) -> str:
+        """one line for the coach,  the counts of the whole match so far
+        """
+
+        result = self.result
+
+        serves = result.serves.counts.sum(axis=(0, 1, 2))
+        receptions = result.receptions.counts.sum(axis=(0, 1))
+        hits = result.hits.counts.sum(axis=(0, 1, 2, 3))
+
+        perfect = receptions[0] / receptions.sum() * 100 if receptions.sum() else 0.0
+
+        # before the current rally,  its winner is only known once the next one starts
+        score = (self.parser.team_score, self.parser.opponent_score) if self.parser is not None else (0, 0)
+
+        return (
+            f'set {self.set_number}  rally {self.rally:3}  score {score[0]:2} : {score[1]:2}  |  '
+            f'serves {serves.sum():3}  aces {serves[0]:2}  errors {serves[3]:2}  |  '
+            f'receptions {receptions.sum():3}  perfect {perfect:3.0f}%  |  '
+            f'attacks {hits.sum():3}  kills {hits[0]:2}  blocked {hits[3]:2}  errors {hits[4]:2}  |  '
+            f'breaks {sum(result.breaks.breaks.values()):+3}'
+        )
@@ -0,0 +1,117 @@
+"""The notation of GuideForNotation.md as data.
+
+Every action is a run of '.' whose length is the code of the action, so a state of the
+parser only has to know which lengths it accepts and what to do with them.
+States are plain ints so that the transition table can be indexed directly.
+"""
+
+ACTION = 0
+
+SERVE_TYPE = 1
+SERVE_ZONE = 2
+SERVE_OUTCOME = 3
+
+RECEPTION_TYPE = 4
+RECEPTION_POSITION = 5
+RECEPTION_OUTCOME = 6
+
+SET_DESTINATION = 7
+SET_TYPE = 8
+
+HIT_TYPE = 9
+HIT_ZONE = 10
+HIT_OUTCOME = 11
+
+
+# state:  (description, accepted lengths, error message, name of the handler on the parser)
+# the handler receives the length of the action and returns the next state
+GRAMMAR = {
+    ACTION: (
+        'looking for action', (1, 2),
+        'Only serve or reception can be expected here.', '_on_action'),
+
+    # . float,  .. jumper,  ... jumper after float toss,  .... float after jump toss
+    SERVE_TYPE: (
+        'looking for type of serve next', range(1, 5),
+        'Only 4 serve types defined.', '_on_serve_type'),
+
+    # 1 - 9 zones, 10 not attributable
+    SERVE_ZONE: (
+        'looking for serve zone next', range(1, 11),
+        'Only 10 service zones are defined.', '_on_serve_zone'),
+
+    # . ace, .. overpass, ... received,  .... error
+    SERVE_OUTCOME: (
+        'looking for serve outcome next', range(1, 5),
+        'Only 4 service outcomes are defined.', '_on_serve_outcome'),
+
+    # . float, .. jumper
+    RECEPTION_TYPE: (
+        'looking for reception type next', range(1, 3),
+        'Only 2 reception types are defined.', '_on_reception_type'),
+
+    # ... pos 3, ..... pos 5, ...... pos 6, . pos 1,  nothing if the opponent missed the serve
+    RECEPTION_POSITION: (
+        'looking for receiving position next', (0, 1, 3, 5, 6),
+        'Only 5 receiving positions are defined.', '_on_reception_position'),
+
+    # . perfect, .. okay, ... bad, .... error (aced / back over the net)
+    RECEPTION_OUTCOME: (
+        'looking for reception outcome next', range(1, 5),
+        'Only 4 reception outcomes are defined.', '_on_reception_outcome'),
+
+    # 1 - 6 positions,  7 is for setter dump
+    SET_DESTINATION: (
+        'looking for set destination next', range(1, 8),
+        'Only 7 set destinations are defined.', '_on_set_destination'),
+
+    # 1 - 4
+    SET_TYPE: (
+        'looking for type of set next', range(1, 5),
+        'Only 4 set types are defined.', '_on_set_type'),
+
+    # . hit,  .. tip,  ... rebound
+    HIT_TYPE: (
+        'looking for type of hit next', range(1, 4),
+        'Only 3 types of hits are defined.', '_on_hit_type'),
+
+    # 1 - 5 from leftmost to rightmost,  6 short tips,  7 not attributable
+    HIT_ZONE: (
+        'looking for zone of hit next', range(1, 8),
+        'Only 7 hitting zones are defined.', '_on_hit_zone'),
+
+    # . point,  .. defended,  ... block out,  .... blocked,  ..... error
+    HIT_OUTCOME: (
+        'looking for outcome of hit next', range(1, 6),
+        'Only 5 hitting outcomes are defined.', '_on_hit_outcome'),
+}
+
+
+DESCRIPTIONS = tuple(GRAMMAR[state][0] for state in range(len(GRAMMAR)))
+
+
+
+##############################    Compilation    ##############################
+
+def compile_grammar(parser_class: type) -> tuple[tuple, tuple, tuple]:
+    """Turns GRAMMAR into three tuples indexed by state,
+
+        accepted, handlers, messages
+
+    accepted[state] is a tuple of bools indexed by the length of the action,
+    handlers[state] is the unbound method of parser_class handling that state.
+    """
+
+    accepted, handlers, messages = [], [], []
+    for state in range(len(GRAMMAR)):
+        _, lengths, message, handler_name = GRAMMAR[state]
+
+        mask = [False] * (max(lengths) + 1)
+        for length in lengths:
+            mask[length] = True
+
+        accepted.append(tuple(mask))
+        handlers.append(getattr(parser_class, handler_name))
+        messages.append(message)
+
+    return tuple(accepted), tuple(handlers), tuple(messages)
@@ -0,0 +1,331 @@
+"""Sidecar index of a scouting file for random access to its sets and rallies.
+
+kiel.txt gets kiel.txt.index.npz next to it,  with the byte offsets of every set line and every rally,
+the lineup on court during every rally and the score before it.
+A rally is then read with one seek and the parser can be started right at it,  see resume_parser.
+
+The index stores the size,  mtime and sha256 of the file it was built from.
+If the size or mtime changed it is only rebuilt when the content did as well.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from data_classes.lineup import Lineup, S, OH, MI, OP
+from data_classes.match_result import MatchResult
+from data_classes.lineup_replay import LineupReplay
+
+from parsing.corpus import MappedFile
+from parsing.errors import ScoutingError
+from parsing.parser import SetParser
+from parsing.tokenizer import SUBSTITUTION, tokenize_many
+from parsing.tracing import Tracer
+
+
+# bump whenever the arrays of the index change
+INDEX_VERSION = 1
+
+SUFFIX = '.index.npz'
+
+
+def index_path(path: str | os.PathLike) -> str:
+
+    return os.fspath(path) + SUFFIX
+
+
+class OffsetIndex():
+    """arrays of the sets,  indexed by set - 1,  and of the rallies of all sets,  indexed by row
+
+        index = load_index('scouting/kiel.txt')
+        row = index.row(set_number=3, rally=18)
+    """
+
+    # per set
+    SET_ARRAYS = ('set_starts', 'set_ends', 'set_lines', 'lineup_ends', 'first_rally')
+
+    # per rally,  slots are the six fixed slots of data_classes/lineup.py and offset the rotations since the start
+    RALLY_ARRAYS = ('set', 'rally', 'starts', 'ends', 'type', 'rotation', 'offset', 'slots', 'setter_slot', 'libero',
+                    'team_score', 'opponent_score')
+
+    def __init__(self, arrays: dict[str, np.ndarray], size: int, mtime: int, digest: str):
+
+        for name in self.SET_ARRAYS + self.RALLY_ARRAYS:
+            setattr(self, name, arrays[name])
+
+        # the file the index belongs to
+        self.size = size
+        self.mtime = mtime
+        self.digest = digest
+
+
+    # Getters
+
+    def __len__(self) -> int:
+        """the number of rallies
+        """
+
+        return len(self.starts)
+
+
+    def sets(self) -> int:
+
+        return len(self.set_starts)
+
+
+    def row(self, set_number: int, rally: int) -> int:
+        """set_number and rally are 1 based,  as the parser counts them
+        """
+
+        assert 1 <= set_number <= self.sets(), f'The file has {self.sets()} sets'
+
+        first = int(self.first_rally[set_number - 1])
+        last = int(self.first_rally[set_number]) if set_number < self.sets() else len(self)
+        assert 1 <= rally <= last - first, f'Set {set_number} has {last - first} rallies'
+
+        return first + rally - 1
+
+
+    def lineup(self, row: int) -> Lineup:
+        """the lineup on court during the rally,  i.e. after the side-out rotation it starts with
+        """
+
+        lineup = Lineup()
+        lineup.slots = self.slots[row].tolist()
+        lineup.offset = int(self.offset[row])
+        lineup.setter = lineup.slots[int(self.setter_slot[row])]
+        lineup.libero = int(self.libero[row])
+        lineup.rotation = int(self.rotation[row])
+
+        # the roles only depend on where the setter stands,  diagonal switches included
+        setter_slot = int(self.setter_slot[row])
+        lineup.roles = [[S, OH, MI, OP, OH, MI][(slot - setter_slot) % 6] for slot in range(6)]
+
+        return lineup
+
+
+    def column(self, row: int) -> int:
+        """1 based column of the first action of the rally in its line
+        """
+
+        return int(self.starts[row] - self.set_starts[self.set[row] - 1]) + 1
+
+
+    def first_of_set(self, row: int) -> bool:
+
+        return int(self.rally[row]) == 1
+
+
+    # Save
+
+    def save(self, path: str):
+        """written to a temporary file first,  a reader never sees half an index
+        """
+
+        arrays = {name: getattr(self, name) for name in self.SET_ARRAYS + self.RALLY_ARRAYS}
+
+        with open(path + '.tmp', 'wb') as file:
+            np.savez(file, version=INDEX_VERSION, size=self.size, mtime=self.mtime, digest=self.digest, **arrays)
+
+        os.replace(path + '.tmp', path)
+
+
+
+##############################    Building    ##############################
+
+def build_index(path: str | os.PathLike) -> OffsetIndex:
+    """one pass over the mapped file,  the lineups are replayed per set by LineupReplay
+    """
+
+    stat = os.stat(path)
+
+    with MappedFile(path) as mapped:
+
+        digest = hashlib.sha256(mapped.buffer).hexdigest()
+        lines = mapped.lines()
+
+        newlines = np.flatnonzero(np.frombuffer(mapped.buffer, dtype=np.uint8) == ord('\n'))
+        set_lines = np.searchsorted(newlines, mapped.starts) + 1
+
+        for set_number, line in enumerate(lines, start=1):
+            if '>' not in line:
+                raise ScoutingError('A set line starts with the lineup followed by >.',
+                                    int(set_lines[set_number - 1]), set_number, 1, line, 'looking for lineup')
+
+        lineup_ends = [line.encode('utf-8').index(b'>') for line in lines]
+        tokens = tokenize_many([line[line.index('>') + 1:] for line in lines])
+
+        rallies = {name: [] for name in OffsetIndex.RALLY_ARRAYS}
+        first_rally = []
+
+        for set_number, (line, tokens_) in enumerate(zip(lines, tokens), start=1):
+            first_rally.append(sum(len(starts) for starts in rallies['starts']))
+
+            line_start = int(mapped.starts[set_number - 1])
+            _index_set(rallies, set_number, line[:line.index('>')], tokens_, line_start + lineup_ends[set_number - 1] + 1,
+                       int(set_lines[set_number - 1]), line_start)
+
+    arrays = {
+        'set_starts': mapped.starts, 'set_ends': mapped.ends, 'set_lines': set_lines.astype(np.int64),
+        'lineup_ends': np.array(lineup_ends, dtype=np.int64), 'first_rally': np.array(first_rally, dtype=np.int64),
+    }
+    for name, parts in rallies.items():
+        arrays[name] = np.concatenate(parts) if parts else np.zeros((0, 6) if name == 'slots' else 0, dtype=np.int64)
+
+    return OffsetIndex(arrays, stat.st_size, stat.st_mtime_ns, digest)
+
+
+def _index_set(rallies: dict[str, list], set_number: int, lineup: str, tokens, actions_start: int,
+               line_number: int, line_start: int):
+    """appends the arrays of the rallies of one set line,  actions_start is the byte offset after its '>',
+    line_number and line_start the line in the file and its byte offset,  to report a broken lineup or substitution
+    """
+
+    lengths = tokens.lengths
+
+    # the width of every token in bytes,  the notation is plain ascii
+    widths = lengths.copy()
+    widths[lengths == SUBSTITUTION] = [len(substitution) for substitution in tokens.substitutions]
+    offsets = actions_start + np.concatenate(([0], np.cumsum(widths + 1)[:-1]))
+
+    starts = tokens.rally_starts()
+    types, substitutions = tokens.rally_structure()
+
+    # a rally ends with its last action,  before the break and the substitutions in front of the next one
+    actions = np.flatnonzero(lengths > 0)
+    next_starts = np.append(starts[1:], len(lengths))
+    last = actions[np.searchsorted(actions, next_starts) - 1]
+
+    try:
+        replay = LineupReplay(lineup, types, substitutions)
+
+    except (ValueError, IndexError, AssertionError) as error:
+        located = _lineup_error(lineup, tokens, offsets, set_number, line_number, line_start)
+        if located is None:
+            raise
+        raise located from error
+
+    # the side serving a rally won the one before
+    won = np.zeros((len(types), 2), dtype=np.int64)
+    won[1:, 0] = types[1:] == 1
+    won[1:, 1] = types[1:] == 2
+    score = np.cumsum(won, axis=0)
+
+    rallies['set'].append(np.full(len(starts), set_number, dtype=np.int64))
+    rallies['rally'].append(np.arange(1, len(starts) + 1, dtype=np.int64))
+    rallies['starts'].append(offsets[starts])
+    rallies['ends'].append(offsets[last] + widths[last])
+    rallies['type'].append(types.astype(np.int64))
+    rallies['rotation'].append(replay.rotation)
+    rallies['offset'].append(replay.offset)
+    rallies['slots'].append(replay.slots)
+    rallies['setter_slot'].append(replay.setter_slot)
+    rallies['libero'].append(replay.libero)
+    rallies['team_score'].append(score[:, 0])
+    rallies['opponent_score'].append(score[:, 1])
+
+
+
+def _lineup_error(lineup: str, tokens, offsets: np.ndarray, set_number: int, line_number: int,
+                  line_start: int) -> ScoutingError | None:
+    """the lineup or the substitution LineupReplay failed on,  as validate_match in parsing/parser.py reports them,
+    replayed one by one on a Lineup
+    """
+
+    replayed = Lineup()
+    try:
+        replayed.determine_lineup(lineup)
+        assert len(replayed.slots) == 6, f'{len(replayed.slots)} players on court'
+
+    except (ValueError, IndexError, AssertionError) as error:
+        return ScoutingError(f'Expected 6 players, the setter and the libero. {error}',
+                             line_number, set_number, 1, lineup, 'looking for lineup')
+
+    positions = np.flatnonzero(tokens.lengths == SUBSTITUTION).tolist()
+    for position, substitution in zip(positions, tokens.substitutions):
+        try:
+            replayed.modify_lineup(substitution)
+
+        except (ValueError, IndexError, AssertionError) as error:
+            return ScoutingError(str(error), line_number, set_number, int(offsets[position]) - line_start + 1,
+                                 substitution, 'reading a substitution')
+
+    return None
+
+
+
+##############################    Loading    ##############################
+
+def read_index(path: str | os.PathLike) -> OffsetIndex | None:
+    """the sidecar of path as it is on disk,  None if there is none or it is of another INDEX_VERSION
+    """
+
+    try:
+        with np.load(index_path(path)) as stored:
+            if int(stored['version']) != INDEX_VERSION:
+                return None
+
+            arrays = {name: stored[name] for name in OffsetIndex.SET_ARRAYS + OffsetIndex.RALLY_ARRAYS}
+
+            return OffsetIndex(arrays, int(stored['size']), int(stored['mtime']), str(stored['digest']))
+
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def load_index(path: str | os.PathLike) -> OffsetIndex:
+    """the sidecar of path,  rebuilt and saved if the file changed since it was built
+    """
+
+    index = read_index(path)
+    stat = os.stat(path)
+
+    if index is not None and index.size == stat.st_size and index.mtime == stat.st_mtime_ns:
+        return index
+
+    if index is not None and index.size == stat.st_size:
+        with open(path, 'rb') as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+
+        # only touched,  e.g. saved without a change
+        if digest == index.digest:
+            index.mtime = stat.st_mtime_ns
+            index.save(index_path(path))
+
+            return index
+
+    index = build_index(path)
+    index.save(index_path(path))
+
+    return index
+
+
+
+##############################    Resuming    ##############################
+
+def resume_parser(index: OffsetIndex, row: int, result: MatchResult, tracer: Tracer | None = None) -> SetParser:
+    """a parser in the state right before the rally of row,  as if the set had been parsed up to there,
+    feeding it the actions of the rally parses only that rally into result
+    """
+
+    lineup = index.lineup(row)
+    first = index.first_of_set(row)
+
+    # the side-out rotation is done by the parser when it reads the first action of the rally
+    if not first and index.type[row] == 1 and index.type[row - 1] == 2:
+        lineup.offset = (lineup.offset - 1) % 6
+        lineup.rotation = (lineup.rotation + 1) % 6
+
+    parser = SetParser(lineup, result, tracer, set_number=int(index.set[row]))
+
+    parser.rally = int(index.rally[row]) - 1
+
+    if not first:
+        parser.team_mode = 'serving' if index.type[row - 1] == 1 else 'receiving'
+
+        # the parser adds the point of the rally before once this one starts
+        parser.team_score = int(index.team_score[row - 1])
+        parser.opponent_score = int(index.opponent_score[row - 1])
+
+    return parser
@@ -0,0 +1,745 @@
+import os
+
+from data_classes.lineup import Lineup
+from data_classes.match_result import MatchResult
+from data_classes.views import View
+from data_classes.events import RALLY, SERVE, RECEPTION, SET, HIT, UNKNOWN_PLAYER
+
+from parsing.grammar import (
+    ACTION, SERVE_TYPE, SERVE_ZONE, SERVE_OUTCOME,
+    RECEPTION_TYPE, RECEPTION_POSITION, RECEPTION_OUTCOME,
+    SET_DESTINATION, SET_TYPE, HIT_TYPE, HIT_ZONE, HIT_OUTCOME,
+    DESCRIPTIONS, compile_grammar,
+)
+from parsing.cache import SetCache
+from parsing.errors import ScoutingError
+from parsing.tokenizer import Tokens, SUBSTITUTION, tokenize_many
+from parsing.tracing import Tracer, OPPOSITE_NOT_IN_FRONTCOURT, OPPOSITE_NOT_IN_BACKCOURT
+
+
+class SetParser():
+    """Parses the actions of a single set,  i.e. everything after the '>' of a set line.
+
+    The grammar lives in parsing/grammar.py,  every state has one handler below,
+    which receives the length of the action and returns the next state.
+    All state is kept on the instance,  so feed can be called repeatedly on consecutive chunks of a set.
+    """
+
+    def __init__(self, lineup: Lineup, result: MatchResult, tracer: Tracer | None = None, set_number: int = 1):
+
+        self.lineup = lineup
+
+        self.serves = result.serves
+        self.receptions = result.receptions
+        self.sets_c1 = result.sets_k1
+        self.sets_c2 = result.sets_k2
+        self.hits = result.hits
+        self.breaks = result.breaks
+
+        # the handlers of the counters which are not requested skip their bookkeeping
+        self.handlers = handlers_for(result.outputs)
+
+        # None runs feed without any tracing code
+        self.tracer = tracer
+        self.anomalies = result.anomalies
+
+        # number of actions fed so far,  the index of an action within the set line
+        self.actions_read = 0
+
+        # rows of the event table,  None if the events are not collected,
+        # the views of the result also need the rows of the sets,  or of everything if they count hits
+        self.events = None
+        if result.events is not None:
+            self.events = result.events.rows
+        elif result.needs_hit_rows():
+            self.events = result.view_rows.rows
+
+        self.set_events = self.events
+        if self.set_events is None and result.view_rows is not None:
+            self.set_events = result.view_rows.rows
+        self.set_number = set_number
+        self.rally = 0
+        self.rotation = 0
+
+        # every rally with the score before it,  the score of the set starts at 0 : 0
+        self.rallies = result.rallies.rows
+        self.team_score = 0
+        self.opponent_score = 0
+
+        self.state = ACTION
+
+        # stores the last beginning of a play
+        # serve -> serve indicates a won breakpoint
+        # reception -> reception indicates a lost sideout
+        # is used for the breakpoints and to determine when to rotate the lineup
+        self.team_mode = 'none'
+
+        # 1 for reception, 2 for defense,
+        # only interesting for set distribution, therefore we only care if K1 or K2
+        self.complex = 0
+
+        self.serves_player = 0
+        self.serves_type = 0
+        self.serves_zone = 0
+
+        self.receptions_player = 0
+        self.receptions_type = 0
+        self.receptions_position = 0
+        self.receptions_outcome = 0
+
+        self.sets_destination = 0
+        self.previous_destination = 0
+        self.hits_player = 0
+        self.hits_set_type = 0
+        self.hits_type = 0
+        self.hits_zone = 0
+
+
+    # Driver
+
+    def feed(self, actions: list[str]):
+        """actions are the set line split on single spaces,
+        breaks become empty strings ''
+        """
+
+        if self.tracer is not None:
+            return self._feed_traced(actions)
+
+        lengths = [SUBSTITUTION if action[:1] == '<' else len(action) for action in actions]
+        substitutions = [action for action in actions if action[:1] == '<']
+
+        self._feed_lengths(lengths, substitutions)
+
+
+    def feed_tokens(self, tokens: Tokens):
+        """the same as feed,  but on the token lengths of parsing/tokenizer.py
+        """
+
+        self._feed_lengths(tokens.lengths.tolist(), tokens.substitutions)
+
+
+    def _feed_lengths(self, lengths: list[int], substitutions: list[str]):
+        """runs the grammar on the token lengths,  0 for a break and SUBSTITUTION for a substitution,
+        the text of the substitutions in the order they occur
+        """
+
+        accepted, handlers, messages = _ACCEPTED, self.handlers, _MESSAGES
+        lineup = self.lineup
+        substitutions = iter(substitutions)
+
+        state = self.state
+        for length in lengths:
+
+            # a break
+            if length == 0:
+                state = ACTION
+                continue
+
+            if length == SUBSTITUTION:
+                lineup.modify_lineup(substitution=next(substitutions))
+                continue
+
+            mask = accepted[state]
+            if length >= len(mask) or not mask[length]:
+                self.state = state
+                raise AssertionError(f'ERR: action {"." * length} not eligible. {messages[state]}')
+
+            state = handlers[state](self, length)
+
+        self.state = state
+        self.actions_read += len(lengths)
+
+
+    def _feed_traced(self, actions: list[str]):
+        """the same loop as feed,  but every transition is passed to the tracer
+        """
+
+        accepted, handlers, messages = _ACCEPTED, self.handlers, _MESSAGES
+        lineup = self.lineup
+        tracer, set_number = self.tracer, self.set_number
+
+        state = self.state
+        for ii, action in enumerate(actions, start=self.actions_read):
+
+            if action == '':
+                next_state = ACTION
+
+            elif action[0] == '<':
+                lineup.modify_lineup(substitution=action)
+                next_state = state
+
+            else:
+                length = len(action)
+                mask = accepted[state]
+                if length >= len(mask) or not mask[length]:
+                    self.state = state
+                    raise AssertionError(f'ERR: action {action} not eligible. {messages[state]}')
+
+                next_state = handlers[state](self, length)
+
+            tracer.transition(set_number, ii, state, action, next_state)
+            state = next_state
+
+        self.state = state
+        self.actions_read += len(actions)
+
+
+    def validate(self, actions: list[str], errors: list[ScoutingError], line: int, column: int):
+        """like feed,  but every malformed action is appended to errors instead of raised,
+        the rest of that rally is skipped and parsing resumes at the next break
+
+        line and column are the position of the first action in the scouting file
+        """
+
+        accepted, handlers, messages = _ACCEPTED, self.handlers, _MESSAGES
+        lineup = self.lineup
+
+        state = self.state
+        skipping = False
+        for action in actions:
+
+            token_column = column
+            column += len(action) + 1
+
+            if action == '':
+                state = ACTION
+                skipping = False
+                continue
+
+            try:
+                # substitutions are applied even within a skipped rally,  the lineup has to stay right
+                if action[0] == '<':
+                    lineup.modify_lineup(substitution=action)
+                    continue
+
+                if skipping:
+                    continue
+
+                length = len(action)
+                mask = accepted[state]
+                if length >= len(mask) or not mask[length]:
+                    raise AssertionError(messages[state])
+
+                state = handlers[state](self, length)
+
+            except Exception as error:
+                expected = 'reading a substitution' if action[0] == '<' else DESCRIPTIONS[state]
+                errors.append(ScoutingError(str(error), line, self.set_number, token_column, action, expected))
+
+                skipping = action[0] != '<'
+
+        self.state = state
+        self.actions_read += len(actions)
+
+
+    # Handlers
+
+    def _on_action(self, length: int) -> int:
+        """the only state in which the team mode can change and therefore the rotation
+        """
+
+        lineup = self.lineup
+
+        self.rally += 1
+        self.receptions_position = 0
+        self.receptions_outcome = 0
+        self.previous_destination = 0
+
+        # .  --  indicates a serve
+        if length == 1:
+
+            if self.team_mode == 'receiving':
+                lineup.rotate_lineup()
+
+            # serving -> serving
+            elif self.team_mode == 'serving' and self.breaks is not None:
+                self.breaks.won_breakpoint(rotation = lineup.get_rotation())
+
+                self.breaks.won_breakpoint(player = lineup.get_server())
+
+            self.team_mode = 'serving'
+
+            self.serves_player = lineup.get_server()
+
+            # to reiterate  --  1 for K1,  2 for K2
+            self.complex = 2
+
+            self._start_rally(1)
+
+            return SERVE_TYPE
+
+        # ..  --  indicates a reception
+        # receiving -> receiving
+        if self.team_mode == 'receiving' and self.breaks is not None:
+            self.breaks.lost_sideout(lineup.get_rotation())
+
+        self.team_mode = 'receiving'
+
+        # to reiterate  --  1 for K1  --  2 for K2
+        self.complex = 1
+
+        self._start_rally(2)
+
+        return RECEPTION_TYPE
+
+
+    def _start_rally(self, type_: int):
+        """type_ is who serves,  1 the team and 2 the opponent,  the side serving now won the rally before
+        """
+
+        if self.rally > 1:
+            if type_ == 1:
+                self.team_score += 1
+            else:
+                self.opponent_score += 1
+
+        self.rotation = self.lineup.get_rotation()
+        score = (self.team_score, self.opponent_score)
+
+        self.rallies.append((self.set_number, self.rally, type_, self.rotation, *score))
+
+        if self.events is not None:
+            self.events.append((self.set_number, self.rally, RALLY, self.rotation, self.complex,
+                                self.lineup.get_server(), 0, type_, 0, 0, 0, 0, 0, 0, *score))
+
+
+    def _on_serve_type(self, length: int) -> int:
+
+        self.serves_type = length
+
+        return SERVE_ZONE
+
+
+    def _on_serve_zone(self, length: int) -> int:
+
+        self.serves_zone = length
+
+        return SERVE_OUTCOME
+
+
+    def _on_serve_outcome(self, length: int) -> int:
+
+        self.serves.add_serve_to_player(self.serves_player, self.serves_type, self.serves_zone, length)
+
+        if self.events is not None:
+            self.events.append((self.set_number, self.rally, SERVE, self.rotation, self.complex,
+                                self.serves_player, 0, self.serves_type, self.serves_zone, length, 0, 0, 0, 0,
+                                self.team_score, self.opponent_score))
+
+        # ..  --  came back over,  ...  --  received
+        if length == 2 or length == 3:
+            return SET_DESTINATION
+
+        return SERVE_OUTCOME
+
+
+    def _on_reception_type(self, length: int) -> int:
+
+        self.receptions_type = length
+
+        return RECEPTION_POSITION
+
+
+    def _on_reception_position(self, length: int) -> int:
+
+        # opposing team missed their serve
+        if length == 0:
+            return ACTION
+
+        self.receptions_position = length
+
+        self.receptions_player = self.lineup.get_receiving_player_on_position(length)
+
+        return RECEPTION_OUTCOME
+
+
+    def _on_reception_outcome(self, length: int) -> int:
+
+        self.receptions.add_reception_to_player(self.receptions_player, self.receptions_type, length)
+        self.receptions_outcome = length
+
+        if self.events is not None:
+            self.events.append((self.set_number, self.rally, RECEPTION, self.rotation, self.complex,
+                                self.receptions_player, self.receptions_position, self.receptions_type, 0, length, 0,
+                                self.receptions_position, length, 0, self.team_score, self.opponent_score))
+
+        # if it was an ace,  then the next action is an empty string
+        # if it came back over the next,  then the next action of the team being scouted
+        #     is technically a defense,  which is not being taken into account,
+        #     thus the next action would be a set
+        if length == 4:
+            self.complex = 2    # potentially if the ball comes back
+
+        return SET_DESTINATION
+
+
+    def _on_set_destination(self, length: int) -> int:
+
+        length = self.sets_destination = self._corrected_destination(length)
+
+        # careful the set destination is given as 1 - 6,  the lineup positions are stored as 0 - 5
+        self.hits_player = self.lineup.get_hitting_player_on_position(length)
+
+        return SET_TYPE
+
+
+    def _corrected_destination(self, length: int) -> int:
+
+        lineup = self.lineup
+
+        # check if set destination is possible
+        if length == 2 and lineup.is_in_frontcourt(lineup.setter):
+            length = 1
+            self._anomaly(OPPOSITE_NOT_IN_FRONTCOURT)
+
+        elif length == 1 and lineup.is_in_backcourt(lineup.setter):
+            length = 2
+            self._anomaly(OPPOSITE_NOT_IN_BACKCOURT)
+
+        return length
+
+
+    def _anomaly(self, kind: str):
+
+        self.anomalies[kind] = self.anomalies.get(kind, 0) + 1
+
+        if self.tracer is not None:
+            self.tracer.anomaly(self.set_number, kind, self.lineup.lineup)
+
+
+    def _on_set_type(self, length: int) -> int:
+
+        self.hits_set_type = length
+
+        lineup = self.lineup
+        rotation = lineup.get_rotation()
+
+        # sets_k3 and other slices are views,  counted from self.set_events afterwards
+        if self.complex == 1:
+            if self.sets_c1 is not None:
+                self.sets_c1.add_set_to_player(lineup.setter, rotation, self.sets_destination, length)
+
+        elif self.complex == 2 and self.sets_c2 is not None:
+            self.sets_c2.add_set_to_player(lineup.setter, rotation, self.sets_destination, length)
+
+        if self.set_events is not None:
+            self.set_events.append((self.set_number, self.rally, SET, rotation, self.complex,
+                                    lineup.setter, self.sets_destination, length, 0, 0, 0, self.receptions_position,
+                                    self.receptions_outcome, self.previous_destination, self.team_score,
+                                    self.opponent_score))
+
+        return HIT_TYPE
+
+
+    def _on_hit_type(self, length: int) -> int:
+
+        self.hits_type = length
+
+        return HIT_ZONE
+
+
+    def _on_hit_zone(self, length: int) -> int:
+
+        self.hits_zone = length
+
+        return HIT_OUTCOME
+
+
+    def _on_hit_outcome(self, length: int) -> int:
+
+        self.hits.add_hit_to_player(self.hits_player, self.sets_destination, self.hits_set_type, self.hits_zone, length)
+
+        if self.events is not None:
+            player = self.hits_player if self.hits_player is not None else UNKNOWN_PLAYER
+            self.events.append((self.set_number, self.rally, HIT, self.rotation, self.complex,
+                                player, self.sets_destination, self.hits_set_type, self.hits_zone, length, self.hits_type,
+                                self.receptions_position, self.receptions_outcome, self.previous_destination,
+                                self.team_score, self.opponent_score))
+
+        self.previous_destination = self.sets_destination
+
+        # ..  --  defended  --  that includes a defense which comes straight back over and rebound off the block
+        if length == 2:
+            self.complex = 2    # potential return of ball
+
+            return SET_DESTINATION
+
+        return HIT_OUTCOME
+
+
+    # Handlers without bookkeeping,  for counters that were not requested
+    # they only keep what the next states and the other counters need
+
+
+    def _skip_serve_type(self, length: int) -> int:
+
+        return SERVE_ZONE
+
+
+    def _skip_serve_zone(self, length: int) -> int:
+
+        return SERVE_OUTCOME
+
+
+    def _skip_serve_outcome(self, length: int) -> int:
+
+        if length == 2 or length == 3:
+            return SET_DESTINATION
+
+        return SERVE_OUTCOME
+
+
+    def _skip_reception_type(self, length: int) -> int:
+
+        return RECEPTION_POSITION
+
+
+    def _skip_reception_position(self, length: int) -> int:
+
+        if length == 0:
+            return ACTION
+
+        # sets_k3 depends on it
+        self.receptions_position = length
+
+        return RECEPTION_OUTCOME
+
+
+    def _skip_reception_outcome(self, length: int) -> int:
+
+        # the views depend on it
+        self.receptions_outcome = length
+
+        if length == 4:
+            self.complex = 2
+
+        return SET_DESTINATION
+
+
+    def _skip_set_destination(self, length: int) -> int:
+        """corrects the destination for the sets,  but does not look for the hitter
+        """
+
+        self.sets_destination = self._corrected_destination(length)
+
+        return SET_TYPE
+
+
+    def _skip_set_type(self, length: int) -> int:
+
+        return HIT_TYPE
+
+
+    def _skip_hit_type(self, length: int) -> int:
+
+        return HIT_ZONE
+
+
+    def _skip_hit_zone(self, length: int) -> int:
+
+        return HIT_OUTCOME
+
+
+    def _skip_hit_outcome(self, length: int) -> int:
+
+        self.previous_destination = self.sets_destination
+
+        if length == 2:
+            self.complex = 2
+
+            return SET_DESTINATION
+
+        return HIT_OUTCOME
+
+
+_ACCEPTED, _HANDLERS, _MESSAGES = compile_grammar(SetParser)
+
+
+# state:  (the outputs which need the full handler,  the handler without bookkeeping)
+_SKIPPABLE = {
+    SERVE_TYPE: ({'serves'}, '_skip_serve_type'),
+    SERVE_ZONE: ({'serves'}, '_skip_serve_zone'),
+    SERVE_OUTCOME: ({'serves'}, '_skip_serve_outcome'),
+
+    RECEPTION_TYPE: ({'receptions'}, '_skip_reception_type'),
+    RECEPTION_POSITION: ({'receptions'}, '_skip_reception_position'),
+    RECEPTION_OUTCOME: ({'receptions'}, '_skip_reception_outcome'),
+
+    SET_DESTINATION: ({'hits'}, '_skip_set_destination'),
+    SET_TYPE: ({'sets_k1', 'sets_k2', 'sets_k3', 'hits'}, '_skip_set_type'),
+
+    HIT_TYPE: ({'hits'}, '_skip_hit_type'),
+    HIT_ZONE: ({'hits'}, '_skip_hit_zone'),
+    HIT_OUTCOME: ({'hits'}, '_skip_hit_outcome'),
+}
+
+_HANDLERS_FOR = {}
+
+
+def handlers_for(outputs: frozenset[str]) -> tuple:
+    """the handler of every state for the requested outputs,  the full handlers if every output is requested
+    """
+
+    handlers = _HANDLERS_FOR.get(outputs)
+    if handlers is not None:
+        return handlers
+
+    handlers = list(_HANDLERS)
+    for state, (needed_by, skip) in _SKIPPABLE.items():
+        if not needed_by & outputs:
+            handlers[state] = getattr(SetParser, skip)
+
+    handlers = _HANDLERS_FOR[outputs] = tuple(handlers)
+
+    return handlers
+
+
+
+##############################    API    ##############################
+
+def set_lines(text: str) -> list[str]:
+    """the lines of a scouting file which describe a set,
+    comments, empty lines and the serve position / serve type lines are dropped
+    """
+
+    lines = text.split('\n')
+
+    return [line for line in lines if not (line.startswith('#') or line.startswith('>') or len(line) == 0)]
+
+
+def numbered_set_lines(text: str) -> list[tuple[int, str]]:
+    """set_lines together with their 1 based line number in the file
+    """
+
+    lines = text.split('\n')
+
+    return [
+        (number, line) for number, line in enumerate(lines, start=1)
+        if not (line.startswith('#') or line.startswith('>') or len(line) == 0)
+    ]
+
+
+def parse_set(line: str, result: MatchResult, tracer: Tracer | None = None, set_number: int = 1,
+              tokens: Tokens | None = None) -> MatchResult:
+    """e.g. 3 15 8 11 13 12 12 2>.. . ..... . ....
+
+    adds the set to result and returns it,
+    tokens are the tokenized actions of the line if they are at hand,  they are not used while tracing
+    """
+
+    _parse_set(line, result, tracer, set_number, tokens)
+    result.evaluate_views()
+
+    return result
+
+
+def _parse_set(line: str, result: MatchResult, tracer: Tracer | None, set_number: int, tokens: Tokens | None):
+    """parse_set without evaluating the views,  so that parse_match evaluates them once for all sets
+    """
+
+    # index gives back the first occurrence
+    first_occurence = line.index('>')
+    lineup_, actions = line[:first_occurence], line[first_occurence + 1:]
+
+    lineup = Lineup()
+    lineup.determine_lineup(lineup_)
+
+    if tracer is not None:
+        tracer.start_set(set_number, lineup.lineup)
+
+    parser = SetParser(lineup, result, tracer, set_number)
+
+    if tokens is not None and tracer is None:
+        parser.feed_tokens(tokens)
+    else:
+        # pauses vanish
+        # breaks become empty strings ''
+        parser.feed(actions.split(' '))
+
+
+def tokenize_set_lines(lines: list[str]) -> list[Tokens]:
+    """the actions of all set lines tokenized at once,  see parsing/tokenizer.py
+    """
+
+    return tokenize_many([line[line.index('>') + 1:] for line in lines])
+
+
+def parse_match(source: str | os.PathLike, tracer: Tracer | None = None, events: bool = False,
+                cache: SetCache | None = None, outputs: set[str] | None = None,
+                views: list[View] | None = None) -> MatchResult:
+    """source is either the text of a scouting file or a path to one,
+    a plain str is always treated as text,  pass a pathlib.Path for files
+
+    nothing is printed or written,  unless the tracer does so,
+    events also collects the columnar event table in result.events
+
+    with a cache,  see parsing/cache.py,  only set lines that are not in the cache are parsed,
+    the tracer only sees those
+
+    outputs,  e.g. {'sets_k1', 'hits'},  only fills those counters of data_classes/match_result.py OUTPUTS,
+    the parser skips the bookkeeping of the others,
+    views are additional slices of the sets and hits counted into result.views,  see data_classes/views.py
+    """
+
+    assert cache is None or not views, 'Views cannot be cached'
+
+
+    if isinstance(source, os.PathLike):
+        with open(source, 'r', encoding='utf-8') as file:
+            source = file.read()
+
+    result = MatchResult(events=events, outputs=outputs, views=views)
+
+    lines = set_lines(source)
+    tokens = tokenize_set_lines(lines) if tracer is None else [None] * len(lines)
+
+    for i, (line, tokens_) in enumerate(zip(lines, tokens)):
+
+        if cache is None:
+            _parse_set(line, result, tracer, i + 1, tokens_)
+            continue
+
+        partial = cache.get(line, i + 1, events, result.outputs)
+        if partial is None:
+            partial = parse_set(line, MatchResult(events=events, outputs=outputs), tracer, set_number=i + 1, tokens=tokens_)
+            cache.put(line, i + 1, events, partial)
+
+        result.merge(partial)
+
+    result.evaluate_views()
+
+    return result
+
+
+def validate_match(source: str | os.PathLike) -> list[ScoutingError]:
+    """runs the whole file through the grammar and returns every error instead of stopping at the first one,
+    source as for parse_match,  an empty list means parse_match will succeed
+    """
+
+    if isinstance(source, os.PathLike):
+        with open(source, 'r', encoding='utf-8') as file:
+            source = file.read()
+
+    result = MatchResult()
+    errors = []
+
+    for set_number, (line_number, line) in enumerate(numbered_set_lines(source), start=1):
+
+        if '>' not in line:
+            errors.append(ScoutingError('A set line starts with the lineup followed by >.', line_number, set_number, 1, line, 'looking for lineup'))
+            continue
+
+        first_occurence = line.index('>')
+        lineup_, actions = line[:first_occurence], line[first_occurence + 1:]
+
+        lineup = Lineup()
+        try:
+            lineup.determine_lineup(lineup_)
+        except (ValueError, IndexError) as error:
+            errors.append(ScoutingError(
+                f'Expected 6 players, the setter and the libero. {error}', line_number, set_number, 1, lineup_, 'looking for lineup'))
+            continue
+
+        SetParser(lineup, result, set_number=set_number).validate(actions.split(' '), errors, line_number, first_occurence + 2)
+
+    return errors
@@ -0,0 +1,242 @@
+"""Season and opponent rollups,  kept up to date match by match.
+
+rollups/ keeps the counters of every match added to it and their sums for the season and for every opponent.
+Adding a match adds its counters to both sums,  replacing one subtracts the counters it had before,
+so no match is ever parsed twice and a rollup is a single file no matter how many matches it has.
+
+    rollups/index.json                  name -> opponent,  sha256 and PARSER_VERSION of every match
+    rollups/matches/kiel.txt.pickle     the counters of one match
+    rollups/season.pickle               the sum of all matches
+    rollups/opponents/kiel.pickle       the sum of the matches against one opponent
+
+The rollups have every counter but neither the events nor the rallies,  which grow with every match.
+"""
+
+import json
+import os
+import pickle
+import shutil
+
+from data_classes.match_result import MatchResult, OUTPUTS
+from data_classes.counts import add_counts
+from data_classes.store import digest_of
+
+from parsing.batch import opponent_of, parse_files
+from parsing.cache import PARSER_VERSION, MatchCache
+
+
+# bump whenever the pickled results change,  older rollups are started from scratch
+ROLLUP_VERSION = 1
+
+# files parsed at once
+BATCH = 16
+
+SEASON = 'season'
+
+
+def counters_of(result: MatchResult) -> MatchResult:
+    """a copy of the counters and anomalies of result,  without the events,  rallies and views
+    """
+
+    counters = MatchResult(outputs=result.outputs)
+
+    for name in result.outputs:
+        getattr(counters, name).merge(getattr(result, name))
+
+    add_counts(counters.anomalies, result.anomalies)
+
+    return counters
+
+
+class Rollups():
+    """the rollups in directory,  e.g. rollups/,  changes are kept in memory until save
+    """
+
+    def __init__(self, directory: str):
+
+        self.directory = directory
+
+        try:
+            with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as file:
+                index = json.load(file)
+
+        except (OSError, ValueError):
+            index = {'version': ROLLUP_VERSION, 'matches': {}}
+
+        if index['version'] != ROLLUP_VERSION:
+            shutil.rmtree(directory)
+            index = {'version': ROLLUP_VERSION, 'matches': {}}
+
+        os.makedirs(os.path.join(directory, 'matches'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'opponents'), exist_ok=True)
+
+        # name -> {'opponent': ..,  'digest': ..,  'parser_version': ..}
+        self.matches = index['matches']
+
+        # loaded sums by SEASON or opponent,  and the changes which are not saved yet
+        self._rollups = {}
+        self._changed = set()
+        self._added = {}
+        self._removed = set()
+
+
+    # Getters
+
+    def unchanged(self, name: str, digest: str) -> bool:
+        """whether the match name is in the rollups from a file with this digest by this PARSER_VERSION
+        """
+
+        match = self.matches.get(name)
+
+        return match is not None and match['digest'] == digest and match['parser_version'] == PARSER_VERSION
+
+
+    def season(self) -> MatchResult:
+
+        return self._rollup(SEASON)
+
+
+    def opponent(self, opponent: str) -> MatchResult:
+
+        return self._rollup(opponent)
+
+
+    def opponents(self) -> list[str]:
+
+        return sorted({match['opponent'] for match in self.matches.values()})
+
+
+    def sources(self, opponent: str | None = None) -> dict[str, str]:
+        """the sha256 of the files of the season,  or of one opponent,  by name
+        """
+
+        return {name: match['digest'] for name, match in self.matches.items()
+                if opponent is None or match['opponent'] == opponent}
+
+
+    # Modifiers
+
+    def add(self, name: str, opponent: str, digest: str, result: MatchResult):
+        """adds the counters of result as the match name,  a match of the same name is replaced
+        """
+
+        assert set(result.outputs) == set(OUTPUTS), 'A rollup needs every counter'
+
+        if name in self.matches:
+            self.remove(name)
+
+        counters = counters_of(result)
+
+        self.season().merge(counters)
+        self.opponent(opponent).merge(counters)
+        self._changed.update([SEASON, opponent])
+
+        self.matches[name] = {'opponent': opponent, 'digest': digest, 'parser_version': PARSER_VERSION}
+        self._added[name] = counters
+        self._removed.discard(name)
+
+
+    def remove(self, name: str):
+        """subtracts the counters the match name was added with
+        """
+
+        opponent = self.matches.pop(name)['opponent']
+        counters = self._added.pop(name, None) or self._load(os.path.join('matches', name + '.pickle'))
+
+        self.season().subtract(counters)
+        self.opponent(opponent).subtract(counters)
+        self._changed.update([SEASON, opponent])
+
+        self._removed.add(name)
+
+
+    # Save
+
+    def save(self):
+        """writes the changed matches and sums,  index.json last
+        """
+
+        for name in self._removed:
+            path = self._path(os.path.join('matches', name + '.pickle'))
+            if os.path.exists(path):
+                os.remove(path)
+
+        for name, counters in self._added.items():
+            self._dump(os.path.join('matches', name + '.pickle'), counters)
+
+        opponents = set(self.opponents())
+        for key in self._changed:
+
+            if key == SEASON or key in opponents:
+                self._dump(self._file(key), self._rollups[key])
+
+            # the last match against the opponent was removed
+            elif os.path.exists(self._path(self._file(key))):
+                os.remove(self._path(self._file(key)))
+
+        with open(self._path('index.json.tmp'), 'w', encoding='utf-8') as file:
+            file.write(json.dumps({'version': ROLLUP_VERSION, 'matches': self.matches}, indent=4))
+
+        os.replace(self._path('index.json.tmp'), self._path('index.json'))
+
+        self._changed.clear()
+        self._added.clear()
+        self._removed.clear()
+
+
+    def _file(self, key: str) -> str:
+
+        return SEASON + '.pickle' if key == SEASON else os.path.join('opponents', key + '.pickle')
+
+
+    def _path(self, file: str) -> str:
+
+        return os.path.join(self.directory, file)
+
+
+    def _rollup(self, key: str) -> MatchResult:
+
+        if key not in self._rollups:
+            path = self._path(self._file(key))
+            self._rollups[key] = self._load(self._file(key)) if os.path.exists(path) else MatchResult()
+
+        return self._rollups[key]
+
+
+    def _load(self, file: str) -> MatchResult:
+
+        with open(self._path(file), 'rb') as infile:
+            return pickle.load(infile)
+
+
+    def _dump(self, file: str, result: MatchResult):
+        """written to a temporary file first,  so an interrupted run never leaves half a pickle behind
+        """
+
+        with open(self._path(file) + '.tmp', 'wb') as outfile:
+            pickle.dump(result, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(self._path(file) + '.tmp', self._path(file))
+
+
+
+##############################    Update    ##############################
+
+def update_files(rollups: Rollups, paths: list[str], jobs: int | None = None,
+                 cache: MatchCache | None = None) -> tuple[int, int]:
+    """adds the files that changed since they were added,  replacing their old counters,  and saves the rollups,
+    returns the number of files added and skipped,  see parse_files for the cache
+    """
+
+    digests = {path: digest_of(path) for path in paths}
+    changed = [path for path in paths if not rollups.unchanged(os.path.basename(path), digests[path])]
+
+    for start in range(0, len(changed), BATCH):
+        batch = changed[start:start + BATCH]
+
+        for path, result in zip(batch, parse_files(batch, jobs=jobs, cache=cache)):
+            rollups.add(os.path.basename(path), opponent_of(path), digests[path], result)
+
+    rollups.save()
+
+    return len(changed), len(paths) - len(changed)
@@ -0,0 +1,113 @@
+"""Tokenizes the actions of set lines with numpy instead of str.split and len.
+
+Every token is a run of '.' whose length is the code,  so a set line only has to be turned into the lengths
+of its tokens,  which are the distances between consecutive spaces.
+In the lengths a break,  i.e. a double space,  is a 0 and a substitution is SUBSTITUTION,
+the text of the substitutions is kept separately in the order they occur.
+"""
+
+import numpy as np
+
+
+SUBSTITUTION = -1
+
+_SPACE = ord(' ')
+_NEWLINE = ord('\n')
+_OPEN = ord('<')
+
+
+class Tokens():
+    """the tokens of the actions of one set line
+    """
+
+    __slots__ = ('lengths', 'substitutions')
+
+    def __init__(self, lengths: np.ndarray, substitutions: list[str]):
+
+        # one entry per token of actions.split(' '),  0 for a break,  SUBSTITUTION for a substitution
+        self.lengths = lengths
+
+        # e.g. ['<12x13>', '<x>']
+        self.substitutions = substitutions
+
+
+    # Getters
+
+    def rally_starts(self) -> np.ndarray:
+        """index of the first action of every rally,  as the parser starts them:
+        a rally starts with the first action after a break,  substitutions in between are skipped
+        """
+
+        lengths = self.lengths
+
+        # the parser keeps its state over a substitution,  so only the other tokens tell where a rally starts
+        kept = np.flatnonzero(lengths != SUBSTITUTION)
+        actions = lengths[kept]
+
+        previous = np.zeros(len(actions), dtype=lengths.dtype)
+        previous[1:] = actions[:-1]
+
+        return kept[(actions > 0) & (previous == 0)]
+
+
+    def rally_structure(self) -> tuple[np.ndarray, list[tuple[int, str]]]:
+        """the type of every rally,  1 serve 2 reception,  and every substitution with the rally it precedes,
+        as LineupReplay expects them,  a substitution within a rally counts from the next one on
+        """
+
+        starts = self.rally_starts()
+
+        positions = np.flatnonzero(self.lengths == SUBSTITUTION)
+        rallies = np.searchsorted(starts, positions).tolist()
+
+        return self.lengths[starts], list(zip(rallies, self.substitutions))
+
+
+
+##############################    Tokenize    ##############################
+
+def tokenize_many(actions: list[str]) -> list[Tokens]:
+    """the actions of many set lines,  i.e. everything after the '>',  tokenized in one pass
+    """
+
+    if not actions:
+        return []
+
+    text = '\n'.join(actions).encode('utf-8')
+    buffer = np.frombuffer(text, dtype=np.uint8)
+
+    # every space and newline ends a token,  the sentinels close the first and the last one
+    separators = np.flatnonzero((buffer == _SPACE) | (buffer == _NEWLINE))
+    boundaries = np.concatenate(([-1], separators, [len(buffer)]))
+
+    # lengths in bytes,  the same as in characters since the notation is plain ascii
+    starts = boundaries[:-1] + 1
+    lengths = np.diff(boundaries) - 1
+
+    opened = np.zeros(len(lengths), dtype=bool)
+    filled = lengths > 0
+    opened[filled] = buffer[starts[filled]] == _OPEN
+    lengths[opened] = SUBSTITUTION
+
+    ends = boundaries[1:]
+    substitutions = [text[start:end].decode('utf-8') for start, end in zip(starts[opened].tolist(), ends[opened].tolist())]
+
+    # the token after every newline starts the next line
+    newlines = np.flatnonzero(buffer[separators] == _NEWLINE) + 1
+    line_of_substitution = np.searchsorted(newlines, np.flatnonzero(opened), side='right')
+    counts = np.bincount(line_of_substitution, minlength=len(actions)).tolist()
+
+    tokens = []
+    taken = 0
+    for lengths_, count in zip(np.split(lengths, newlines), counts):
+        tokens.append(Tokens(lengths_, substitutions[taken:taken + count]))
+        taken += count
+
+    return tokens
+
+
+def tokenize(actions: str) -> Tokens:
+    """e.g. '.. . ..... .  . <12x13>'
+    """
+
+    return tokenize_many([actions])[0]
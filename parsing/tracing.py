@@ -0,0 +1,118 @@
+"""Optional tracing of the parser.
+
+The parser only calls a tracer if one was passed,  otherwise it runs a loop without any tracing code.
+Anomalies,  i.e. scouting mistakes the parser corrected,  are always counted on the MatchResult
+and can be reported once with anomaly_summary.
+"""
+
+import collections
+import json
+
+from parsing.grammar import DESCRIPTIONS
+
+
+# kinds of anomalies
+OPPOSITE_NOT_IN_FRONTCOURT = 'opposite set on 2 while in the backcourt,  counted as 1'
+OPPOSITE_NOT_IN_BACKCOURT = 'opposite set on 1 while in the frontcourt,  counted as 2'
+
+
+class Tracer():
+    """Does nothing,  subclasses override what they are interested in
+    """
+
+    def start_set(self, set_number: int, lineup: list[int]):
+        pass
+
+
+    def transition(self, set_number: int, index: int, state: int, action: str, next_state: int):
+        """index is the index of the action within the set line,  state the state the action was read in
+        """
+        pass
+
+
+    def anomaly(self, set_number: int, kind: str, lineup: list[int]):
+        pass
+
+
+    def close(self):
+        pass
+
+
+class PrintTracer(Tracer):
+    """prints every action,  as analysis.py always used to
+    """
+
+    def start_set(self, set_number: int, lineup: list[int]):
+        print(f'set: {set_number}')
+
+
+    def transition(self, set_number: int, index: int, state: int, action: str, next_state: int):
+        print(DESCRIPTIONS[state], f'action {index}', action)
+
+
+    def anomaly(self, set_number: int, kind: str, lineup: list[int]):
+        print(f'Faulty scouting in set {set_number}: {kind},  current lineup: {lineup}')
+
+
+class RingBufferTracer(Tracer):
+    """keeps only the last maxlen transitions,  cheap enough to leave on and dump when the parser fails
+    """
+
+    def __init__(self, maxlen: int = 64):
+
+        self.transitions = collections.deque(maxlen=maxlen)
+
+
+    def transition(self, set_number: int, index: int, state: int, action: str, next_state: int):
+        self.transitions.append((set_number, index, state, action, next_state))
+
+
+    def dump(self) -> list[str]:
+
+        return [
+            f'set {set_number}  action {index:4}  {DESCRIPTIONS[state]:40}  {action!r}'
+            for set_number, index, state, action, _ in self.transitions
+        ]
+
+
+class JsonlTracer(Tracer):
+    """writes one json object per set start, transition and anomaly to path
+    """
+
+    def __init__(self, path: str):
+
+        self.file = open(path, 'w', encoding='utf-8')
+
+
+    def start_set(self, set_number: int, lineup: list[int]):
+        self._write({'event': 'set', 'set': set_number, 'lineup': lineup})
+
+
+    def transition(self, set_number: int, index: int, state: int, action: str, next_state: int):
+        self._write({
+            'event': 'transition', 'set': set_number, 'action': index, 'token': action,
+            'state': DESCRIPTIONS[state], 'next_state': DESCRIPTIONS[next_state],
+        })
+
+
+    def anomaly(self, set_number: int, kind: str, lineup: list[int]):
+        self._write({'event': 'anomaly', 'set': set_number, 'kind': kind, 'lineup': lineup})
+
+
+    def close(self):
+        self.file.close()
+
+
+    def _write(self, record: dict):
+        self.file.write(json.dumps(record))
+        self.file.write('\n')
+
+
+
+##############################    Summary    ##############################
+
+def anomaly_summary(anomalies: dict[str, int]) -> str:
+    """one line per kind of anomaly,  empty if the scouting was clean
+    """
+
+    return '\n'.join(f'Faulty scouting {count} times:  {kind}' for kind, count in anomalies.items())
@@ -9,12 +9,12 @@ py .\analysis.py --filename "${filename}.txt"
 
 py .\datavalidation.py
 
-py .\generators\serves.py
-py .\generators\receptions.py
-py .\generators\sets.py
-py .\generators\hitting.py
-py .\generators\sets_reception1.py
-py .\generators\breaks.py
+py -m generators.serves
+py -m generators.receptions
+py -m generators.sets
+py -m generators.hitting
+py -m generators.sets_reception1
+py -m generators.breaks
 py .\generators\for_oli.py
 
 py .\create_report.py --output "${filename}.pdf"